@@ -0,0 +1,99 @@
+"""
+Single stream vs parallel byte range CSV fetch
+
+python -m benchmarks.bench_parallel_fetch --rows 2000000
+python -m benchmarks.bench_parallel_fetch --path bucket/athena/result.csv --profile owlna
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pyarrow
+import pyarrow.csv as pcsv
+from pyarrow.fs import LocalFileSystem, FileSystem
+
+from owlna.config import DEFAULT_MAX_WORKERS
+from owlna.utils.parallel import read_csv_ranges
+
+
+def make_csv(path: str, rows: int):
+    data = pyarrow.table({
+        "id": pyarrow.array(range(rows), pyarrow.int64()),
+        "string": pyarrow.array(["value, with \"quotes\"\nand newline %s" % (i % 100) for i in range(rows)]),
+        "double": pyarrow.array([i / 3 for i in range(rows)], pyarrow.float64()),
+        "timestamp": pyarrow.array(range(rows), pyarrow.timestamp("ms"))
+    })
+    pcsv.write_csv(data, path, pcsv.WriteOptions(quoting_style="all_valid"))
+    return data.schema
+
+
+def single_stream(filesystem: FileSystem, path: str, block_size: int) -> int:
+    rows = 0
+    with filesystem.open_input_stream(path, buffer_size=block_size) as stream:
+        for batch in pcsv.open_csv(
+            stream,
+            read_options=pcsv.ReadOptions(block_size=block_size),
+            parse_options=pcsv.ParseOptions(newlines_in_values=True)
+        ):
+            rows += batch.num_rows
+    return rows
+
+
+def parallel(filesystem: FileSystem, path: str, block_size: int, workers: int, ordered: bool) -> int:
+    with filesystem.open_input_stream(path) as stream:
+        names = pcsv.open_csv(stream, parse_options=pcsv.ParseOptions(newlines_in_values=True)).schema.names
+
+    with filesystem.open_input_file(path) as file:
+        return sum(
+            batch.num_rows
+            for batch in read_csv_ranges(
+                file, names, block_size=block_size, max_workers=workers, ordered=ordered
+            )
+        )
+
+
+def timeit(func, *args, repeat: int = 3):
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--path", help="S3 'bucket/key' of an Athena CSV result, default generated local file")
+    parser.add_argument("--profile", help="boto3 profile for --path")
+    parser.add_argument("--block-size", type=int, default=8 * 1024 ** 2)
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.path:
+            import boto3
+            from owlna import Athena
+
+            filesystem, path = Athena(boto3.Session(profile_name=args.profile)).pyarrow_s3filesystem(), args.path
+        else:
+            filesystem, path = LocalFileSystem(), os.path.join(directory, "result.csv")
+            make_csv(path, args.rows)
+
+        size = filesystem.get_file_info(path).size
+        print("%s: %.1f MB, block_size=%s, workers=%s" % (path, size / 1024 ** 2, args.block_size, args.workers))
+
+        for name, func, func_args in [
+            ("single stream", single_stream, (filesystem, path, args.block_size)),
+            ("parallel ordered", parallel, (filesystem, path, args.block_size, args.workers, True)),
+            ("parallel unordered", parallel, (filesystem, path, args.block_size, args.workers, False))
+        ]:
+            elapsed, rows = timeit(func, *func_args, repeat=args.repeat)
+            print("%-20s %8.3f s  %10.1f MB/s  %s rows" % (name, elapsed, size / 1024 ** 2 / elapsed, rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+In memory Athena client and owlna.Athena on the local filesystem, for offline benchmarks and tests
+"""
+import datetime
+import os
+import re
+import uuid
+from collections import Counter
+from typing import Optional
+
+import pyarrow
+import pyarrow.csv as pcsv
+import pyarrow.parquet as pq
+from pyarrow import DataType, Table
+from pyarrow.fs import LocalFileSystem
+
+from owlna import Athena
+
+
+def datatype_to_sqltype(dtype: DataType) -> dict:
+    if pyarrow.types.is_string(dtype) or pyarrow.types.is_large_string(dtype):
+        return {"Type": "varchar", "Precision": 2147483647, "Scale": 0}
+    elif pyarrow.types.is_boolean(dtype):
+        return {"Type": "boolean", "Precision": 0, "Scale": 0}
+    elif pyarrow.types.is_int8(dtype):
+        return {"Type": "tinyint", "Precision": 3, "Scale": 0}
+    elif pyarrow.types.is_int16(dtype):
+        return {"Type": "smallint", "Precision": 5, "Scale": 0}
+    elif pyarrow.types.is_int32(dtype):
+        return {"Type": "integer", "Precision": 10, "Scale": 0}
+    elif pyarrow.types.is_int64(dtype):
+        return {"Type": "bigint", "Precision": 19, "Scale": 0}
+    elif pyarrow.types.is_float32(dtype):
+        return {"Type": "float", "Precision": 17, "Scale": 0}
+    elif pyarrow.types.is_float64(dtype):
+        return {"Type": "double", "Precision": 17, "Scale": 0}
+    elif pyarrow.types.is_decimal(dtype):
+        return {"Type": "decimal", "Precision": dtype.precision, "Scale": dtype.scale}
+    elif pyarrow.types.is_date(dtype):
+        return {"Type": "date", "Precision": 0, "Scale": 0}
+    elif pyarrow.types.is_timestamp(dtype):
+        return {"Type": "timestamp", "Precision": 3, "Scale": 0}
+    elif pyarrow.types.is_time(dtype):
+        return {"Type": "time", "Precision": 3, "Scale": 0}
+    raise NotImplementedError("Cannot map %s to athena type" % dtype)
+
+
+def encode_varint(value: int) -> bytes:
+    result = bytearray()
+    while True:
+        byte, value = value & 0x7F, value >> 7
+        if value:
+            result.append(byte | 0x80)
+        else:
+            result.append(byte)
+            return bytes(result)
+
+
+def encode_csv_metadata(columns: list[dict]) -> bytes:
+    """
+    Encode ColumnInfo dicts like Athena .csv.metadata protobuf
+    """
+    nullable = ["NOT_NULL", "NULLABLE", "UNKNOWN"]
+    message = bytearray()
+
+    for column in columns:
+        column_message = bytearray()
+        for number, key in enumerate(
+            ["CatalogName", "SchemaName", "TableName", "Name", "Label", "Type",
+             "Precision", "Scale", "Nullable", "CaseSensitive"],
+            start=1
+        ):
+            value = column.get(key)
+            if key == "Nullable":
+                value = nullable.index(value)
+            if isinstance(value, str):
+                data = value.encode()
+                column_message += encode_varint(number << 3 | 2) + encode_varint(len(data)) + data
+            elif value:
+                column_message += encode_varint(number << 3) + encode_varint(int(value))
+        message += encode_varint(1 << 3 | 2) + encode_varint(len(column_message)) + column_message
+
+    return bytes(message)
+
+
+def athena_text(value) -> str:
+    """
+    get_query_results VarCharValue formatting
+    """
+    if isinstance(value, bool):
+        return str(value).lower()
+    elif isinstance(value, datetime.datetime):
+        return value.isoformat(sep=" ", timespec="milliseconds")
+    return str(value)
+
+
+def column_info(data: Table) -> list[dict]:
+    return [
+        {
+            "CatalogName": "hive", "SchemaName": "", "TableName": "",
+            "Name": f.name, "Label": f.name,
+            "Nullable": "UNKNOWN", "CaseSensitive": True,
+            **datatype_to_sqltype(f.type)
+        }
+        for f in data.schema
+    ]
+
+
+class FakeAthenaClient:
+    """
+    In memory stand-in for boto3.client("athena")
+
+    Registered query results are written as Athena-like CSV files in directory,
+    with OutputLocation = "s3://" + local path like in tests.test_parquet_table
+    """
+
+    def __init__(self, directory: str, polls: int = 2, metadata: bool = True):
+        self.directory = directory
+        self.polls = polls
+        self.metadata = metadata
+        self.results: dict[str, Table] = {}
+        self.executions: dict[str, dict] = {}
+        self.calls = Counter()
+        self.closed = False
+
+    def register(self, query: str, data: Table):
+        self.results[query] = data
+
+    def close(self):
+        self.closed = True
+
+    def start_query_execution(self, QueryString: str, **kwargs):
+        self.calls["start_query_execution"] += 1
+
+        query_id = str(uuid.uuid4())
+        path = os.path.join(self.directory, "%s.csv" % query_id)
+        unload = re.match(r"UNLOAD \((.*)\) TO '(.*)' WITH", QueryString, re.DOTALL)
+
+        if unload:
+            data = self.results.get(unload.group(1))
+            if data is not None:
+                location = unload.group(2)[5:]
+                os.makedirs(location, exist_ok=True)
+                # Athena writes no file without rows
+                if data.num_rows:
+                    pq.write_table(data, os.path.join(location, "%s_0.parquet" % query_id))
+                data = pyarrow.table({"rows": [data.num_rows]})
+        elif QueryString.startswith(("ALTER TABLE", "MSCK REPAIR TABLE")):
+            # DDL without result rows
+            data = self.results.get(QueryString, pyarrow.table({}))
+        else:
+            data = self.results.get(QueryString)
+
+        if data is not None:
+            pcsv.write_csv(data, path, pcsv.WriteOptions(quoting_style="all_valid"))
+
+            if self.metadata:
+                with open(path + ".metadata", "wb") as f:
+                    f.write(encode_csv_metadata(column_info(data)))
+
+        reuse = kwargs.get("ResultReuseConfiguration", {}).get("ResultReuseByAgeConfiguration", {})
+        reused = reuse.get("Enabled", False) and any(
+            _["query"] == QueryString and _["data"] is not None and not _["stopped"]
+            and datetime.datetime.now() - _["submitted"] <= datetime.timedelta(minutes=reuse["MaxAgeInMinutes"])
+            for _ in self.executions.values()
+        )
+
+        self.executions[query_id] = {
+            "query": QueryString,
+            "kwargs": kwargs,
+            "data": data,
+            "path": path,
+            "polls": self.polls if reused else 0,
+            "stopped": False,
+            "reused": reused,
+            "submitted": datetime.datetime.now()
+        }
+        return {"QueryExecutionId": query_id}
+
+    def stop_query_execution(self, QueryExecutionId: str):
+        self.calls["stop_query_execution"] += 1
+        self.executions[QueryExecutionId]["stopped"] = True
+        return {}
+
+    def query_execution(self, query_id: str) -> dict:
+        execution = self.executions[query_id]
+        execution["polls"] += 1
+
+        status = {"SubmissionDateTime": execution["submitted"]}
+        if execution["stopped"]:
+            status["State"] = "CANCELLED"
+        elif execution["polls"] <= 1:
+            status["State"] = "QUEUED"
+        elif execution["polls"] <= self.polls:
+            status["State"] = "RUNNING"
+        elif execution["data"] is None:
+            status["State"] = "FAILED"
+            status["StateChangeReason"] = "FAILED: Unknown query '%s'" % execution["query"]
+            status["AthenaError"] = {
+                "ErrorCategory": 2, "ErrorType": 1001, "Retryable": False,
+                "ErrorMessage": "Unknown query"
+            }
+        else:
+            status["State"] = "SUCCEEDED"
+
+        return {
+            "QueryExecutionId": query_id,
+            "Query": execution["query"],
+            "StatementType": "DML",
+            "ResultConfiguration": {"OutputLocation": "s3://" + execution["path"]},
+            "Status": status,
+            "Statistics": {
+                "EngineExecutionTimeInMillis": 10 * execution["polls"],
+                "DataScannedInBytes": 0 if execution["data"] is None else execution["data"].nbytes,
+                "TotalExecutionTimeInMillis": 10 * execution["polls"],
+                "QueryQueueTimeInMillis": 1,
+                "ServiceProcessingTimeInMillis": 1,
+                "ResultReuseInformation": {"ReusedPreviousResult": execution["reused"]}
+            },
+            "WorkGroup": execution["kwargs"].get("WorkGroup", "primary")
+        }
+
+    def get_work_group(self, WorkGroup: str):
+        return {
+            "WorkGroup": {
+                "Name": WorkGroup,
+                "Configuration": {"ResultConfiguration": {"OutputLocation": "s3://" + self.directory}}
+            }
+        }
+
+    def get_query_execution(self, QueryExecutionId: str):
+        self.calls["get_query_execution"] += 1
+        return {"QueryExecution": self.query_execution(QueryExecutionId)}
+
+    def batch_get_query_execution(self, QueryExecutionIds: list[str]):
+        self.calls["batch_get_query_execution"] += 1
+        if len(QueryExecutionIds) > 50:
+            raise ValueError("QueryExecutionIds: maximum 50 ids")
+        return {
+            "QueryExecutions": [
+                self.query_execution(_) for _ in QueryExecutionIds if _ in self.executions
+            ],
+            "UnprocessedQueryExecutionIds": [
+                {"QueryExecutionId": _, "ErrorCode": "InvalidRequestException", "ErrorMessage": "Unknown id"}
+                for _ in QueryExecutionIds if _ not in self.executions
+            ]
+        }
+
+    def get_query_results(self, QueryExecutionId: str, MaxResults: int = 1000, NextToken: Optional[str] = None):
+        self.calls["get_query_results"] += 1
+        data: Table = self.executions[QueryExecutionId]["data"]
+
+        start = int(NextToken) if NextToken else 0
+        rows = []
+        if start == 0:
+            rows.append({"Data": [{"VarCharValue": name} for name in data.column_names]})
+            MaxResults -= 1
+
+        chunk = data.slice(start, MaxResults)
+        for row in chunk.to_pylist():
+            rows.append({
+                "Data": [{} if v is None else {"VarCharValue": athena_text(v)} for v in row.values()]
+            })
+
+        result = {
+            "ResultSet": {
+                "Rows": rows,
+                "ResultSetMetadata": {
+                    "ColumnInfo": column_info(data)
+                }
+            }
+        }
+        if start + chunk.num_rows < data.num_rows:
+            result["NextToken"] = str(start + chunk.num_rows)
+        return result
+
+
+class FakeAthena(Athena):
+    """
+    owlna.Athena with shared FakeAthenaClient and LocalFileSystem
+    """
+
+    def __init__(self, session, directory: str, polls: int = 2, **kwargs):
+        super().__init__(session, **kwargs)
+        self.fake_client = FakeAthenaClient(directory, polls=polls)
+
+    def client(self, config=None):
+        return self.fake_client
+
+    def s3filesystem(self, **kwargs):
+        return LocalFileSystem()
@@ -0,0 +1,331 @@
+"""
+Offline benchmark suite, benchmarks.fake.FakeAthena client and local filesystem, no AWS profile
+
+Measures Cursor.fetch_arrow, Cursor.fetch_arrow_batches, owlna.utils.arrow.cast_arrow and
+Table.insert_arrow (inline and parallel) throughput and peak arrow memory across data sizes
+and column types.
+scan_pruning compares a selective Table.scan on files written in arrival order and with
+insert_arrow(sort_by=): scanned_bytes is the compressed size of the row groups the filter cannot
+skip with their min / max statistics, like Athena DataScannedInBytes.
+Results are saved as JSON per commit so regressions can be compared between commits.
+
+python -m benchmarks.suite --rows 10000 100000 1000000
+python -m benchmarks.suite --compare benchmarks/results/<before>.json benchmarks/results/<after>.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Optional
+
+import boto3
+import pyarrow
+import pyarrow.dataset
+from pyarrow.fs import LocalFileSystem
+
+from owlna.utils.arrow import cast_arrow
+from owlna.utils.metadata import dict_table_metadata_to_table
+from benchmarks.fake import FakeAthena, datatype_to_sqltype
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_ROWS = [10000, 100000, 1000000]
+# relative slowdown above which --compare reports a regression
+DEFAULT_THRESHOLD = 0.1
+
+
+def numeric_columns(rows: int) -> dict[str, pyarrow.Array]:
+    return {
+        "bigint": pyarrow.array(range(rows), pyarrow.int64()),
+        "integer": pyarrow.array((i % 1000 for i in range(rows)), pyarrow.int32()),
+        "double": pyarrow.array((i / 3 for i in range(rows)), pyarrow.float64()),
+        "decimal": pyarrow.array((i / 4 for i in range(rows)), pyarrow.float64()).cast(pyarrow.decimal128(18, 2))
+    }
+
+
+def string_columns(rows: int) -> dict[str, pyarrow.Array]:
+    return {
+        "string": pyarrow.array(("value %s" % (i % 1000) for i in range(rows))),
+        "quoted": pyarrow.array(('with "quotes", comma\nand newline %s' % (i % 100) for i in range(rows))),
+        "nullable": pyarrow.array((None if i % 3 else "x" * (i % 50) for i in range(rows)), pyarrow.string())
+    }
+
+
+def temporal_columns(rows: int) -> dict[str, pyarrow.Array]:
+    return {
+        "date": pyarrow.array((i % 20000 for i in range(rows)), pyarrow.int32()).cast(pyarrow.date32()),
+        "timestamp": pyarrow.array((i * 1000 for i in range(rows)), pyarrow.int64()).cast(pyarrow.timestamp("ms")),
+        "boolean": pyarrow.array((i % 2 == 0 for i in range(rows)), pyarrow.bool_())
+    }
+
+
+DATASETS: dict[str, Callable[[int], dict[str, pyarrow.Array]]] = {
+    "numeric": numeric_columns,
+    "string": string_columns,
+    "temporal": temporal_columns,
+    "mixed": lambda rows: {**numeric_columns(rows), **string_columns(rows), **temporal_columns(rows)}
+}
+
+
+class PeakMemory:
+    """
+    Sample pyarrow.total_allocated_bytes in a thread, arrow pool peaks cannot be reset
+    """
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.base = 0
+        self.peak = 0
+        self.running = False
+        self.thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        self.base = self.peak = pyarrow.total_allocated_bytes()
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.running = False
+        self.thread.join()
+        self.sample()
+
+    def sample(self):
+        self.peak = max(self.peak, pyarrow.total_allocated_bytes())
+
+    def run(self):
+        while self.running:
+            self.sample()
+            time.sleep(self.interval)
+
+    @property
+    def bytes(self) -> int:
+        return self.peak - self.base
+
+
+def measure(func: Callable[[], int], repeat: int) -> dict:
+    """
+    Best time of repeat runs, peak arrow memory over all runs
+
+    :param func: returns the number of rows processed
+    """
+    best, rows = None, 0
+    with PeakMemory() as memory:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return {"seconds": best, "rows": rows, "peak_memory": memory.bytes}
+
+
+def athena_table(connection, location: str, data: pyarrow.Table):
+    return dict_table_metadata_to_table(
+        connection, "AwsDataCatalog", "benchmark",
+        {
+            "Name": "benchmark",
+            "TableType": "EXTERNAL_TABLE",
+            "Columns": [
+                {"Name": f.name, "Type": datatype_to_sqltype(f.type)["Type"].replace("varchar", "string")}
+                if not pyarrow.types.is_decimal(f.type) else
+                {"Name": f.name, "Type": "decimal(%s,%s)" % (f.type.precision, f.type.scale)}
+                for f in data.schema
+            ],
+            "PartitionKeys": [],
+            "Parameters": {
+                "EXTERNAL": "TRUE",
+                "location": "s3://" + location,
+                "serde.serialization.lib": "org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe"
+            }
+        }
+    )
+
+
+def run_dataset(server: FakeAthena, directory: str, name: str, rows: int, repeat: int, workers: int) -> dict:
+    data = pyarrow.table(DATASETS[name](rows))
+    query = "SELECT %s %s" % (name, rows)
+    server.fake_client.register(query, data)
+
+    results = {}
+    with server.connect(shared_client=True) as connection:
+        cursor = connection.execute(query)
+        cursor.wait()
+
+        size = os.path.getsize(cursor.output_location[5:])
+        strings = data.cast(pyarrow.schema([(f.name, pyarrow.string()) for f in data.schema]))
+        table = athena_table(connection, os.path.join(directory, "insert_%s_%s" % (name, rows)), data)
+
+        for benchmark, func, nbytes in [
+            ("fetch_arrow", lambda: cursor.fetch_arrow(small_result=False).num_rows, size),
+            (
+                "fetch_arrow_parallel",
+                lambda: cursor.fetch_arrow(block_size=1024 ** 2, parallel=workers, small_result=False).num_rows,
+                size
+            ),
+            ("fetch_arrow_batches", lambda: sum(_.num_rows for _ in cursor.fetch_arrow_batches()), size),
+            ("cast_arrow", lambda: cast_arrow(strings, data.schema).read_all().num_rows, strings.nbytes),
+            (
+                "insert_arrow",
+                lambda: table.insert_arrow(data, existing_data_behavior="delete_matching").rows,
+                data.nbytes
+            ),
+            (
+                "insert_arrow_parallel",
+                lambda: table.insert_arrow(data, existing_data_behavior="delete_matching", parallel=workers).rows,
+                data.nbytes
+            )
+        ]:
+            result = measure(func, repeat)
+            result["bytes"] = nbytes
+            result["rows_per_second"] = result["rows"] / result["seconds"]
+            result["mb_per_second"] = nbytes / 1024 ** 2 / result["seconds"]
+            results["%s/%s/%s" % (benchmark, name, rows)] = result
+
+    return results
+
+
+def scanned(table, expression) -> tuple[int, int, int]:
+    """
+    Compressed bytes and number of row groups matching expression statistics, total row groups
+    """
+    size, groups, total = 0, 0, 0
+    for fragment in table.dataset(LocalFileSystem()).get_fragments():
+        total += fragment.metadata.num_row_groups
+        for part in fragment.split_by_row_group(expression):
+            for group in part.row_groups:
+                metadata = fragment.metadata.row_group(group.id)
+                size += sum(metadata.column(_).total_compressed_size for _ in range(metadata.num_columns))
+                groups += 1
+    return size, groups, total
+
+
+def run_pruning(directory: str, rows: int, repeat: int) -> dict:
+    ordered = pyarrow.table(numeric_columns(rows))
+    indices = list(range(rows))
+    random.Random(rows).shuffle(indices)
+    data = ordered.take(pyarrow.array(indices))
+    # about 1% of rows
+    key = pyarrow.dataset.field("bigint")
+    expression = (key >= rows // 2) & (key < rows // 2 + max(rows // 100, 1))
+
+    results = {}
+    for name, options in [("unsorted", {}), ("sorted", {"sort_by": ["bigint"]})]:
+        table = athena_table(None, os.path.join(directory, "pruning_%s_%s" % (name, rows)), data)
+        table.insert_arrow(
+            data, filesystem=LocalFileSystem(), existing_data_behavior="delete_matching",
+            parallel=1, row_group_size=max(data.nbytes // 20, 1), **options
+        )
+
+        result = measure(lambda: table.scan(filter=expression, filesystem=LocalFileSystem()).count_rows(), repeat)
+        result["scanned_bytes"], result["row_groups_read"], result["row_groups"] = scanned(table, expression)
+        result["bytes"] = result["scanned_bytes"]
+        result["rows_per_second"] = result["rows"] / result["seconds"]
+        result["mb_per_second"] = result["bytes"] / 1024 ** 2 / result["seconds"]
+        results["scan_pruning/%s/%s" % (name, rows)] = result
+
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(
+    rows: list[int] = DEFAULT_ROWS,
+    datasets: list[str] = list(DATASETS),
+    repeat: int = 3,
+    workers: int = 4
+) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        server = FakeAthena(boto3.Session(region_name="eu-west-1"), directory, polls=0, rate_limiter=False)
+        try:
+            for n in rows:
+                for name in datasets:
+                    results.update(run_dataset(server, directory, name, n, repeat, workers))
+                results.update(run_pruning(directory, n, repeat))
+        finally:
+            server.close()
+
+    return {
+        "commit": git_commit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pyarrow": pyarrow.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results
+    }
+
+
+def compare(before: dict, after: dict, threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """
+    Print seconds and peak memory ratios of benchmarks in both runs
+
+    :return: regressed benchmark names, slower than threshold
+    """
+    regressions = []
+    print("%-40s %10s %10s %8s %8s" % ("benchmark", "before s", "after s", "time", "memory"))
+
+    for key in sorted(set(before["results"]) & set(after["results"])):
+        b, a = before["results"][key], after["results"][key]
+        ratio = a["seconds"] / b["seconds"]
+        memory = a["peak_memory"] / b["peak_memory"] if b["peak_memory"] else float("nan")
+        flag = ""
+
+        if ratio > 1 + threshold:
+            regressions.append(key)
+            flag = "  REGRESSION"
+        print("%-40s %10.4f %10.4f %7.2fx %7.2fx%s" % (key, b["seconds"], a["seconds"], ratio, memory, flag))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--datasets", nargs="+", default=list(DATASETS), choices=list(DATASETS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4, help="fetch_arrow_parallel threads")
+    parser.add_argument("--output", help="result JSON path, default benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two result files")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as before, open(args.compare[1]) as after:
+            regressions = compare(json.load(before), json.load(after), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    result = run(args.rows, args.datasets, args.repeat, args.workers)
+    output = args.output or os.path.join(RESULTS_DIR, "%s.json" % result["commit"])
+
+    for key, value in result["results"].items():
+        print("%-40s %8.4f s %12.0f rows/s %8.1f MB/s %8.1f MB peak" % (
+            key, value["seconds"], value["rows_per_second"], value["mb_per_second"], value["peak_memory"] / 1024 ** 2
+        ))
+        if "scanned_bytes" in value:
+            print("%-40s %8.2f MB scanned, %s / %s row groups" % (
+                "", value["scanned_bytes"] / 1024 ** 2, value["row_groups_read"], value["row_groups"]
+            ))
+
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print("saved %s" % output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,8 @@
 from .server import *
 from .cursor import *
 from .connection import *
+from .async_cursor import *
+from .async_connection import *
+from .cache import *
+from .pool import *
+from .local import *
@@ -0,0 +1,69 @@
+__all__ = ["AsyncConnection"]
+
+import asyncio
+from typing import Optional, Iterable, Callable
+
+from botocore.config import Config
+
+from .async_cursor import AsyncCursor
+from .cache import ResultCache
+from .config import DEFAULT_BOTO_CLIENT_CONFIG
+from .connection import Connection
+
+
+class AsyncConnection:
+    """
+    asyncio wrapper around owlna.Connection
+    """
+
+    def __init__(
+        self,
+        server: "Athena",
+        config: Config = DEFAULT_BOTO_CLIENT_CONFIG,
+        query_options: Optional[dict] = None,
+        shared_polling: bool = False,
+        cache: Optional[ResultCache] = None,
+        single_flight: bool = False,
+        hooks: Iterable[Callable] = ()
+    ):
+        self.connection = Connection(
+            server, config=config, query_options=query_options,
+            shared_polling=shared_polling, cache=cache,
+            single_flight=single_flight, hooks=hooks
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def server(self) -> "Athena":
+        return self.connection.server
+
+    @property
+    def closed(self) -> bool:
+        return self.connection.closed
+
+    @property
+    def query_options(self) -> dict:
+        return self.connection.query_options
+
+    def close(self):
+        self.connection.close()
+
+    def cursor(self) -> AsyncCursor:
+        return AsyncCursor(self.connection.cursor())
+
+    async def execute(self, *args, **kwargs) -> AsyncCursor:
+        return await self.cursor().execute(*args, **kwargs)
+
+    # Table
+    async def table(
+        self,
+        catalog: str,
+        database: str,
+        name: str
+    ):
+        return await asyncio.to_thread(self.connection.table, catalog, database, name)
@@ -0,0 +1,144 @@
+__all__ = ["AsyncCursor"]
+
+import asyncio
+from typing import Union, Iterable, Optional, AsyncGenerator
+
+from pyarrow import Schema, DataType, RecordBatch, Table
+
+from .cursor import Cursor
+from .polling import PollingStrategy, polling_strategy
+
+
+class AsyncCursor:
+    """
+    asyncio wrapper around owlna.Cursor
+
+    Blocking boto3 / pyarrow calls run in the default executor, waits use asyncio.sleep
+    """
+
+    def __init__(
+        self,
+        cursor: Cursor
+    ):
+        self.cursor = cursor
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __await__(self):
+        return self.wait().__await__()
+
+    def __repr__(self):
+        return "AsyncAthenaCursor(id='%s')" % self.id
+
+    @property
+    def id(self) -> Optional[str]:
+        return self.cursor.id
+
+    @property
+    def closed(self) -> bool:
+        return self.cursor.closed
+
+    def close(self):
+        self.cursor.close()
+
+    async def get_query_execution(self) -> dict:
+        return await asyncio.to_thread(self.cursor.get_query_execution)
+
+    async def execute(
+        self,
+        query: str,
+        wait: Union[float, bool, PollingStrategy] = True,
+        **kwargs
+    ) -> "AsyncCursor":
+        """
+        See owlna.Cursor.execute
+
+        :param query:
+        :param wait: wait query to be done with await self.wait(tick=wait)
+        :param kwargs: other boto3 kwargs
+        """
+        await asyncio.to_thread(self.cursor.execute, query, wait=False, **kwargs)
+
+        if wait:
+            await self.wait(wait)
+
+        return self
+
+    async def stop(self):
+        await asyncio.to_thread(self.cursor.stop)
+
+    async def wait(
+        self, tick: Union[float, bool, PollingStrategy] = True, raise_error: bool = True
+    ) -> "AsyncCursor":
+        polling = polling_strategy(tick)
+        try:
+            if self.cursor.connection.shared_polling and self.cursor._status is None:
+                await asyncio.wrap_future(self.cursor.future())
+
+            while self.cursor._status is None:
+                meta = await self.get_query_execution()
+
+                if self.cursor._status is None:
+                    await asyncio.sleep(polling.next_interval(meta))
+        except BaseException as e:
+            await self.stop()
+            raise e
+
+        if raise_error:
+            self.cursor.raise_exception()
+
+        return self
+
+    # fetch
+    async def schema_arrow(self) -> Schema:
+        await self.wait()
+        return await asyncio.to_thread(lambda: self.cursor.schema_arrow)
+
+    async def fetch_arrow(
+        self,
+        include_columns: Iterable[str] = (),
+        column_types: dict[str, DataType] = {},
+        **kwargs
+    ) -> Table:
+        await self.wait()
+        return await asyncio.to_thread(
+            self.cursor.fetch_arrow,
+            include_columns=include_columns,
+            column_types=column_types,
+            **kwargs
+        )
+
+    async def fetch_arrow_batches(
+        self,
+        include_columns: Iterable[str] = (),
+        column_types: dict[str, DataType] = {},
+        **kwargs
+    ) -> AsyncGenerator[RecordBatch, None]:
+        await self.wait()
+
+        batches = self.cursor.fetch_arrow_batches(
+            include_columns=include_columns,
+            column_types=column_types,
+            **kwargs
+        )
+        pending = None
+        try:
+            while True:
+                # shielded: cancelling the task leaves next running in its thread
+                pending = asyncio.ensure_future(asyncio.to_thread(next, batches, None))
+                batch = await asyncio.shield(pending)
+                pending = None
+                if batch is None:
+                    break
+                yield batch
+        finally:
+            if pending is not None:
+                # a generator cannot be closed while next is executing
+                await asyncio.wait([pending])
+                if not pending.cancelled():
+                    pending.exception()
+            await asyncio.to_thread(batches.close)
@@ -0,0 +1,238 @@
+__all__ = ["ResultCache"]
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from typing import Optional, Iterable, Iterator
+
+import pyarrow
+import pyarrow.ipc
+from pyarrow import RecordBatch, Table, RecordBatchFileReader
+
+from .config import DEFAULT_CACHE_DIR, DEFAULT_CACHE_SIZE, DEFAULT_CACHE_TTL
+
+EXTENSION = ".arrow"
+# statements without side effects, others always reach Athena
+READ_ONLY = re.compile(r"^[\s(]*(SELECT|WITH|VALUES|TABLE|SHOW|DESCRIBE|EXPLAIN)\b", re.IGNORECASE)
+# entry query metadata, like the original ResultConfiguration
+METADATA_EXTENSION = ".json"
+
+
+class ResultCache:
+    """
+    On disk query result cache, Arrow IPC files with LRU eviction
+
+    Key = normalized query text, result format, WorkGroup, Catalog and Database, read only queries only
+    Entries older than ttl seconds are misses, least recently read entries are removed
+    above max_size bytes
+    Hits are memory mapped, zero copy
+    Entries may keep query metadata in a <key>.json file, removed with the entry
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIR,
+        max_size: int = DEFAULT_CACHE_SIZE,
+        ttl: float = DEFAULT_CACHE_TTL
+    ):
+        self.directory = directory
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __repr__(self):
+        return "ResultCache('%s', hits=%s, misses=%s, evictions=%s)" % (
+            self.directory, self.hits, self.misses, self.evictions
+        )
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return re.sub(r"\s+", " ", query).strip().rstrip(";").strip()
+
+    def key(self, query: str, result_format: str = "csv", **options) -> Optional[str]:
+        """
+        :param query: SQL query
+        :param result_format: Cursor.execute result format
+        :param options: start_query_execution kwargs
+        :return: entry key, None if query is not read only
+        """
+        if READ_ONLY.match(self.normalize(query)) is None:
+            return None
+
+        context = options.get("QueryExecutionContext", {})
+
+        return hashlib.sha256(json.dumps(
+            {
+                "query": self.normalize(query),
+                "format": result_format,
+                "workgroup": options.get("WorkGroup"),
+                "catalog": context.get("Catalog"),
+                "database": context.get("Database")
+            },
+            sort_keys=True
+        ).encode()).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + EXTENSION)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        :return: entry path if valid, touched as last used
+        """
+        path, now = self.path(key), time.time()
+
+        try:
+            mtime = os.stat(path).st_mtime
+
+            if now - mtime <= self.ttl:
+                # atime = last read, mtime = written
+                os.utime(path, (now, mtime))
+                with self.lock:
+                    self.hits += 1
+                return path
+
+            self.remove(path)
+        except FileNotFoundError:
+            pass
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def open(self, path: str) -> RecordBatchFileReader:
+        return pyarrow.ipc.open_file(pyarrow.memory_map(path, "r"))
+
+    @staticmethod
+    def metadata_path(path: str) -> str:
+        return path[:-len(EXTENSION)] + METADATA_EXTENSION
+
+    def metadata(self, path: str) -> dict:
+        """
+        :param path: entry path
+        :return: query metadata written with the entry, empty if none
+        """
+        try:
+            with open(self.metadata_path(path)) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def remove(self, path: str):
+        """
+        Remove entry and its metadata, FileNotFoundError if entry is missing
+        """
+        os.remove(path)
+        try:
+            os.remove(self.metadata_path(path))
+        except FileNotFoundError:
+            pass
+
+    def put(self, key: str, data: Table, metadata: Optional[dict] = None):
+        for _ in self.write(key, data.to_batches(), data.schema, metadata):
+            pass
+
+    def write(
+        self,
+        key: str,
+        batches: Iterable[RecordBatch],
+        schema: Optional[pyarrow.Schema] = None,
+        metadata: Optional[dict] = None
+    ) -> Iterator[RecordBatch]:
+        """
+        Write batches in a temporary file, renamed to entry once batches are exhausted
+
+        :param key: entry key
+        :param batches: RecordBatch iterable
+        :param schema: file schema, default first batch schema, nothing is cached if None and no batch
+        :param metadata: JSON serializable query metadata, see self.metadata
+        :return: batches passed through
+        """
+        tmp = os.path.join(self.directory, ".%s-%s.tmp" % (key, uuid.uuid4().hex))
+        writer = None
+
+        try:
+            with pyarrow.OSFile(tmp, "wb") as sink:
+                try:
+                    for batch in batches:
+                        if writer is None:
+                            writer = pyarrow.ipc.new_file(sink, schema if schema else batch.schema)
+                        writer.write_batch(batch)
+                        yield batch
+
+                    if writer is None and schema is not None:
+                        writer = pyarrow.ipc.new_file(sink, schema)
+                finally:
+                    if writer is not None:
+                        writer.close()
+
+            if writer is not None:
+                path = self.path(key)
+                if metadata is not None:
+                    # metadata first: an entry is never read without it
+                    with open(tmp + METADATA_EXTENSION, "w") as f:
+                        json.dump(metadata, f)
+                    os.replace(tmp + METADATA_EXTENSION, self.metadata_path(path))
+                elif os.path.exists(self.metadata_path(path)):
+                    os.remove(self.metadata_path(path))
+                os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp + METADATA_EXTENSION):
+                os.remove(tmp + METADATA_EXTENSION)
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        self.evict()
+
+    def entries(self) -> list[os.DirEntry]:
+        return [
+            entry for entry in os.scandir(self.directory)
+            if entry.name.endswith(EXTENSION) and entry.is_file()
+        ]
+
+    @property
+    def size(self) -> int:
+        return sum(entry.stat().st_size for entry in self.entries())
+
+    def evict(self):
+        entries = sorted(
+            ((entry.path, entry.stat()) for entry in self.entries()),
+            key=lambda _: _[1].st_atime
+        )
+        size = sum(stat.st_size for _, stat in entries)
+
+        for path, stat in entries:
+            if size <= self.max_size:
+                break
+            try:
+                self.remove(path)
+                size -= stat.st_size
+                with self.lock:
+                    self.evictions += 1
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        for entry in self.entries():
+            self.remove(entry.path)
+
+    def stats(self) -> dict:
+        entries = self.entries()
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "size": sum(entry.stat().st_size for entry in entries),
+            "max_size": self.max_size
+        }
@@ -2,6 +2,35 @@ __all__ = [
     "DEFAULT_BOTO_CLIENT_CONFIG",
     "DEFAULT_SAFE_MODE",
     "DEFAULT_CURSOR_WAIT",
+    "DEFAULT_CURSOR_MIN_WAIT",
+    "DEFAULT_CURSOR_MAX_WAIT",
+    "DEFAULT_MAX_WORKERS",
+    "DEFAULT_CACHE_DIR",
+    "DEFAULT_CACHE_SIZE",
+    "DEFAULT_CACHE_TTL",
+    "DEFAULT_SINGLE_FLIGHT_TTL",
+    "DEFAULT_INDEX_DIR",
+    "DEFAULT_TARGET_FILE_SIZE",
+    "DEFAULT_ROW_GROUP_SIZE",
+    "DEFAULT_WRITE_MEMORY",
+    "DEFAULT_WRITER_MAX_ROWS",
+    "DEFAULT_WRITER_MAX_DELAY",
+    "DEFAULT_WRITER_MAX_BUFFERED_BYTES",
+    "DEFAULT_REGISTER_PARTITIONS",
+    "DEFAULT_SORT_MEMORY",
+    "DEFAULT_MAX_QUERY_LENGTH",
+    "DEFAULT_SMALL_RESULT_SIZE",
+    "DEFAULT_SMALL_RESULT_PAGES",
+    "DEFAULT_POOL_SIZE",
+    "DEFAULT_POOL_TIMEOUT",
+    "DEFAULT_S3_CONNECT_TIMEOUT",
+    "DEFAULT_S3_REQUEST_TIMEOUT",
+    "DEFAULT_S3_MAX_ATTEMPTS",
+    "DEFAULT_S3_BACKGROUND_WRITES",
+    "DEFAULT_MAX_CONCURRENCY",
+    "DEFAULT_START_QUERY_RATE",
+    "DEFAULT_API_RATE",
+    "DEFAULT_API_MIN_RATE",
     "QueryStates"
 ]
 
@@ -18,6 +47,47 @@ DEFAULT_BOTO_CLIENT_CONFIG = Config(
 )
 DEFAULT_SAFE_MODE = os.environ.get("SAFE_MODE", "t")[0] in {"T", "t"}
 DEFAULT_CURSOR_WAIT = float(os.environ.get("CURSOR_WAIT", 0.3))
+DEFAULT_CURSOR_MIN_WAIT = float(os.environ.get("CURSOR_MIN_WAIT", 0.05))
+DEFAULT_CURSOR_MAX_WAIT = float(os.environ.get("CURSOR_MAX_WAIT", 5))
+DEFAULT_CACHE_DIR = os.environ.get("CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "owlna"))
+DEFAULT_CACHE_SIZE = int(os.environ.get("CACHE_SIZE", 1024 ** 3))
+DEFAULT_CACHE_TTL = float(os.environ.get("CACHE_TTL", 3600))
+# owlna.singleflight.SingleFlight seconds an in flight execution can be attached to
+DEFAULT_SINGLE_FLIGHT_TTL = float(os.environ.get("SINGLE_FLIGHT_TTL", 600))
+# owlna.index.TableIndex file listings
+DEFAULT_INDEX_DIR = os.environ.get("INDEX_DIR", os.path.join(DEFAULT_CACHE_DIR, "index"))
+# DataScannedInBytes under which results are read with get_query_results pages, up to PAGES pages
+DEFAULT_SMALL_RESULT_SIZE = int(os.environ.get("SMALL_RESULT_SIZE", 1024 ** 2))
+DEFAULT_SMALL_RESULT_PAGES = int(os.environ.get("SMALL_RESULT_PAGES", 1))
+DEFAULT_MAX_WORKERS = int(os.environ.get("MAX_WORKERS", min(32, (os.cpu_count() or 1) + 4)))
+DEFAULT_POOL_SIZE = int(os.environ.get("POOL_SIZE", DEFAULT_MAX_WORKERS))
+DEFAULT_POOL_TIMEOUT = float(os.environ.get("POOL_TIMEOUT", 30))
+# pyarrow S3FileSystem, seconds
+DEFAULT_S3_CONNECT_TIMEOUT = float(os.environ.get("S3_CONNECT_TIMEOUT", 2))
+DEFAULT_S3_REQUEST_TIMEOUT = float(os.environ.get("S3_REQUEST_TIMEOUT", 30))
+DEFAULT_S3_MAX_ATTEMPTS = int(os.environ.get("S3_MAX_ATTEMPTS", 10))
+# Athena active queries and StartQueryExecution calls per second quotas
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("MAX_CONCURRENCY", 20))
+DEFAULT_START_QUERY_RATE = float(os.environ.get("START_QUERY_RATE", 20))
+# owlna.utils.ratelimit.AdaptiveRateLimiter calls per second, per API operation
+DEFAULT_API_RATE = float(os.environ.get("API_RATE", 50))
+DEFAULT_API_MIN_RATE = float(os.environ.get("API_MIN_RATE", 0.5))
+# Table.insert_arrow(parallel=) Arrow bytes per file / row group, ~128-512 MB compressed Parquet files
+DEFAULT_TARGET_FILE_SIZE = int(os.environ.get("TARGET_FILE_SIZE", 1024 ** 3))
+DEFAULT_ROW_GROUP_SIZE = int(os.environ.get("ROW_GROUP_SIZE", 256 * 1024 ** 2))
+# Arrow bytes write_dataset buffers over all open files before writing row groups
+DEFAULT_WRITE_MEMORY = int(os.environ.get("WRITE_MEMORY", 1024 ** 3))
+# Table.insert_arrow(sort_by=) Arrow bytes sorted in memory before spilling to local files
+DEFAULT_SORT_MEMORY = int(os.environ.get("SORT_MEMORY", 512 * 1024 ** 2))
+# owlna.writer.TableWriter partition buffer limits
+DEFAULT_WRITER_MAX_ROWS = int(os.environ.get("WRITER_MAX_ROWS", 10000000))
+DEFAULT_WRITER_MAX_DELAY = float(os.environ.get("WRITER_MAX_DELAY", 300))
+# owlna.writer.TableWriter Arrow bytes buffered over all partitions
+DEFAULT_WRITER_MAX_BUFFERED_BYTES = int(os.environ.get("WRITER_MAX_BUFFERED_BYTES", 4 * 1024 ** 3))
+# Table.insert_arrow ALTER TABLE ADD PARTITION of written partitions, Athena query string max bytes
+DEFAULT_REGISTER_PARTITIONS = os.environ.get("REGISTER_PARTITIONS", "f")[0] in {"T", "t"}
+DEFAULT_MAX_QUERY_LENGTH = int(os.environ.get("MAX_QUERY_LENGTH", 262144))
+DEFAULT_S3_BACKGROUND_WRITES = os.environ.get("S3_BACKGROUND_WRITES", "t")[0] in {"T", "t"}
 
 
 class QueryStates(Enum):
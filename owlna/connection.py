@@ -1,14 +1,24 @@
 __all__ = ["Connection"]
 
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Iterable, Union, Callable, Generator
 
 from botocore.config import Config
-from pyarrow.fs import S3FileSystem
+from pyarrow.fs import S3FileSystem, FileSystem
 
-from .config import DEFAULT_BOTO_CLIENT_CONFIG
+from .cache import ResultCache
+from .config import DEFAULT_BOTO_CLIENT_CONFIG, DEFAULT_MAX_WORKERS, DEFAULT_S3_MAX_ATTEMPTS, \
+    DEFAULT_MAX_CONCURRENCY, DEFAULT_START_QUERY_RATE
 from .cursor import Cursor
+from .dispatcher import QueryDispatcher
+from .metrics import QueryTimeline
+from .poller import QueryPoller
+from .singleflight import SingleFlight
+from .utils.lru import LRUDict
 from .utils.metadata import dict_table_metadata_to_table
 
+DEFAULT_SCHEMA_CACHE_SIZE = 4096
+
 
 class Connection:
 
@@ -16,14 +26,43 @@ class Connection:
         self,
         server: "Athena",
         config: Config = DEFAULT_BOTO_CLIENT_CONFIG,
-        query_options: Optional[dict] = None
+        query_options: Optional[dict] = None,
+        shared_polling: bool = False,
+        cache: Optional[ResultCache] = None,
+        single_flight: bool = False,
+        shared_client: bool = False,
+        hooks: Iterable[Callable[[str, QueryTimeline], None]] = ()
     ):
+        """
+        :param server: owlna.Athena
+        :param config: boto3 client config
+        :param query_options: default start_query_execution kwargs
+        :param shared_polling: cursors wait with one background owlna.poller.QueryPoller
+            using batch_get_query_execution instead of polling their own query
+        :param cache: opt-in owlna.cache.ResultCache, local Arrow IPC query results
+        :param single_flight: identical read only queries executed while one is running
+            attach to its QueryExecutionId, see owlna.singleflight.SingleFlight
+        :param shared_client: use server shared boto3 client, left open on close
+        :param hooks: called with (event, owlna.metrics.QueryTimeline) when a cursor query is done
+            and when its result is fetched, see owlna.metrics.PrometheusExporter and SpanExporter
+        """
         self.server = server
 
-        self.client = self.server.session.client("athena", config=config)
-        self.s3fs = self.pyarrow_s3filesystem()
+        self.shared_client = shared_client
+        self.client = self.server.client(config) if shared_client \
+            else self.server.athena_client(config)
+        self._s3fs = None
         self.closed = False
         self.query_options = query_options if query_options else {}
+        self.shared_polling = shared_polling
+        self.cache = cache
+        self.single_flight = SingleFlight() if single_flight else None
+        self.hooks = list(hooks)
+        self.poller = QueryPoller(self)
+        self._output_locations: dict[str, str] = {}
+        # query id: result pyarrow.Schema
+        self.schemas = LRUDict(DEFAULT_SCHEMA_CACHE_SIZE)
+        self._executor = None
 
     def __del__(self):
         self.close()
@@ -37,7 +76,30 @@ class Connection:
     def close(self):
         if not self.closed:
             self.closed = True
-            self.client.close()
+            self.poller.close()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            if not self.shared_client:
+                self.client.close()
+
+    @property
+    def s3fs(self) -> FileSystem:
+        """
+        Server shared S3FileSystem, rebuilt when session credentials are refreshed
+        """
+        if self._s3fs is None:
+            return self.server.s3filesystem()
+        return self._s3fs
+
+    @s3fs.setter
+    def s3fs(self, filesystem: FileSystem):
+        self._s3fs = filesystem
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(DEFAULT_MAX_WORKERS, thread_name_prefix="owlna")
+        return self._executor
 
     def cursor(self):
         return Cursor(self)
@@ -45,6 +107,61 @@ class Connection:
     def execute(self, *args, **kwargs):
         return self.cursor().execute(*args, **kwargs)
 
+    def execute_many(
+        self,
+        queries: Iterable[str],
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        rate: float = DEFAULT_START_QUERY_RATE,
+        priority: Union[Callable[[str], float], Iterable[float], None] = None,
+        **kwargs
+    ) -> Generator[Cursor, None, None]:
+        """
+        Execute queries through an owlna.dispatcher.QueryDispatcher, yield done cursors as they complete
+
+        Queries keep running while yielded cursors are fetched
+        Closing the generator cancels queries not started yet
+
+        :param queries: SQL queries
+        :param max_concurrency: maximum running queries
+        :param rate: maximum StartQueryExecution calls per second
+        :param priority: lower first, function of the query or one value per query, default submission order
+        :param kwargs: Cursor.execute kwargs
+        """
+        queries = list(queries)
+        if priority is None:
+            priorities = [0] * len(queries)
+        elif callable(priority):
+            priorities = [priority(_) for _ in queries]
+        else:
+            priorities = list(priority)
+
+        with QueryDispatcher(self, max_concurrency=max_concurrency, rate=rate) as dispatcher:
+            futures = [
+                dispatcher.submit(query, priority=p, **kwargs)
+                for query, p in zip(queries, priorities)
+            ]
+
+            for future in as_completed(futures):
+                yield future.result()
+
+    def output_location(self, **kwargs) -> str:
+        """
+        Query result OutputLocation from start_query_execution kwargs, query_options or WorkGroup configuration
+
+        :param kwargs: start_query_execution kwargs
+        """
+        for options in (kwargs, self.query_options):
+            location = options.get("ResultConfiguration", {}).get("OutputLocation")
+            if location:
+                return location
+
+        workgroup = kwargs.get("WorkGroup", self.query_options.get("WorkGroup", "primary"))
+        if workgroup not in self._output_locations:
+            self._output_locations[workgroup] = self.client.get_work_group(
+                WorkGroup=workgroup
+            )["WorkGroup"]["Configuration"]["ResultConfiguration"]["OutputLocation"]
+        return self._output_locations[workgroup]
+
     # Table
     def table(
         self,
@@ -80,6 +197,12 @@ class Connection:
                 yield dict_table_metadata_to_table(self, catalog, database, meta)
 
     def pyarrow_s3filesystem(self, **kwargs) -> S3FileSystem:
-        # PyArrow 10
-        # kwargs["retry_strategy"] = kwargs.get("retry_strategy", self.client._client_config.retries.get("total_max_attempts", 3))
+        """
+        New S3FileSystem, retrying like the athena client
+
+        :param kwargs: see owlna.filesystem.s3filesystem_options
+        """
+        kwargs["max_attempts"] = kwargs.get(
+            "max_attempts", self.client.meta.config.retries.get("total_max_attempts", DEFAULT_S3_MAX_ATTEMPTS)
+        )
         return self.server.pyarrow_s3filesystem(**kwargs)
@@ -1,15 +1,27 @@
 __all__ = ["Cursor"]
 
 import time
+import uuid
+import weakref
+from concurrent.futures import Future
+from contextlib import contextmanager
 from typing import Optional, Union, Iterable, Generator
 
 import pyarrow.csv as pcsv
-from pyarrow import schema, Schema, DataType, RecordBatch, RecordBatchReader
-from pyarrow.fs import S3FileSystem
+import pyarrow.dataset as pds
+from pyarrow import schema, Schema, DataType, RecordBatch, RecordBatchReader, Table, ArrowInvalid, \
+    ArrowNotImplementedError, NativeFile, input_stream
+from pyarrow.fs import S3FileSystem, FileSystem
+from pyarrow.types import is_string, is_large_string
 
-from owlna.config import QueryStates, DEFAULT_CURSOR_WAIT
+from owlna.config import QueryStates, DEFAULT_MAX_WORKERS, DEFAULT_SMALL_RESULT_SIZE, DEFAULT_SMALL_RESULT_PAGES
 from owlna.exception import AthenaError, CancelledQuery
-from owlna.utils.metadata import query_result_column_to_pyarrow_field
+from owlna.metrics import QueryTimeline
+from owlna.polling import PollingStrategy, polling_strategy
+from owlna.singleflight import SingleFlight
+from owlna.utils.arrow import cast_batch, strings_to_array
+from owlna.utils.metadata import query_result_column_to_pyarrow_field, decode_csv_metadata
+from owlna.utils.parallel import read_csv_ranges, prefetched
 
 
 class Cursor:
@@ -18,12 +30,24 @@ class Cursor:
         self,
         connection: "Connection"
     ):
-        self.__result = None
-        self.__status = None
-        self.__statistics = None
+        self._result = None
+        self._status = None
+        self._statistics = None
         self.id = None
         self.closed = False
         self._schema_arrow = None
+        self.result_format = "csv"
+        self.unload_location = None
+        # UNLOAD SELECT query and execute kwargs
+        self.unload_query = None
+        self._cleanup = None
+        self.cache_key = None
+        self.cache_path = None
+        # attached connection.single_flight QueryExecutionId
+        self._attached = None
+        # owlna.pool.ConnectionPool connection return
+        self._release = None
+        self.timeline = QueryTimeline()
 
         self.connection = connection
 
@@ -46,15 +70,15 @@ class Cursor:
 
     @property
     def done(self) -> bool:
-        if self.__status is None:
+        if self._status is None:
             self.get_query_execution()
-        return self.__status is not None
+        return self._status is not None
 
     @property
     def status(self) -> dict:
-        if self.__status is None:
+        if self._status is None:
             return self.get_query_execution()["Status"]
-        return self.__status
+        return self._status
 
     @property
     def state(self) -> str:
@@ -62,21 +86,63 @@ class Cursor:
 
     @property
     def statistics(self) -> dict:
-        if self.__status is None:
+        if self._statistics is None:
             return self.get_query_execution()["Statistics"]
-        return self.__status
+        return self._statistics
+
+    @property
+    def reused_previous_result(self) -> bool:
+        """
+        Athena served results of a previous execution, see execute(result_reuse_max_age=)
+        """
+        return self.statistics.get("ResultReuseInformation", {}).get("ReusedPreviousResult", False)
 
     @property
     def result(self) -> dict:
-        if self.__result is None:
+        if self._result is None:
             return self.get_query_execution()["ResultConfiguration"]
-        return self.__result
+        return self._result
 
     @property
     def schema_arrow(self) -> Schema:
-        if self._schema_arrow is None:
+        if self._schema_arrow is None and self.cache_path is not None:
+            self._schema_arrow = self.connection.cache.open(self.cache_path).schema
+        elif self._schema_arrow is None and self.result_format == "parquet":
+            self._schema_arrow = self.dataset().schema
+        elif self._schema_arrow is None:
             self.wait()
-            self._schema_arrow = schema(
+            self._schema_arrow = self.connection.schemas.get(self.id)
+
+            if self._schema_arrow is None:
+                self._schema_arrow = self.fetch_schema_arrow()
+                self.connection.schemas[self.id] = self._schema_arrow
+        return self._schema_arrow
+
+    def schema_arrow_future(self) -> Future:
+        """
+        Resolve self.schema_arrow in connection.executor, to overlap with data download
+        """
+        if self._schema_arrow is None:
+            return self.connection.executor.submit(lambda: self.schema_arrow)
+
+        future = Future()
+        future.set_result(self._schema_arrow)
+        return future
+
+    def fetch_schema_arrow(self) -> Schema:
+        """
+        Read result schema from <OutputLocation>.metadata file written by Athena,
+        fallback on client.get_query_results(MaxResults=1)
+        """
+        try:
+            with self.s3fs.open_input_stream(self.output_location[5:] + ".metadata") as stream:
+                columns = decode_csv_metadata(stream.read())
+
+            if not columns:
+                raise ValueError("Empty result metadata")
+            return schema([query_result_column_to_pyarrow_field(_) for _ in columns])
+        except (OSError, ValueError, KeyError, IndexError):
+            return schema(
                 [
                     query_result_column_to_pyarrow_field(_)
                     for _ in self.client.get_query_results(
@@ -84,58 +150,176 @@ class Cursor:
                     )["ResultSet"]["ResultSetMetadata"]["ColumnInfo"]
                 ]
             )
-        return self._schema_arrow
 
     @property
     def output_location(self) -> str:
+        if "OutputLocation" not in self.result:
+            raise ValueError("%s result has no OutputLocation, cached without query metadata" % self)
         return self.result["OutputLocation"]
 
+    @property
+    def cache_metadata(self) -> dict:
+        """
+        Query metadata written with connection.cache entries, restored on cache hits
+        """
+        return {"QueryExecutionId": self.id, "ResultConfiguration": self.result}
+
     @property
     def query_options(self) -> dict:
         return self.connection.query_options
 
     def get_query_execution(self) -> dict:
-        meta = self.client.get_query_execution(QueryExecutionId=self.id)["QueryExecution"]
+        with self.timeline.timer("poll"):
+            meta = self.client.get_query_execution(QueryExecutionId=self.id)["QueryExecution"]
+        self.timeline.count("polls")
+        self.persist(meta)
+        return meta
 
-        # persist
+    def persist(self, meta: dict):
         if meta["Status"]["State"] in QueryStates.DONE_STATES.value:
-            self.__status = meta["Status"]
-            self.__statistics = meta["Statistics"]
-            self.__result = meta["ResultConfiguration"]
+            self._status = meta["Status"]
+            self._statistics = meta["Statistics"]
+            self._result = meta["ResultConfiguration"]
 
-        return meta
+            if self.connection.single_flight is not None and self.id:
+                self.connection.single_flight.done(self.id)
+
+            if self.timeline.finish(meta):
+                self.emit("done")
+
+    def emit(self, event: str):
+        """
+        Call connection.hooks with event and self.timeline
+
+        :param event: 'done' = query reached a done state, 'fetched' = result read
+        """
+        for hook in self.connection.hooks:
+            hook(event, self.timeline)
 
     def unpersist(self):
-        self.__status = None
-        self.__statistics = None
-        self.__result = None
+        self._status = None
+        self._statistics = None
+        self._result = None
         self._schema_arrow = None
 
     def close(self):
         self.closed = True
+        self.cleanup()
+        self.detach()
+
+        if self._release is not None:
+            self._release()
+            self._release = None
+
+    def cleanup(self):
+        """
+        Remove UNLOAD temporary files, also called on close and garbage collection
+        """
+        if self._cleanup is not None:
+            self._cleanup()
+            self._cleanup = None
+
+    def detach(self) -> int:
+        """
+        Detach from connection.single_flight execution, released when no other cursor is attached
+
+        :return: remaining attached cursors
+        """
+        if self._attached is None:
+            return 0
+
+        query_id, self._attached = self._attached, None
+        return self.connection.single_flight.detach(query_id)
 
     def execute(
         self,
         query: str,
-        wait: Union[float, bool] = DEFAULT_CURSOR_WAIT,
+        wait: Union[float, bool, PollingStrategy] = True,
+        result_format: str = "csv",
+        result_compression: str = "SNAPPY",
+        cache: bool = True,
+        result_reuse_max_age: Optional[int] = None,
+        single_flight: bool = True,
         **kwargs
     ) -> "Cursor":
         """
         See https://boto3.amazonaws.com/v1/documentation/api/latest/reference/services/athena.html#Athena.Client.start_query_execution
 
         :param query:
-        :param wait: wait query to be done with self.wait(tick=wait)
+        :param wait: wait query to be done with self.wait(tick=wait), False to return directly
+        :param result_format: 'csv' = Athena query result file
+            'parquet' = UNLOAD SELECT query to a temporary prefix in connection.output_location,
+            read as pyarrow.dataset with exact types, removed on self.close()
+        :param result_compression: UNLOAD parquet compression
+        :param cache: use connection.cache owlna.cache.ResultCache if set,
+            hits are served from local Arrow IPC files without calling Athena
+        :param result_reuse_max_age: Athena query result reuse, in minutes, reuse results
+            of an identical query run less than result_reuse_max_age minutes ago
+        :param single_flight: attach to an identical in flight query if connection.single_flight is set
         :param kwargs: other boto3 kwargs
         """
-        self.id = self.client.start_query_execution(
-            QueryString=query,
-            **{
-                k: v for k, v in kwargs.items() if k not in self.query_options
-            },
-            **{
-                k: v for k, v in self.query_options.items() if k not in kwargs
+        self.cleanup()
+        self.detach()
+        self.result_format = result_format
+        self.cache_key, self.cache_path = None, None
+        options = {
+            **{k: v for k, v in self.query_options.items() if k not in kwargs},
+            **kwargs
+        }
+
+        self.timeline = QueryTimeline(options.get("WorkGroup", "primary"))
+
+        if result_reuse_max_age is not None:
+            options["ResultReuseConfiguration"] = {
+                "ResultReuseByAgeConfiguration": {
+                    "Enabled": result_reuse_max_age > 0,
+                    "MaxAgeInMinutes": result_reuse_max_age
+                }
             }
-        )["QueryExecutionId"]
+
+        if cache and self.connection.cache is not None:
+            self.cache_key = self.connection.cache.key(query, result_format, **options)
+            self.cache_path = self.connection.cache.get(self.cache_key) if self.cache_key is not None else None
+
+            if self.cache_path is not None:
+                self.id = None
+                self.timeline.count("cache_hits")
+                self.unpersist()
+                self.persist({
+                    "Status": {"State": QueryStates.SUCCEEDED.value},
+                    "Statistics": {},
+                    # original query result, its OutputLocation may be expired
+                    "ResultConfiguration": self.connection.cache.metadata(self.cache_path).get(
+                        "ResultConfiguration", {}
+                    )
+                })
+                return self
+
+        if result_format == "parquet":
+            self.unload_location = "%s/owlna-unload/%s/" % (
+                self.connection.output_location(**kwargs).rstrip("/"), uuid.uuid4().hex
+            )
+            self._cleanup = weakref.finalize(self, delete_dir, self.s3fs, self.unload_location[5:])
+            self.unload_query = (query.strip().rstrip(";"), kwargs)
+            query = "UNLOAD (%s) TO '%s' WITH (format = 'PARQUET', compression = '%s')" % (
+                query.strip().rstrip(";"), self.unload_location, result_compression
+            )
+        elif result_format == "csv":
+            self.unload_location, self.unload_query = None, None
+        else:
+            raise ValueError("Unknown result_format '%s', must be 'csv' or 'parquet'" % result_format)
+
+        key = SingleFlight.key(query, **options) \
+            if single_flight and self.connection.single_flight is not None else None
+
+        with self.timeline.timer("submit"):
+            if key is None:
+                self.id = self.client.start_query_execution(QueryString=query, **options)["QueryExecutionId"]
+            else:
+                self.id = self._attached = self.connection.single_flight.start(
+                    key, lambda: self.client.start_query_execution(QueryString=query, **options)["QueryExecutionId"]
+                )
+        self.timeline.query_id = self.id
         self.unpersist()
 
         if wait:
@@ -144,18 +328,49 @@ class Cursor:
         return self
 
     def stop(self):
+        """
+        Stop query, single flight executions are stopped when no other cursor is attached
+        """
         if self.id:
-            self.client.stop_query_execution(QueryExecutionId=self.id)
+            if self._attached is None or self.detach() == 0:
+                self.client.stop_query_execution(QueryExecutionId=self.id)
 
     def __await__(self):
-        self.wait()
+        from .async_cursor import AsyncCursor
 
-    def wait(self, tick: Union[float, bool] = DEFAULT_CURSOR_WAIT, raise_error: bool = True):
-        if isinstance(tick, bool):
-            tick = DEFAULT_CURSOR_WAIT
+        yield from AsyncCursor(self).wait().__await__()
+        return self
+
+    def future(self) -> Future:
+        """
+        Future resolved with self when query is done, polled by connection.poller
+        """
+        if self._status is None:
+            return self.connection.poller.track(self)
+
+        future = Future()
+        future.set_result(self)
+        return future
+
+    def wait(self, tick: Union[float, bool, PollingStrategy] = True, raise_error: bool = True):
+        """
+        Poll query execution until done
+
+        :param tick: float seconds between polls, True for exponential backoff,
+            or owlna.polling.PollingStrategy
+            ignored with connection.shared_polling, see owlna.poller.QueryPoller
+        :param raise_error: raise AthenaError / CancelledQuery if query did not succeed
+        """
+        polling = polling_strategy(tick)
         try:
-            while not self.done:
-                time.sleep(tick)
+            if self.connection.shared_polling and self._status is None:
+                self.future().result()
+
+            while self._status is None:
+                meta = self.get_query_execution()
+
+                if self._status is None:
+                    time.sleep(polling.next_interval(meta))
         except BaseException as e:
             self.stop()
             raise e
@@ -184,16 +399,133 @@ class Cursor:
         column_types: dict[str, DataType] = {}
     ):
         if include_columns:
+            # in include_columns order, like pyarrow.csv.ConvertOptions
+            fields = {field.name: field.type for field in self.schema_arrow}
             return {
-                field.name: column_types.get(field.name, field.type)
-                for field in self.schema_arrow
-                if field.name in include_columns
+                name: column_types.get(name, fields[name])
+                for name in include_columns
+                if name in fields
             }
         return {
             field.name: column_types.get(field.name, field.type)
             for field in self.schema_arrow
         }
 
+    # UNLOAD parquet
+    def dataset(self) -> pds.Dataset:
+        self.wait()
+
+        try:
+            dataset = pds.dataset(self.unload_location[5:], filesystem=self.s3fs, format="parquet")
+            if dataset.files:
+                return dataset
+        except FileNotFoundError:
+            pass
+        # UNLOAD without rows writes no file
+        return pds.dataset([], schema=self.unload_schema_arrow())
+
+    def unload_schema_arrow(self) -> Schema:
+        """
+        UNLOAD SELECT query result schema, from a LIMIT 0 csv query: UNLOAD results have no column metadata
+        """
+        query, kwargs = self.unload_query
+
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT * FROM (%s) LIMIT 0" % query, cache=False, single_flight=False, **kwargs
+            )
+            return cursor.schema_arrow
+
+    def dataset_scanner(self, include_columns: Iterable[str] = ()) -> pds.Scanner:
+        return self.dataset().scanner(
+            columns=list(include_columns) if include_columns else None,
+            use_threads=True
+        )
+
+    @staticmethod
+    def cast_column_types(
+        data: Union[RecordBatch, Table],
+        column_types: dict[str, DataType] = {},
+        include_columns: Iterable[str] = ()
+    ):
+        if column_types or include_columns:
+            return cast_batch(data, schema([
+                (field.name, column_types.get(field.name, field.type))
+                for field in data.schema
+                if not include_columns or field.name in include_columns
+            ]))
+        return data
+
+    def cast(
+        self,
+        data: Union[RecordBatch, Table],
+        column_types: dict[str, DataType] = {},
+        include_columns: Iterable[str] = ()
+    ):
+        with self.timeline.timer("cast"):
+            return self.cast_column_types(data, column_types, include_columns)
+
+    # cache
+    def cached_arrow_batches(
+        self,
+        include_columns: Iterable[str] = (),
+        column_types: dict[str, DataType] = {}
+    ) -> Generator[RecordBatch, None, None]:
+        reader = self.connection.cache.open(self.cache_path)
+
+        for i in range(reader.num_record_batches):
+            yield self.cast(reader.get_batch(i), column_types, include_columns)
+
+    def cached_arrow(
+        self,
+        include_columns: Iterable[str] = (),
+        column_types: dict[str, DataType] = {}
+    ) -> Table:
+        return self.cast(
+            self.connection.cache.open(self.cache_path).read_all(), column_types, include_columns
+        )
+
+    def csv_options(
+        self,
+        block_size: int = 44040192,  # 42 Mb = 42 * 1024 **2
+        include_columns: Iterable[str] = (),
+        column_types: dict[str, DataType] = {},
+        strings_can_be_null: bool = True,
+        delimiter: str = ",",
+        quote_char: str = '"',
+        decimal_point: str = '.',
+        **read_options
+    ) -> tuple[pcsv.ReadOptions, pcsv.ParseOptions, pcsv.ConvertOptions]:
+        """
+        CSV options matching Athena result files, typed in the CSV decoder without a second cast
+
+        Athena quotes every value and writes NULL as an empty unquoted field: "" stays an empty string,
+        NaN / Infinity are floats, booleans are true / false, timestamps 2022-01-01 00:00:00.000
+        String values may contain newlines
+        """
+        return (
+            pcsv.ReadOptions(
+                block_size=block_size,
+                **read_options
+            ),
+            pcsv.ParseOptions(
+                delimiter=delimiter,
+                quote_char=quote_char,
+                newlines_in_values=True
+            ),
+            pcsv.ConvertOptions(
+                column_types=self.csv_column_types(include_columns, column_types),
+                null_values=[""],
+                true_values=["true"],
+                false_values=["false"],
+                strings_can_be_null=strings_can_be_null,
+                quoted_strings_can_be_null=False,
+                timestamp_parsers=[pcsv.ISO8601],
+                include_columns=include_columns,
+                decimal_point=decimal_point
+            )
+        )
+
     # fetch
     def fetch_arrow_batches(
         self,
@@ -205,33 +537,67 @@ class Cursor:
         quote_char: str = '"',
         decimal_point: str = '.',
         compression: Optional[str] = None,
+        parallel: Union[int, bool] = 0,
+        ordered: bool = True,
+        prefetch: int = 0,
         **read_options
     ) -> Generator[RecordBatch, None, None]:
-        column_types = self.csv_column_types(include_columns, column_types)
-
-        with self.s3fs.open_input_stream(
-            self.output_location[5:],
-            compression=compression,
-            buffer_size=block_size
-        ) as stream:
-            for batch in pcsv.open_csv(
-                stream,
-                read_options=pcsv.ReadOptions(
-                    block_size=block_size,
-                    **read_options
-                ),
-                parse_options=pcsv.ParseOptions(
-                    delimiter=delimiter,
-                    quote_char=quote_char
+        """
+        Read query result as pyarrow.RecordBatch
+
+        Served from connection.cache on hit, written to it when reading all columns
+
+        :param block_size: CSV block size, byte range size with parallel
+        :param include_columns: columns to read, default all
+        :param column_types: override schema_arrow types
+        :param strings_can_be_null:
+        :param delimiter:
+        :param quote_char:
+        :param decimal_point:
+        :param compression: input stream compression, disables parallel
+        :param parallel: number of concurrent byte range downloads and parsers, True for default
+            0 = single sequential stream
+            memory is bounded by about 2 * parallel * block_size
+        :param ordered: with parallel, keep result order, else yield batches as soon as parsed
+        :param prefetch: download and parse on a background thread, at most prefetch batches ahead
+            0 = on the caller thread
+        :param read_options: other pyarrow.csv.ReadOptions
+        """
+        if prefetch > 0:
+            yield from prefetched(
+                self.fetch_arrow_batches(
+                    block_size, include_columns, column_types, strings_can_be_null,
+                    delimiter, quote_char, decimal_point, compression,
+                    parallel=parallel, ordered=ordered, **read_options
                 ),
-                convert_options=pcsv.ConvertOptions(
-                    column_types=column_types,
-                    strings_can_be_null=strings_can_be_null,
-                    include_columns=include_columns,
-                    decimal_point=decimal_point
-                )
-            ):
-                yield batch
+                prefetch
+            )
+            return
+
+        self.timeline.start_fetch()
+        start = time.perf_counter()
+
+        if self.cache_path is not None:
+            batches = self.cached_arrow_batches(include_columns, column_types)
+        else:
+            batches = self.read_arrow_batches(
+                    block_size, include_columns, column_types, strings_can_be_null,
+                    delimiter, quote_char, decimal_point, compression,
+                    parallel=parallel, ordered=ordered, **read_options
+            )
+
+            if self.cache_key is not None and not include_columns and not column_types:
+                batches = self.connection.cache.write(self.cache_key, batches, metadata=self.cache_metadata)
+
+        for batch in batches:
+            if not self.timeline.counters["batches"]:
+                self.timeline.add("first_batch", time.perf_counter() - start)
+            self.timeline.count("batches")
+            self.timeline.count("rows", batch.num_rows)
+            yield batch
+
+        self.timeline.add("fetch", time.perf_counter() - start)
+        self.emit("fetched")
 
     def fetch_arrow(
         self,
@@ -243,33 +609,262 @@ class Cursor:
         quote_char: str = '"',
         decimal_point: str = '.',
         compression: Optional[str] = None,
+        parallel: Union[int, bool] = 0,
+        ordered: bool = True,
+        small_result: Union[bool, int, None] = None,
         **read_options
-    ):
-        column_types = self.csv_column_types(include_columns, column_types)
-
-        with self.s3fs.open_input_stream(
-            self.output_location[5:],
-            compression=compression,
-            buffer_size=block_size
-        ) as stream:
-            return pcsv.read_csv(
-                stream,
-                read_options=pcsv.ReadOptions(
+    ) -> Table:
+        """
+        Read query result as pyarrow.Table, see self.fetch_arrow_batches
+
+        :param small_result: read small CSV results with get_query_results pages, without S3
+            None = if DataScannedInBytes <= DEFAULT_SMALL_RESULT_SIZE and at most DEFAULT_SMALL_RESULT_PAGES pages
+            int = same with this DataScannedInBytes threshold
+            True = always, all pages
+            False = never
+        """
+        self.timeline.start_fetch()
+        start = time.perf_counter()
+
+        if self.cache_path is not None:
+            table = self.cached_arrow(include_columns, column_types)
+        else:
+            table = self.fetch_small_result(small_result, strings_can_be_null)
+
+            if table is not None:
+                if self.cache_key is not None:
+                    self.connection.cache.put(self.cache_key, table, self.cache_metadata)
+                table = self.cast(table, column_types, include_columns)
+            else:
+                table = self.read_arrow(
+                        block_size, include_columns, column_types, strings_can_be_null,
+                        delimiter, quote_char, decimal_point, compression,
+                        parallel=parallel, ordered=ordered, **read_options
+                )
+
+                if self.cache_key is not None and not include_columns and not column_types:
+                    self.connection.cache.put(self.cache_key, table, self.cache_metadata)
+
+        self.timeline.count("rows", table.num_rows)
+        self.timeline.add("fetch", time.perf_counter() - start)
+        self.emit("fetched")
+        return table
+
+    def fetch_small_result(
+        self,
+        small_result: Union[bool, int, None] = None,
+        strings_can_be_null: bool = True
+    ) -> Optional[Table]:
+        """
+        See self.fetch_arrow small_result
+
+        :return: None if the result must be read from S3, also when text values cannot be converted
+        """
+        if small_result is False or self.result_format != "csv":
+            return None
+
+        self.wait()
+
+        if small_result is not True:
+            threshold = DEFAULT_SMALL_RESULT_SIZE if small_result is None else small_result
+            if self.statistics.get("DataScannedInBytes", threshold + 1) > threshold:
+                return None
+
+        try:
+            return self.fetch_query_results(
+                max_pages=None if small_result is True else DEFAULT_SMALL_RESULT_PAGES,
+                strings_can_be_null=strings_can_be_null
+            )
+        except (ArrowInvalid, ArrowNotImplementedError):
+            # CSV reader parses what text conversion cannot
+            return None
+
+    def fetch_query_results(
+        self,
+        max_pages: Optional[int] = None,
+        page_size: int = 1000,
+        strings_can_be_null: bool = True
+    ) -> Optional[Table]:
+        """
+        Read query result with client.get_query_results, converted column by column
+
+        :param max_pages: maximum get_query_results calls, None = all pages
+        :param page_size: MaxResults
+        :param strings_can_be_null: like CSV reads, False = null strings as ''
+        :return: None if the result has more than max_pages pages
+        """
+        self.wait()
+        kwargs = {"QueryExecutionId": self.id, "MaxResults": page_size}
+        fields, columns, pages = None, None, 0
+
+        while True:
+            with self.timeline.timer("download"):
+                page = self.client.get_query_results(**kwargs)
+            self.timeline.count("pages")
+            rows = page["ResultSet"]["Rows"]
+
+            if fields is None:
+                infos = page["ResultSet"]["ResultSetMetadata"]["ColumnInfo"]
+                fields = [query_result_column_to_pyarrow_field(_) for _ in infos]
+                columns = [[] for _ in fields]
+
+                # SELECT results start with a header row
+                if rows and [_.get("VarCharValue") for _ in rows[0]["Data"]] == [_["Label"] for _ in infos]:
+                    rows = rows[1:]
+
+            for i, values in enumerate(columns):
+                values.extend([row["Data"][i].get("VarCharValue") for row in rows])
+
+            pages += 1
+            if "NextToken" not in page:
+                break
+            if max_pages is not None and pages >= max_pages:
+                return None
+            kwargs["NextToken"] = page["NextToken"]
+
+        if self._schema_arrow is None:
+            self._schema_arrow = schema(fields)
+            self.connection.schemas[self.id] = self._schema_arrow
+
+        if not strings_can_be_null:
+            columns = [
+                ["" if _ is None else _ for _ in values] if is_string(f.type) or is_large_string(f.type) else values
+                for values, f in zip(columns, fields)
+            ]
+
+        with self.timeline.timer("parse"):
+            return Table.from_arrays(
+                [strings_to_array(values, f.type) for values, f in zip(columns, fields)],
+                schema=schema(fields)
+            )
+
+    @contextmanager
+    def open_result_stream(self, compression: Optional[str], block_size: int) -> Generator[NativeFile, None, None]:
+        """
+        Result CSV object as buffered input stream, downloaded bytes counted on exit
+
+        :param compression: pyarrow compression name, None = uncompressed
+        :param block_size: buffer size
+        """
+        with self.s3fs.open_input_file(self.output_location[5:]) as file:
+            with input_stream(file, compression=compression, buffer_size=block_size) as stream:
+                try:
+                    yield stream
+                finally:
+                    # read position of the object, streams cannot tell
+                    self.timeline.count("bytes", file.tell())
+
+    def read_arrow_batches(
+        self,
+        block_size: int = 44040192,  # 42 Mb = 42 * 1024 **2
+        include_columns: Iterable[str] = (),
+        column_types: dict[str, DataType] = {},
+        strings_can_be_null: bool = True,
+        delimiter: str = ",",
+        quote_char: str = '"',
+        decimal_point: str = '.',
+        compression: Optional[str] = None,
+        parallel: Union[int, bool] = 0,
+        ordered: bool = True,
+        **read_options
+    ) -> Generator[RecordBatch, None, None]:
+        if self.result_format == "parquet":
+            for batch in self.timeline.timed(self.dataset_scanner(include_columns).to_batches(), "read"):
+                yield self.cast(batch, column_types)
+            return
+
+        self.wait()
+        schema_future = self.schema_arrow_future()
+
+        if parallel and not compression:
+            with self.s3fs.open_input_file(self.output_location[5:]) as file:
+                schema_future.result()
+                read_options, parse_options, convert_options = self.csv_options(
+                    block_size, include_columns, column_types, strings_can_be_null,
+                    delimiter, quote_char, decimal_point, **read_options
+                )
+
+                for batch in read_csv_ranges(
+                    file,
+                    column_names=self.schema_arrow.names,
+                    read_options=read_options,
+                    parse_options=parse_options,
+                    convert_options=convert_options,
                     block_size=block_size,
-                    **read_options
-                ),
-                parse_options=pcsv.ParseOptions(
-                    delimiter=delimiter,
-                    quote_char=quote_char
-                ),
-                convert_options=pcsv.ConvertOptions(
-                    column_types=column_types,
-                    strings_can_be_null=strings_can_be_null,
-                    include_columns=include_columns,
-                    decimal_point=decimal_point
+                    max_workers=DEFAULT_MAX_WORKERS if parallel is True else parallel,
+                    ordered=ordered,
+                    timeline=self.timeline
+                ):
+                    yield batch
+                self.timeline.count("bytes", file.size())
+        else:
+            with self.open_result_stream(compression, block_size) as stream:
+                schema_future.result()
+                read_options, parse_options, convert_options = self.csv_options(
+                    block_size, include_columns, column_types, strings_can_be_null,
+                    delimiter, quote_char, decimal_point, **read_options
                 )
+
+                with self.timeline.timer("read"):
+                    batches = pcsv.open_csv(
+                        stream,
+                        read_options=read_options,
+                        parse_options=parse_options,
+                        convert_options=convert_options
+                    )
+
+                for batch in self.timeline.timed(batches, "read"):
+                    yield batch
+
+    def read_arrow(
+        self,
+        block_size: int = 44040192,  # 42 Mb = 42 * 1024 **2
+        include_columns: Iterable[str] = (),
+        column_types: dict[str, DataType] = {},
+        strings_can_be_null: bool = True,
+        delimiter: str = ",",
+        quote_char: str = '"',
+        decimal_point: str = '.',
+        compression: Optional[str] = None,
+        parallel: Union[int, bool] = 0,
+        ordered: bool = True,
+        **read_options
+    ) -> Table:
+        if self.result_format == "parquet":
+            with self.timeline.timer("read"):
+                data = self.dataset_scanner(include_columns).to_table()
+            return self.cast(data, column_types)
+        elif parallel and not compression:
+            column_types = self.csv_column_types(include_columns, column_types)
+
+            return Table.from_batches(
+                list(self.read_arrow_batches(
+                    block_size, include_columns, column_types, strings_can_be_null,
+                    delimiter, quote_char, decimal_point, compression,
+                    parallel=parallel, ordered=ordered, **read_options
+                )),
+                schema=schema(list(column_types.items()))
             )
 
+        self.wait()
+        schema_future = self.schema_arrow_future()
+
+        with self.open_result_stream(compression, block_size) as stream:
+            schema_future.result()
+            read_options, parse_options, convert_options = self.csv_options(
+                block_size, include_columns, column_types, strings_can_be_null,
+                delimiter, quote_char, decimal_point, **read_options
+            )
+
+            with self.timeline.timer("read"):
+                data = pcsv.read_csv(
+                    stream,
+                    read_options=read_options,
+                    parse_options=parse_options,
+                    convert_options=convert_options
+                )
+            return data
+
     def reader(
         self,
         block_size: int = 44040192,  # 42 Mb = 42 * 1024 **2
@@ -280,8 +875,24 @@ class Cursor:
         quote_char: str = '"',
         decimal_point: str = '.',
         compression: Optional[str] = None,
+        parallel: Union[int, bool] = 0,
+        ordered: bool = True,
+        prefetch: int = 0,
         **read_options
-    ):
+    ) -> RecordBatchReader:
+        """
+        Query result as pyarrow.RecordBatchReader, see self.fetch_arrow_batches
+        """
+        if self.cache_path is not None:
+            reader = self.connection.cache.open(self.cache_path)
+
+            if not include_columns and not column_types:
+                return RecordBatchReader.from_batches(
+                    reader.schema, (reader.get_batch(i) for i in range(reader.num_record_batches))
+                )
+        elif self.result_format == "parquet" and not column_types and self.cache_key is None:
+            return self.dataset_scanner(include_columns).to_reader()
+
         return RecordBatchReader.from_batches(
             self.schema_arrow,
             self.fetch_arrow_batches(
@@ -293,6 +904,16 @@ class Cursor:
                 quote_char,
                 decimal_point,
                 compression,
+                parallel=parallel,
+                ordered=ordered,
+                prefetch=prefetch,
                 **read_options
             )
         )
+
+
+def delete_dir(filesystem: FileSystem, path: str):
+    try:
+        filesystem.delete_dir(path)
+    except (FileNotFoundError, OSError):
+        pass
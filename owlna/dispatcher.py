@@ -0,0 +1,134 @@
+__all__ = ["QueryDispatcher"]
+
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+from .config import DEFAULT_MAX_CONCURRENCY, DEFAULT_START_QUERY_RATE
+from .exception import OwlnaException
+from .utils.ratelimit import TokenBucket
+
+
+class QueryDispatcher:
+    """
+    Admit submitted queries within Athena quotas
+
+    Queries wait in a priority queue, lowest priority value first then submission order,
+    and are started when a concurrency slot and a StartQueryExecution token are available
+    Slots are released when connection.poller sees the query done
+    """
+
+    def __init__(
+        self,
+        connection: "Connection",
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        rate: float = DEFAULT_START_QUERY_RATE,
+        burst: Optional[float] = None
+    ):
+        """
+        :param connection: owlna.Connection
+        :param max_concurrency: maximum running queries
+        :param rate: maximum started queries per second
+        :param burst: started queries burst, default rate
+        """
+        self.connection = connection
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(rate, burst)
+
+        self.queue: list[tuple] = []
+        self.counter = itertools.count()
+        self.slots = threading.Semaphore(max_concurrency)
+        self.lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        self.closed = False
+
+        self.started = 0
+        self.running = 0
+        self.peak = 0
+
+    def __repr__(self):
+        return "QueryDispatcher(queued=%s, running=%s, started=%s)" % (len(self.queue), self.running, self.started)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def submit(self, query: str, priority: float = 0, **kwargs) -> Future:
+        """
+        :param query: SQL query
+        :param priority: lower values are started first
+        :param kwargs: Cursor.execute kwargs
+        :return: Future resolved with the done owlna.Cursor
+        """
+        future = Future()
+
+        with self.lock:
+            if self.closed:
+                raise OwlnaException("%s is closed" % repr(self))
+
+            heapq.heappush(self.queue, (priority, next(self.counter), query, kwargs, future))
+
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="owlna-dispatcher", daemon=True)
+                self.thread.start()
+
+        return future
+
+    def close(self):
+        """
+        Cancel queued queries, running ones are left running
+        """
+        with self.lock:
+            self.closed = True
+            queue, self.queue = self.queue, []
+
+        for _, _, _, _, future in queue:
+            future.cancel()
+
+    def run(self):
+        while True:
+            self.slots.acquire()
+
+            with self.lock:
+                if not self.queue:
+                    self.thread = None
+                    self.slots.release()
+                    return
+                _, _, query, kwargs, future = heapq.heappop(self.queue)
+
+            if not future.set_running_or_notify_cancel():
+                self.slots.release()
+                continue
+
+            self.bucket.acquire()
+
+            try:
+                cursor = self.connection.cursor().execute(query, wait=False, **kwargs)
+                polled = cursor.future()
+            except BaseException as e:
+                self.slots.release()
+                future.set_exception(e)
+                continue
+
+            with self.lock:
+                self.started += 1
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+
+            polled.add_done_callback(lambda _, cursor=cursor, future=future: self.done(_, cursor, future))
+
+    def done(self, polled: Future, cursor: "Cursor", future: Future):
+        with self.lock:
+            self.running -= 1
+        self.slots.release()
+
+        if polled.cancelled():
+            future.set_exception(OwlnaException("%s polling cancelled" % repr(cursor)))
+        elif polled.exception() is not None:
+            future.set_exception(polled.exception())
+        else:
+            future.set_result(cursor)
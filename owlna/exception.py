@@ -2,7 +2,8 @@ __all__ = [
     "OwlnaBaseException",
     "OwlnaException",
     "CancelledQuery",
-    "AthenaError"
+    "AthenaError",
+    "CompactionError"
 ]
 
 from asyncio import CancelledError
@@ -31,3 +32,21 @@ class AthenaError(OwlnaException):
         self.message = message
 
         super().__init__(full_message)
+
+
+class CompactionError(OwlnaException):
+    """
+    Table.compact published new files but could not delete remaining old files: rows are duplicated
+    until the remaining paths are deleted
+    """
+
+    def __init__(self, directory: str, remaining: list[str], error: BaseException):
+        self.directory = directory
+        self.remaining = remaining
+        self.error = error
+
+        super().__init__(
+            "Compacted partition '%s' keeps %s old files, delete them to remove duplicates: %s (%s)" % (
+                directory, len(remaining), remaining, error
+            )
+        )
@@ -0,0 +1,91 @@
+__all__ = ["ManagedS3FileSystem", "s3filesystem_options"]
+
+import threading
+from typing import Optional
+
+import pyarrow.fs
+from boto3 import Session
+from pyarrow.fs import S3FileSystem
+
+from .config import DEFAULT_S3_CONNECT_TIMEOUT, DEFAULT_S3_REQUEST_TIMEOUT, DEFAULT_S3_MAX_ATTEMPTS, \
+    DEFAULT_S3_BACKGROUND_WRITES
+
+
+def s3filesystem_options(
+    connect_timeout: Optional[float] = DEFAULT_S3_CONNECT_TIMEOUT,
+    request_timeout: Optional[float] = DEFAULT_S3_REQUEST_TIMEOUT,
+    max_attempts: int = DEFAULT_S3_MAX_ATTEMPTS,
+    background_writes: bool = DEFAULT_S3_BACKGROUND_WRITES,
+    **kwargs
+) -> dict:
+    """
+    S3FileSystem kwargs with owlna defaults
+
+    :param connect_timeout: seconds
+    :param request_timeout: seconds
+    :param max_attempts: AwsStandardS3RetryStrategy max attempts, PyArrow >= 10
+    :param background_writes: upload output stream parts in background
+    :param kwargs: other S3FileSystem kwargs, override defaults
+    """
+    options = {
+        "connect_timeout": connect_timeout,
+        "request_timeout": request_timeout,
+        "background_writes": background_writes
+    }
+
+    # PyArrow 10
+    if hasattr(pyarrow.fs, "AwsStandardS3RetryStrategy"):
+        options["retry_strategy"] = pyarrow.fs.AwsStandardS3RetryStrategy(max_attempts=max_attempts)
+
+    options.update(kwargs)
+    return options
+
+
+class ManagedS3FileSystem:
+    """
+    S3FileSystem following boto3 session credentials
+
+    botocore refreshes expiring credentials (STS, SSO, instance profile) ahead of expiry,
+    self.filesystem is rebuilt as soon as the refreshed credentials differ
+    Streams opened on a previous filesystem keep it alive until closed
+    """
+
+    def __init__(self, session: Session, **kwargs):
+        """
+        :param session: boto3 Session
+        :param kwargs: S3FileSystem kwargs, see s3filesystem_options
+        """
+        self.session = session
+        self.options = s3filesystem_options(**kwargs)
+        self.credentials = None
+        self.refreshes = 0
+        self._filesystem = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "ManagedS3FileSystem(region='%s', refreshes=%s)" % (self.session.region_name, self.refreshes)
+
+    def frozen_credentials(self) -> tuple:
+        credentials = self.session.get_credentials().get_frozen_credentials()
+        return credentials.access_key, credentials.secret_key, credentials.token
+
+    @property
+    def filesystem(self) -> S3FileSystem:
+        credentials = self.frozen_credentials()
+
+        with self._lock:
+            if self._filesystem is None or credentials != self.credentials:
+                if self._filesystem is not None:
+                    self.refreshes += 1
+                self._filesystem = self.build(*credentials)
+                self.credentials = credentials
+            return self._filesystem
+
+    def build(self, access_key: str, secret_key: str, token: Optional[str]) -> S3FileSystem:
+        return S3FileSystem(
+            access_key=access_key,
+            secret_key=secret_key,
+            session_token=token,
+            region=self.session.region_name,
+            **self.options
+        )
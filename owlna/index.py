@@ -0,0 +1,265 @@
+__all__ = ["TableIndex"]
+
+import datetime
+import hashlib
+import os
+import threading
+import uuid
+from typing import Optional, Iterable, Iterator
+
+import pyarrow
+import pyarrow.compute as pc
+import pyarrow.ipc
+from pyarrow import Table as ArrowTable
+from pyarrow.dataset import FileSystemDataset, Dataset
+from pyarrow.fs import FileSystem, FileSelector, FileType, S3FileSystem
+
+from .config import DEFAULT_INDEX_DIR
+
+EXTENSION = ".arrow"
+INDEX_SCHEMA = pyarrow.schema([
+    # pyarrow filesystem path, 'bucket/key' on S3
+    ("path", pyarrow.string()),
+    ("size", pyarrow.int64()),
+    ("mtime", pyarrow.timestamp("ms", "UTC"))
+])
+REFRESH_MODES = {"start_after", "modified", "full"}
+
+
+def ignored(path: str) -> bool:
+    # like pyarrow.dataset discovery ignore_prefixes, and S3 console folder markers
+    return any(part.startswith((".", "_")) for part in path.split("/")) or path.endswith("$folder$")
+
+
+class TableIndex:
+    """
+    Table file listing persisted as local Arrow IPC file, refreshed incrementally
+
+    Listed once, then refresh(mode=):
+        'start_after' = list keys after the last indexed key, S3 ListObjectsV2 StartAfter,
+            for new partitions with increasing values like dates
+        'modified' = list all, add files not indexed yet, whatever their modification time:
+            S3 LastModified has second precision and is the upload start of multipart uploads
+        'full' = replace with a full listing, drops deleted files
+    """
+
+    def __init__(
+        self,
+        table: "owlna.table.Table",
+        filesystem: Optional[FileSystem] = None,
+        directory: str = DEFAULT_INDEX_DIR
+    ):
+        """
+        :param table: owlna.Table
+        :param filesystem: default table.s3fs
+        :param directory: local index directory
+        """
+        self.table = table
+        self._filesystem = filesystem
+        self.directory = directory
+        self.lock = threading.Lock()
+        self._files: Optional[ArrowTable] = None
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __repr__(self):
+        return "TableIndex('%s', files=%s)" % (self.table.location, len(self.files))
+
+    def __len__(self):
+        return len(self.files)
+
+    @property
+    def filesystem(self) -> FileSystem:
+        return self._filesystem if self._filesystem is not None else self.table.s3fs
+
+    @property
+    def root(self) -> str:
+        return self.table.pyarrow_location.rstrip("/")
+
+    @property
+    def path(self) -> str:
+        return os.path.join(
+            self.directory, hashlib.sha256(self.table.location.encode()).hexdigest() + EXTENSION
+        )
+
+    @property
+    def files(self) -> ArrowTable:
+        """
+        Indexed files: path, size, mtime; listed on first use if not persisted
+        """
+        if self._files is None:
+            with self.lock:
+                if self._files is None and os.path.exists(self.path):
+                    with pyarrow.ipc.open_file(self.path) as reader:
+                        self._files = reader.read_all()
+            if self._files is None:
+                self.refresh("full")
+        return self._files
+
+    @property
+    def watermark(self) -> Optional[datetime.datetime]:
+        """
+        Last indexed modification time
+        """
+        return pc.max(self.files["mtime"]).as_py() if len(self.files) else None
+
+    def save(self, files: ArrowTable):
+        temp = "%s.%s.tmp" % (self.path, uuid.uuid4().hex)
+        with pyarrow.ipc.new_file(temp, files.schema) as writer:
+            writer.write_table(files)
+        os.replace(temp, self.path)
+        self._files = files
+
+    def clear(self):
+        with self.lock:
+            self._files = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def list_files(self, start_after: Optional[str] = None) -> Iterator[tuple[str, int, datetime.datetime]]:
+        """
+        List data files under table location as (path, size, mtime)
+
+        :param start_after: path after which to list, keys in lexicographic order
+        """
+        filesystem = self.filesystem
+
+        if isinstance(filesystem, S3FileSystem) and self.table.connection is not None:
+            bucket, _, prefix = self.root.partition("/")
+            pages = self.table.connection.server.s3_client().get_paginator("list_objects_v2").paginate(
+                Bucket=bucket,
+                Prefix=prefix + "/",
+                **({"StartAfter": start_after.partition("/")[2]} if start_after else {})
+            )
+
+            for page in pages:
+                for obj in page.get("Contents", ()):
+                    path = bucket + "/" + obj["Key"]
+                    if not ignored(path[len(self.root):]):
+                        yield path, obj["Size"], obj["LastModified"]
+        else:
+            try:
+                infos = filesystem.get_file_info(FileSelector(self.root, recursive=True))
+            except FileNotFoundError:
+                return
+
+            for info in sorted(infos, key=lambda _: _.path):
+                if info.type == FileType.File and not ignored(info.path[len(self.root):]) \
+                        and (start_after is None or info.path > start_after):
+                    yield info.path, info.size, info.mtime
+
+    def refresh(self, mode: str = "start_after") -> int:
+        """
+        Update and persist the index
+
+        :param mode: 'start_after', 'modified' or 'full', see class doc
+        :return: number of new files
+        """
+        if mode not in REFRESH_MODES:
+            raise ValueError("Unknown refresh mode '%s', must be in %s" % (mode, sorted(REFRESH_MODES)))
+
+        with self.lock:
+            files = self._files
+            if files is None and os.path.exists(self.path):
+                with pyarrow.ipc.open_file(self.path) as reader:
+                    files = reader.read_all()
+
+            if files is None or mode == "full":
+                listed = self.to_arrow(self.list_files())
+                self.save(listed)
+                return len(listed) - (0 if files is None else len(files))
+
+            if mode == "start_after":
+                last = pc.max(files["path"]).as_py() if len(files) else None
+                listed = self.to_arrow(self.list_files(last))
+            else:
+                known = set(files["path"].to_pylist())
+                listed = self.to_arrow(_ for _ in self.list_files() if _[0] not in known)
+
+            if len(listed):
+                self.save(pyarrow.concat_tables([files, listed]))
+            return len(listed)
+
+    def add(self, files: Iterable[tuple[str, int, datetime.datetime]]):
+        """
+        Add written files without listing, like from Table.insert_arrow
+        """
+        with self.lock:
+            if self._files is None:
+                # not loaded, next use lists or refreshes
+                return
+            known = set(self._files["path"].to_pylist())
+            added = self.to_arrow(
+                _ for _ in files if _[0] not in known and not ignored(_[0][len(self.root):])
+            )
+
+            if len(added):
+                self.save(pyarrow.concat_tables([self._files, added]))
+
+    def remove(self, paths: Iterable[str]):
+        """
+        Remove deleted files without listing, like from Table.compact
+        """
+        with self.lock:
+            if self._files is None:
+                return
+            mask = pc.is_in(self._files["path"], pyarrow.array(list(paths), pyarrow.string()))
+
+            if pc.any(mask).as_py():
+                self.save(self._files.filter(pc.invert(mask)))
+
+    @staticmethod
+    def to_arrow(files: Iterable[tuple[str, int, datetime.datetime]]) -> ArrowTable:
+        paths, sizes, mtimes = [], [], []
+        for path, size, mtime in files:
+            paths.append(path)
+            sizes.append(size)
+            mtimes.append(mtime)
+        return ArrowTable.from_arrays(
+            [
+                pyarrow.array(paths, pyarrow.string()),
+                pyarrow.array(sizes, pyarrow.int64()),
+                pyarrow.array(mtimes, pyarrow.timestamp("ms", "UTC"))
+            ],
+            schema=INDEX_SCHEMA
+        )
+
+    def partition_dir(self, path: str) -> str:
+        """
+        Partition directory relative to table root, '' when not partitioned
+        """
+        return path[len(self.root) + 1:].rpartition("/")[0]
+
+    def partitions(self) -> list[dict[str, str]]:
+        """
+        Distinct hive partition values of indexed files, in path order
+        """
+        directories = dict.fromkeys(self.partition_dir(_) for _ in self.files["path"].to_pylist())
+        names = set(self.table.partitioning.schema.names)
+
+        return [
+            values for values in (
+                dict(_.split("=", 1) for _ in directory.split("/") if "=" in _)
+                for directory in directories if directory
+            )
+            if set(values) == names
+        ]
+
+    def dataset(self, filesystem: Optional[FileSystem] = None) -> Dataset:
+        """
+        pyarrow.dataset.FileSystemDataset from indexed files, no listing
+        """
+        paths = self.files["path"].to_pylist()
+        partitioning = self.table.partitioning
+        expressions = {}
+
+        return FileSystemDataset.from_paths(
+            paths,
+            schema=self.table.dataset_schema,
+            format=self.table.file_format,
+            filesystem=filesystem if filesystem is not None else self.filesystem,
+            partitions=[
+                expressions.setdefault(directory, partitioning.parse(directory + "/") if directory else pc.scalar(True))
+                for directory in (self.partition_dir(_) for _ in paths)
+            ] if self.table.partitioned else None
+        )
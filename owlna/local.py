@@ -0,0 +1,331 @@
+__all__ = ["LocalConnection", "LocalCursor"]
+
+import time
+import uuid
+from typing import Optional, Iterable, Generator, Callable, Union
+
+from pyarrow import Schema, RecordBatch, RecordBatchReader, DataType, Table as ArrowTable, schema, timestamp
+from pyarrow.types import is_timestamp
+from pyarrow.dataset import Dataset
+from pyarrow.fs import FileSystem, LocalFileSystem
+
+from .config import QueryStates
+from .cursor import Cursor
+from .exception import AthenaError
+from .table import Table
+
+
+def arrow_table(relation: "duckdb.DuckDBPyRelation") -> ArrowTable:
+    # DuckDB >= 1.4 to_arrow_table, fetch_arrow_table deprecated
+    if hasattr(relation, "to_arrow_table"):
+        return relation.to_arrow_table()
+    return relation.fetch_arrow_table()
+
+
+def arrow_reader(relation: "duckdb.DuckDBPyRelation", batch_size: int) -> RecordBatchReader:
+    if hasattr(relation, "to_arrow_reader"):
+        return relation.to_arrow_reader(batch_size)
+    return relation.fetch_record_batch(batch_size)
+
+
+def import_duckdb():
+    try:
+        import duckdb
+    except ImportError:
+        raise ImportError("owlna.LocalConnection requires duckdb, install with 'pip install owlna[local]'")
+    return duckdb
+
+
+def result_types(arrow_schema: Schema) -> dict[str, DataType]:
+    """
+    Column types to match Athena query results, timestamps without time zone like
+    owlna.utils.metadata.query_result_column_to_pyarrow_field: DuckDB returns UTC table columns as TIMESTAMPTZ
+    """
+    return {
+        f.name: timestamp(f.type.unit)
+        for f in arrow_schema
+        if is_timestamp(f.type) and f.type.tz is not None
+    }
+
+
+class LocalCursor:
+    """
+    Cursor API on a DuckDB connection, results handed over as Arrow without copy
+
+    Queries are bound on execute and run on each fetch, Athena keyword arguments like WorkGroup are ignored
+    """
+
+    def __init__(self, connection: "LocalConnection"):
+        self.connection = connection
+        self.id = None
+        self.closed = False
+        self._status = None
+        self._statistics = None
+        self._cursor = None
+        self._relation = None
+        self._schema_arrow = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        return "LocalCursor(id='%s')" % self.id
+
+    @property
+    def done(self) -> bool:
+        return self._status is not None
+
+    @property
+    def status(self) -> dict:
+        return self._status
+
+    @property
+    def state(self) -> str:
+        return self._status["State"]
+
+    @property
+    def statistics(self) -> dict:
+        return self._statistics
+
+    @property
+    def reused_previous_result(self) -> bool:
+        return False
+
+    @property
+    def schema_arrow(self) -> Schema:
+        if self._schema_arrow is None:
+            self._schema_arrow = self.fetch_arrow(include_columns=(), column_types={}, limit=0).schema
+        return self._schema_arrow
+
+    def execute(self, query: str, wait: bool = True, **kwargs) -> "LocalCursor":
+        """
+        Bind query with DuckDB, run on fetch
+
+        :param query: SQL on tables registered with connection.register, as "database"."name",
+            statements without result run directly
+        :param wait: raise AthenaError on failure if True, else when waited or fetched
+        :param kwargs: Athena options, ignored
+        """
+        self.id = str(uuid.uuid4())
+        self._schema_arrow = None
+
+        if self._cursor is None:
+            self._cursor = self.connection.duckdb_cursor()
+
+        start = time.perf_counter()
+        try:
+            self._relation = self._cursor.sql(query.strip().rstrip(";"))
+            self._status = {"State": QueryStates.SUCCEEDED.value}
+        except self.connection.duckdb_error as e:
+            self._relation = None
+            self.failed(e)
+        self._statistics = {
+            "EngineExecutionTimeInMillis": int((time.perf_counter() - start) * 1000),
+            "DataScannedInBytes": 0
+        }
+
+        if wait:
+            self.wait()
+
+        return self
+
+    def failed(self, error: Exception):
+        self._status = {
+            "State": QueryStates.FAILED.value,
+            "StateChangeReason": "FAILED: %s" % error,
+            "AthenaError": {
+                "ErrorCategory": 2, "ErrorType": 1000, "Retryable": False, "ErrorMessage": str(error)
+            }
+        }
+
+    def wait(self, tick=True, raise_error: bool = True):
+        if raise_error and self.state == QueryStates.FAILED.value:
+            meta = self._status["AthenaError"]
+            raise AthenaError(
+                category=meta["ErrorCategory"],
+                type=meta["ErrorType"],
+                retryable=meta["Retryable"],
+                message=meta["ErrorMessage"],
+                full_message=self._status["StateChangeReason"]
+            )
+
+    def fetch(self, func: Callable[["duckdb.DuckDBPyRelation"], Union[ArrowTable, RecordBatchReader]]):
+        """
+        Run func on the query relation, DuckDB runtime errors raised as AthenaError
+        """
+        self.wait()
+
+        if self._relation is None:
+            return ArrowTable.from_batches([], schema([]))
+
+        try:
+            return func(self._relation)
+        except self.connection.duckdb_error as e:
+            self.failed(e)
+            self.wait()
+
+    def stop(self):
+        if self._cursor is not None:
+            self._cursor.interrupt()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            if self._cursor is not None:
+                self._cursor.close()
+
+    def reader(
+        self,
+        block_size: int = 1000000,
+        include_columns: Iterable[str] = (),
+        column_types: dict[str, DataType] = {},
+        **kwargs
+    ) -> RecordBatchReader:
+        """
+        Query result as pyarrow.RecordBatchReader
+
+        :param block_size: rows per batch
+        :param kwargs: Cursor.reader CSV options, ignored
+        """
+        reader = self.fetch(lambda relation: arrow_reader(relation, block_size))
+
+        if isinstance(reader, ArrowTable):
+            reader = RecordBatchReader.from_batches(reader.schema, reader.to_batches())
+
+        column_types = {**result_types(reader.schema), **column_types}
+
+        if include_columns or column_types:
+            return RecordBatchReader.from_batches(
+                Cursor.cast_column_types(reader.schema.empty_table(), column_types, include_columns).schema,
+                (Cursor.cast_column_types(_, column_types, include_columns) for _ in reader)
+            )
+        return reader
+
+    def fetch_arrow_batches(
+        self,
+        block_size: int = 1000000,
+        include_columns: Iterable[str] = (),
+        column_types: dict[str, DataType] = {},
+        **kwargs
+    ) -> Generator[RecordBatch, None, None]:
+        for batch in self.reader(block_size, include_columns, column_types):
+            yield batch
+
+    def fetch_arrow(
+        self,
+        block_size: int = 1000000,
+        include_columns: Iterable[str] = (),
+        column_types: dict[str, DataType] = {},
+        limit: Optional[int] = None,
+        **kwargs
+    ) -> ArrowTable:
+        """
+        :param limit: max rows
+        """
+        data = self.fetch(lambda relation: arrow_table(relation if limit is None else relation.limit(limit)))
+        return Cursor.cast_column_types(data, {**result_types(data.schema), **column_types}, include_columns)
+
+
+class LocalConnection:
+    """
+    Connection API emulated with DuckDB on local Parquet / CSV table locations
+
+    owlna.Table metadata describes the data: location, format, schema and partitioning,
+    each table is scanned as a pyarrow.dataset with filter and projection pushdown
+
+    with LocalConnection([table]) as connection:
+        connection.execute('SELECT * FROM "database"."name"').fetch_arrow()
+    """
+
+    def __init__(
+        self,
+        tables: Iterable[Table] = (),
+        filesystem: Optional[FileSystem] = None,
+        database: str = ":memory:",
+        threads: Optional[int] = None
+    ):
+        """
+        :param tables: owlna.Table to register
+        :param filesystem: table locations filesystem, default pyarrow LocalFileSystem
+        :param database: DuckDB database file
+        :param threads: DuckDB threads, default DuckDB setting
+        """
+        duckdb = import_duckdb()
+
+        self.duckdb = duckdb.connect(database)
+        self.duckdb_error = duckdb.Error
+        self.filesystem = filesystem if filesystem is not None else LocalFileSystem()
+        self.closed = False
+        # (database, name): (Table, FileSystem)
+        self.registered: dict[tuple[str, str], tuple[Table, FileSystem]] = {}
+        # view source name: pyarrow.dataset.Dataset
+        self.datasets: dict[str, Dataset] = {}
+
+        if threads:
+            self.duckdb.execute("SET threads TO %s" % int(threads))
+
+        for table in tables:
+            self.register(table)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.duckdb.close()
+
+    def register(self, table: Table, filesystem: Optional[FileSystem] = None):
+        """
+        Expose table data as view "database"."name", files listed now, see self.refresh
+
+        :param table: owlna.Table
+        :param filesystem: table location filesystem, default self.filesystem
+        """
+        key = "owlna_%s_%s" % (table.database, table.name)
+        filesystem = filesystem if filesystem is not None else self.filesystem
+        dataset = table.dataset(filesystem)
+
+        self.duckdb.register(key, dataset)
+        self.duckdb.execute('CREATE SCHEMA IF NOT EXISTS "%s"' % table.database)
+        self.duckdb.execute('CREATE OR REPLACE VIEW "%s"."%s" AS SELECT * FROM "%s"' % (
+            table.database, table.name, key
+        ))
+        self.registered[(table.database, table.name)] = table, filesystem
+        self.datasets[key] = dataset
+
+    def duckdb_cursor(self):
+        """
+        DuckDB connection sharing the database, registered datasets are per connection
+        """
+        cursor = self.duckdb.cursor()
+        for key, dataset in self.datasets.items():
+            cursor.register(key, dataset)
+        return cursor
+
+    def refresh(self):
+        """
+        List table files again, after writes like Table.insert_arrow
+        """
+        for table, filesystem in list(self.registered.values()):
+            self.register(table, filesystem)
+
+    def cursor(self) -> LocalCursor:
+        return LocalCursor(self)
+
+    def execute(self, *args, **kwargs) -> LocalCursor:
+        return self.cursor().execute(*args, **kwargs)
+
+    def table(self, catalog: str, database: str, name: str) -> Table:
+        return self.registered[(database, name)][0]
+
+    def tables(self, catalog: str, database: str, **kwargs) -> Generator[Table, None, None]:
+        for (db, _), (table, filesystem) in self.registered.items():
+            if db == database:
+                yield table
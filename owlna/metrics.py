@@ -0,0 +1,289 @@
+__all__ = ["QueryTimeline", "PrometheusExporter", "SpanExporter"]
+
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Callable, Optional, Iterable, Iterator
+
+# Statistics fields in milliseconds, in execution order
+ATHENA_PHASES = [
+    ("queue", "QueryQueueTimeInMillis"),
+    ("planning", "QueryPlanningTimeInMillis"),
+    ("execution", "EngineExecutionTimeInMillis"),
+    ("service", "ServiceProcessingTimeInMillis")
+]
+FETCH_DURATIONS = ("first_batch", "download", "parse", "read", "cast", "fetch")
+FETCH_COUNTERS = ("bytes", "rows", "batches", "pages")
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, float("inf"))
+
+
+class QueryTimeline:
+    """
+    Athena Statistics and client side timings of one query execution
+
+    durations, seconds:
+        submit = start_query_execution call
+        poll = get_query_execution calls
+        wait = submission to done seen by the client
+        first_batch = fetch start to first batch
+        download, parse = parallel byte range downloads and CSV parsing, summed over workers
+        read = streamed download and parse, fused in the pyarrow reader
+        cast = column type casts
+        fetch = fetch total
+    counters: polls, bytes (CSV result object bytes read, none for small results), rows, batches, pages, cache_hits
+    Fetch durations and counters describe the last fetch
+    """
+
+    def __init__(self, workgroup: Optional[str] = None):
+        self.query_id: Optional[str] = None
+        self.workgroup = workgroup
+        self.state: Optional[str] = None
+        self.submitted = time.time()
+        self.done: Optional[float] = None
+        self.statistics: dict = {}
+        self.durations = Counter()
+        self.counters = Counter()
+        self.events: list[tuple[str, float]] = [("submit", self.submitted)]
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return "QueryTimeline(id='%s', state=%s, durations=%s)" % (self.query_id, self.state, dict(self.durations))
+
+    def mark(self, name: str):
+        with self.lock:
+            self.events.append((name, time.time()))
+
+    def add(self, name: str, seconds: float):
+        with self.lock:
+            self.durations[name] += seconds
+
+    def start_fetch(self):
+        with self.lock:
+            for name in FETCH_DURATIONS:
+                self.durations.pop(name, None)
+            for name in FETCH_COUNTERS:
+                self.counters.pop(name, None)
+            self.events.append(("fetch", time.time()))
+
+    def fetch_started(self) -> float:
+        return max((t for name, t in self.events if name == "fetch"), default=self.submitted)
+
+    def count(self, name: str, value: int = 1):
+        with self.lock:
+            self.counters[name] += value
+
+    @contextmanager
+    def timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def timed(self, iterable: Iterable, name: str) -> Iterator:
+        """
+        Yield items, adding the time spent producing them to durations[name]
+        """
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.add(name, time.perf_counter() - start)
+            yield item
+
+    def finish(self, meta: dict) -> bool:
+        """
+        Record the done execution meta
+
+        :return: False if already done
+        """
+        with self.lock:
+            if self.done is not None:
+                return False
+            self.done = time.time()
+            self.state = meta["Status"]["State"]
+            self.statistics = meta.get("Statistics", {})
+            self.durations["wait"] = self.done - self.submitted
+            self.events.append(("done", self.done))
+        return True
+
+    def athena_seconds(self, field: str) -> float:
+        return self.statistics.get(field, 0) / 1000.
+
+    def to_dict(self) -> dict:
+        return {
+            "query_id": self.query_id,
+            "workgroup": self.workgroup,
+            "state": self.state,
+            "submitted": self.submitted,
+            "done": self.done,
+            "statistics": dict(self.statistics),
+            "durations": dict(self.durations),
+            "counters": dict(self.counters),
+            "events": list(self.events)
+        }
+
+
+class PrometheusExporter:
+    """
+    Connection hook aggregating timelines per workgroup, rendered in Prometheus text format
+    """
+
+    def __init__(self, prefix: str = "owlna", buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = list(buckets)
+        self.lock = threading.Lock()
+
+        # (workgroup, state): count
+        self.queries = Counter()
+        # (workgroup, phase): seconds
+        self.seconds = Counter()
+        # (workgroup, counter): value
+        self.totals = Counter()
+        # workgroup: bucket counts of wait durations
+        self.histogram: dict[str, list[int]] = defaultdict(lambda: [0] * len(self.buckets))
+        self.histogram_sum = Counter()
+
+    def __call__(self, event: str, timeline: QueryTimeline):
+        workgroup = timeline.workgroup or "primary"
+
+        with self.lock:
+            if event == "done":
+                self.queries[(workgroup, timeline.state)] += 1
+                self.totals[(workgroup, "scanned_bytes")] += timeline.statistics.get("DataScannedInBytes", 0)
+
+                for phase, field in ATHENA_PHASES:
+                    self.seconds[(workgroup, phase)] += timeline.athena_seconds(field)
+                for phase in ("submit", "poll", "wait"):
+                    self.seconds[(workgroup, phase)] += timeline.durations[phase]
+                self.totals[(workgroup, "polls")] += timeline.counters["polls"]
+
+                wait = timeline.durations["wait"]
+                counts = self.histogram[workgroup]
+                for i, bound in enumerate(self.buckets):
+                    if wait <= bound:
+                        counts[i] += 1
+                self.histogram_sum[workgroup] += wait
+            elif event == "fetched":
+                for phase in FETCH_DURATIONS:
+                    self.seconds[(workgroup, phase)] += timeline.durations[phase]
+                for name in FETCH_COUNTERS:
+                    self.totals[(workgroup, name)] += timeline.counters[name]
+
+    def render(self) -> str:
+        p = self.prefix
+        lines = [
+            "# HELP %s_queries_total Done query executions" % p,
+            "# TYPE %s_queries_total counter" % p
+        ]
+
+        with self.lock:
+            for (workgroup, state), value in sorted(self.queries.items()):
+                lines.append('%s_queries_total{workgroup="%s",state="%s"} %s' % (p, workgroup, state, value))
+
+            lines += [
+                "# HELP %s_phase_seconds_total Time spent per query phase" % p,
+                "# TYPE %s_phase_seconds_total counter" % p
+            ]
+            for (workgroup, phase), value in sorted(self.seconds.items()):
+                lines.append('%s_phase_seconds_total{workgroup="%s",phase="%s"} %s' % (p, workgroup, phase, value))
+
+            for name in sorted({_[1] for _ in self.totals}):
+                lines += [
+                    "# HELP %s_%s_total Sum of query %s" % (p, name, name),
+                    "# TYPE %s_%s_total counter" % (p, name)
+                ]
+                for (workgroup, key), value in sorted(self.totals.items()):
+                    if key == name:
+                        lines.append('%s_%s_total{workgroup="%s"} %s' % (p, name, workgroup, value))
+
+            lines += [
+                "# HELP %s_query_duration_seconds Submission to done latency" % p,
+                "# TYPE %s_query_duration_seconds histogram" % p
+            ]
+            for workgroup, counts in sorted(self.histogram.items()):
+                for bound, value in zip(self.buckets, counts):
+                    le = "+Inf" if bound == float("inf") else bound
+                    lines.append('%s_query_duration_seconds_bucket{workgroup="%s",le="%s"} %s' % (
+                        p, workgroup, le, value
+                    ))
+                lines.append('%s_query_duration_seconds_sum{workgroup="%s"} %s' % (
+                    p, workgroup, self.histogram_sum[workgroup]
+                ))
+                lines.append('%s_query_duration_seconds_count{workgroup="%s"} %s' % (p, workgroup, counts[-1]))
+
+        return "\n".join(lines) + "\n"
+
+
+class SpanExporter:
+    """
+    Connection hook converting timelines to OpenTelemetry style span dicts
+
+    Trace id = QueryExecutionId, one root span per query, Athena phases laid out from submission,
+    one span per fetch
+    """
+
+    def __init__(self, export: Callable[[list[dict]], None]):
+        """
+        :param export: called with span dicts, like an OpenTelemetry SpanExporter.export
+        """
+        self.export = export
+
+    @staticmethod
+    def span(
+        name: str, trace_id: str, start: float, end: float,
+        parent: Optional[str] = None, attributes: Optional[dict] = None
+    ) -> dict:
+        return {
+            "name": name,
+            "trace_id": trace_id,
+            "span_id": uuid.uuid4().hex[:16],
+            "parent_span_id": parent,
+            "start_time_unix_nano": int(start * 1e9),
+            "end_time_unix_nano": int(end * 1e9),
+            "attributes": attributes or {}
+        }
+
+    def trace_id(self, timeline: QueryTimeline) -> str:
+        return (timeline.query_id or "").replace("-", "") or uuid.uuid4().hex
+
+    def __call__(self, event: str, timeline: QueryTimeline):
+        trace_id = self.trace_id(timeline)
+        attributes = {
+            "athena.query_id": timeline.query_id,
+            "athena.workgroup": timeline.workgroup
+        }
+
+        if event == "done":
+            root = self.span(
+                "athena.query", trace_id, timeline.submitted, timeline.done,
+                attributes={
+                    **attributes,
+                    "athena.state": timeline.state,
+                    "athena.data_scanned_bytes": timeline.statistics.get("DataScannedInBytes", 0),
+                    "owlna.polls": timeline.counters["polls"]
+                }
+            )
+            spans, start = [root], timeline.submitted
+
+            for phase, field in ATHENA_PHASES:
+                seconds = timeline.athena_seconds(field)
+                if seconds:
+                    spans.append(self.span("athena." + phase, trace_id, start, start + seconds, root["span_id"]))
+                    start += seconds
+            self.export(spans)
+        elif event == "fetched":
+            self.export([self.span(
+                "owlna.fetch", trace_id, timeline.fetch_started(), time.time(),
+                attributes={
+                    **attributes,
+                    **{"owlna.%s_seconds" % k: v for k, v in timeline.durations.items()},
+                    **{"owlna.%s" % k: v for k, v in timeline.counters.items()}
+                }
+            )])
@@ -0,0 +1,152 @@
+__all__ = ["QueryPoller"]
+
+import threading
+from concurrent.futures import Future
+from typing import Optional
+
+from botocore.exceptions import ClientError, HTTPClientError, ConnectionError as BotoConnectionError
+
+from .config import DEFAULT_CURSOR_WAIT, DEFAULT_CURSOR_MAX_WAIT, QueryStates
+from .exception import OwlnaException
+from .utils.ratelimit import THROTTLING_ERROR_CODES
+
+BATCH_GET_QUERY_EXECUTION_LIMIT = 50
+RETRYABLE_ERROR_CODES = THROTTLING_ERROR_CODES | {
+    "InternalServerException",
+    "InternalFailure",
+    "ServiceUnavailable",
+    "ServiceUnavailableException"
+}
+# consecutive failed polls before pending waiters fail
+DEFAULT_MAX_POLL_ERRORS = 10
+
+
+def retryable(error: BaseException) -> bool:
+    """
+    Throttling, server side and connection errors, worth polling again
+    """
+    if isinstance(error, ClientError):
+        meta = error.response.get("ResponseMetadata", {})
+        return error.response.get("Error", {}).get("Code") in RETRYABLE_ERROR_CODES \
+            or meta.get("HTTPStatusCode", 0) >= 500
+    return isinstance(error, (HTTPClientError, BotoConnectionError, ConnectionError, TimeoutError))
+
+
+class QueryPoller:
+    """
+    Background poller shared by a Connection's cursors
+
+    Refresh every pending query with batch_get_query_execution, by chunks of 50 ids,
+    and resolve cursor futures when they reach QueryStates.DONE_STATES
+    The thread starts on first tracked cursor and stops when nothing is pending
+
+    Throttling, server and connection errors, raised or as UnprocessedQueryExecutionIds, keep ids pending
+    and double the wait up to DEFAULT_CURSOR_MAX_WAIT; waiters fail on other errors or after
+    max_errors consecutive failed polls
+    """
+
+    def __init__(
+        self,
+        connection: "Connection",
+        tick: float = DEFAULT_CURSOR_WAIT,
+        batch_size: int = BATCH_GET_QUERY_EXECUTION_LIMIT,
+        max_errors: int = DEFAULT_MAX_POLL_ERRORS
+    ):
+        self.connection = connection
+        self.tick = tick
+        self.batch_size = min(batch_size, BATCH_GET_QUERY_EXECUTION_LIMIT)
+        self.max_errors = max_errors
+        # consecutive failed polls, backoff exponent
+        self.errors = 0
+
+        self.pending: dict[str, list[tuple["Cursor", Future]]] = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def __repr__(self):
+        return "QueryPoller(pending=%s)" % len(self.pending)
+
+    def track(self, cursor: "Cursor") -> Future:
+        future = Future()
+
+        with self.lock:
+            if self.stopped.is_set():
+                raise OwlnaException("%s is closed" % repr(self))
+
+            self.pending.setdefault(cursor.id, []).append((cursor, future))
+
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="owlna-poller", daemon=True)
+                self.thread.start()
+
+        return future
+
+    def close(self):
+        self.stopped.set()
+
+        with self.lock:
+            pending, self.pending = self.pending, {}
+
+        for waiters in pending.values():
+            for _, future in waiters:
+                future.cancel()
+
+    def run(self):
+        while not self.stopped.is_set():
+            with self.lock:
+                if not self.pending:
+                    self.thread = None
+                    return
+                ids = list(self.pending)
+
+            failed = False
+            for i in range(0, len(ids), self.batch_size):
+                failed = not self.poll(ids[i:i + self.batch_size]) or failed
+
+            self.errors = self.errors + 1 if failed else 0
+            self.stopped.wait(min(self.tick * 2 ** self.errors, max(self.tick, DEFAULT_CURSOR_MAX_WAIT)))
+
+    def poll(self, ids: list[str]) -> bool:
+        """
+        :return: False if ids stay pending on a retryable error
+        """
+        try:
+            response = self.connection.client.batch_get_query_execution(QueryExecutionIds=ids)
+        except Exception as e:
+            if retryable(e) and self.errors + 1 < self.max_errors:
+                return False
+            for query_id in ids:
+                self.resolve(query_id, exception=e)
+            return True
+
+        for meta in response.get("QueryExecutions", []):
+            if meta["Status"]["State"] in QueryStates.DONE_STATES.value:
+                self.resolve(meta["QueryExecutionId"], meta=meta)
+
+        ok = True
+        for unprocessed in response.get("UnprocessedQueryExecutionIds", []):
+            if unprocessed.get("ErrorCode") in RETRYABLE_ERROR_CODES and self.errors + 1 < self.max_errors:
+                ok = False
+                continue
+            self.resolve(
+                unprocessed["QueryExecutionId"],
+                exception=OwlnaException("%s: %s" % (
+                    unprocessed.get("ErrorCode"), unprocessed.get("ErrorMessage")
+                ))
+            )
+        return ok
+
+    def resolve(self, query_id: str, meta: Optional[dict] = None, exception: Optional[BaseException] = None):
+        with self.lock:
+            waiters = self.pending.pop(query_id, [])
+
+        for cursor, future in waiters:
+            if future.done():
+                continue
+            elif exception is None:
+                if cursor.id == query_id:
+                    cursor.persist(meta)
+                future.set_result(cursor)
+            else:
+                future.set_exception(exception)
@@ -0,0 +1,162 @@
+__all__ = [
+    "PollingStrategy",
+    "FixedPolling",
+    "BackoffPolling",
+    "StatisticsPolling",
+    "polling_strategy"
+]
+
+import copy
+import random
+import time
+from typing import Optional, Union
+
+from .config import DEFAULT_CURSOR_WAIT, DEFAULT_CURSOR_MIN_WAIT, DEFAULT_CURSOR_MAX_WAIT, QueryStates
+
+
+class PollingStrategy:
+    """
+    Compute the sleep time between two get_query_execution calls
+
+    A strategy holds the state of one wait loop, Cursor.wait works on a reset copy
+    """
+
+    def reset(self) -> None:
+        pass
+
+    def next_interval(self, meta: dict) -> float:
+        """
+        :param meta: dict QueryExecution returned by boto3 client.get_query_execution
+        :return: seconds to sleep before next poll
+        """
+        raise NotImplementedError
+
+
+class FixedPolling(PollingStrategy):
+
+    def __init__(self, tick: float = DEFAULT_CURSOR_WAIT):
+        self.tick = tick
+
+    def __repr__(self):
+        return "FixedPolling(%s)" % self.tick
+
+    def next_interval(self, meta: dict) -> float:
+        return self.tick
+
+
+class BackoffPolling(PollingStrategy):
+    """
+    Exponential backoff: initial * factor ** attempt, capped by maximum,
+    randomized by +/- jitter ratio to spread concurrent pollers
+    """
+
+    def __init__(
+        self,
+        initial: float = DEFAULT_CURSOR_MIN_WAIT,
+        maximum: float = DEFAULT_CURSOR_MAX_WAIT,
+        factor: float = 2.,
+        jitter: float = 0.2
+    ):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.attempts = 0
+
+    def __repr__(self):
+        return "%s(initial=%s, maximum=%s)" % (self.__class__.__name__, self.initial, self.maximum)
+
+    def reset(self) -> None:
+        self.attempts = 0
+
+    def with_jitter(self, interval: float) -> float:
+        if self.jitter:
+            interval *= 1 + self.jitter * (2 * random.random() - 1)
+        return min(self.maximum, max(0., interval))
+
+    def backoff(self) -> float:
+        interval = self.initial * self.factor ** self.attempts
+        self.attempts += 1
+        return interval
+
+    def next_interval(self, meta: dict) -> float:
+        return self.with_jitter(self.backoff())
+
+
+class StatisticsPolling(BackoffPolling):
+    """
+    Predict query end from Statistics and observed state history
+
+    - state change (QUEUED > RUNNING): restart backoff, short queries finish right after
+    - expected: optional duration hint in seconds (e.g. previous run), next poll is scheduled at expected end
+    - otherwise sleep ratio * elapsed time in current state: QueryQueueTimeInMillis when QUEUED,
+    EngineExecutionTimeInMillis when RUNNING, never below backoff
+    """
+
+    def __init__(
+        self,
+        initial: float = DEFAULT_CURSOR_MIN_WAIT,
+        maximum: float = DEFAULT_CURSOR_MAX_WAIT,
+        factor: float = 2.,
+        jitter: float = 0.2,
+        ratio: float = 0.5,
+        expected: Optional[float] = None
+    ):
+        super().__init__(initial, maximum, factor, jitter)
+        self.ratio = ratio
+        self.expected = expected
+        self.history: list[tuple[float, str]] = []
+
+    def reset(self) -> None:
+        super().reset()
+        self.history = []
+
+    def elapsed(self, meta: dict, state: str) -> float:
+        statistics = meta.get("Statistics", {})
+
+        if state == QueryStates.QUEUED.value:
+            millis = statistics.get("QueryQueueTimeInMillis")
+        else:
+            millis = statistics.get("EngineExecutionTimeInMillis")
+
+        if millis is None:
+            # first observation of this state, from client side history
+            for observed, observed_state in self.history:
+                if observed_state == state:
+                    return time.monotonic() - observed
+            return 0.
+        return millis / 1000
+
+    def next_interval(self, meta: dict) -> float:
+        state = meta["Status"]["State"]
+
+        if self.history and self.history[-1][1] != state:
+            super().reset()
+        if not self.history or self.history[-1][1] != state:
+            self.history.append((time.monotonic(), state))
+
+        interval = self.backoff()
+
+        if state == QueryStates.RUNNING.value and self.expected is not None:
+            remaining = self.expected - self.elapsed(meta, state)
+            if remaining > 0:
+                return self.with_jitter(max(self.initial, remaining))
+
+        return self.with_jitter(max(interval, self.ratio * self.elapsed(meta, state)))
+
+
+def polling_strategy(tick: Union[float, bool, None, PollingStrategy]) -> PollingStrategy:
+    """
+    Build a fresh polling strategy
+
+    :param tick: PollingStrategy copied and reset,
+        float = FixedPolling(tick),
+        True or None = BackoffPolling()
+    """
+    if isinstance(tick, PollingStrategy):
+        tick = copy.copy(tick)
+        tick.reset()
+        return tick
+    elif tick is None or isinstance(tick, bool):
+        return BackoffPolling()
+    return FixedPolling(tick)
@@ -0,0 +1,120 @@
+__all__ = ["ConnectionPool"]
+
+import queue
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Optional, Iterator
+
+from botocore.config import Config
+
+from .config import DEFAULT_BOTO_CLIENT_CONFIG, DEFAULT_POOL_SIZE, DEFAULT_POOL_TIMEOUT
+from .connection import Connection
+from .cursor import Cursor
+from .exception import OwlnaException
+
+
+class ConnectionPool:
+    """
+    Bounded pool of owlna.Connection sharing the server boto3 client and S3FileSystem
+
+    Connections are created on demand, at most size are checked out at once,
+    acquire waits up to timeout seconds for a returned one
+    """
+
+    def __init__(
+        self,
+        server: "Athena",
+        config: Config = DEFAULT_BOTO_CLIENT_CONFIG,
+        size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_POOL_TIMEOUT,
+        **kwargs
+    ):
+        """
+        :param server: owlna.Athena
+        :param config: boto3 client config
+        :param size: maximum checked out connections
+        :param timeout: default acquire timeout in seconds
+        :param kwargs: other owlna.Connection kwargs
+        """
+        self.server = server
+        self.config = config
+        self.size = size
+        self.timeout = timeout
+        self.kwargs = kwargs
+        self.closed = False
+
+        self.idle: queue.LifoQueue = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.created = 0
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return "ConnectionPool(size=%s, created=%s, idle=%s)" % (self.size, self.created, self.idle.qsize())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def acquire(self, timeout: Optional[float] = None) -> Connection:
+        """
+        :param timeout: seconds to wait for a free connection, default self.timeout
+        :raise TimeoutError: no connection returned in time
+        """
+        if self.closed:
+            raise OwlnaException("%s is closed" % self)
+
+        if not self.slots.acquire(timeout=self.timeout if timeout is None else timeout):
+            raise TimeoutError("No connection available in %s after %ss" % (
+                self, self.timeout if timeout is None else timeout
+            ))
+
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        try:
+            connection = Connection(self.server, config=self.config, shared_client=True, **self.kwargs)
+        except BaseException:
+            self.slots.release()
+            raise
+
+        with self.lock:
+            self.created += 1
+        return connection
+
+    def release(self, connection: Connection):
+        if self.closed or connection.closed:
+            connection.close()
+        else:
+            self.idle.put(connection)
+        self.slots.release()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Connection]:
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def cursor(self, timeout: Optional[float] = None) -> Cursor:
+        """
+        Cursor on a borrowed connection, returned to the pool on cursor close or garbage collection
+        """
+        connection = self.acquire(timeout)
+        cursor = connection.cursor()
+        cursor._release = weakref.finalize(cursor, self.release, connection)
+        return cursor
+
+    def close(self):
+        self.closed = True
+
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
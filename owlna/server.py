@@ -1,36 +1,170 @@
 __all__ = ["Athena"]
 
-from typing import Optional
+import threading
+from typing import Optional, Union, Iterable, Callable
 
 from boto3 import Session
 from botocore.config import Config
 from pyarrow._s3fs import S3FileSystem
 
-from .config import DEFAULT_BOTO_CLIENT_CONFIG
+from .async_connection import AsyncConnection
+from .cache import ResultCache
+from .config import DEFAULT_BOTO_CLIENT_CONFIG, DEFAULT_POOL_SIZE, DEFAULT_POOL_TIMEOUT
 from .connection import Connection
+from .filesystem import ManagedS3FileSystem
+from .pool import ConnectionPool
+from .utils.ratelimit import AdaptiveRateLimiter
 
 
 class Athena:
 
     def __init__(
         self,
-        session: Session = None
+        session: Session = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        pool_timeout: float = DEFAULT_POOL_TIMEOUT,
+        rate_limiter: Union[AdaptiveRateLimiter, bool] = True
     ):
+        """
+        :param session: boto3 Session
+        :param pool_size: maximum checked out connections per self.pool
+        :param pool_timeout: seconds to wait for a pooled connection
+        :param rate_limiter: owlna.utils.ratelimit.AdaptiveRateLimiter for athena and s3 boto3 clients,
+            True = process wide AdaptiveRateLimiter.shared(), False = none
+            pyarrow S3FileSystem reads and writes are not rate limited, they retry with S3_MAX_ATTEMPTS
+        """
         self.session = session if session else Session()
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self.rate_limiter = AdaptiveRateLimiter.shared() if rate_limiter is True else (rate_limiter or None)
 
-    def connect(self, config: Config = DEFAULT_BOTO_CLIENT_CONFIG, query_options: Optional[dict] = None):
-        return Connection(self, config=config, query_options=query_options)
+        self._lock = threading.Lock()
+        # id(config): (config, athena client)
+        self._clients: dict[int, tuple[Config, object]] = {}
+        # id(config): (config, s3 client)
+        self._s3_clients: dict[int, tuple[Config, object]] = {}
+        # S3FileSystem kwargs: ManagedS3FileSystem
+        self._filesystems: dict[str, ManagedS3FileSystem] = {}
+        # id(config): ConnectionPool
+        self._pools: dict[int, ConnectionPool] = {}
 
-    def cursor(self, config: Config = DEFAULT_BOTO_CLIENT_CONFIG):
-        return self.connect(config).cursor()
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            pools = list(self._pools.values())
+            clients = [_[1] for _ in (*self._clients.values(), *self._s3_clients.values())]
+            self._pools.clear()
+            self._clients.clear()
+            self._s3_clients.clear()
+            self._filesystems.clear()
+
+        for pool in pools:
+            pool.close()
+        for client in clients:
+            client.close()
+
+    def client(self, config: Config = DEFAULT_BOTO_CLIENT_CONFIG):
+        """
+        Shared boto3 athena client, clients are thread safe, one per config
+        """
+        with self._lock:
+            if id(config) not in self._clients:
+                self._clients[id(config)] = (config, self.athena_client(config))
+            return self._clients[id(config)][1]
+
+    def athena_client(self, config: Config = DEFAULT_BOTO_CLIENT_CONFIG):
+        """
+        New boto3 athena client, rate limited by self.rate_limiter
+        """
+        client = self.session.client("athena", config=config)
+        if self.rate_limiter is not None:
+            self.rate_limiter.attach(client)
+        return client
+
+    def s3_client(self, config: Config = DEFAULT_BOTO_CLIENT_CONFIG):
+        """
+        Shared boto3 s3 client, rate limited by self.rate_limiter, one per config
+        """
+        with self._lock:
+            if id(config) not in self._s3_clients:
+                client = self.session.client("s3", config=config)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.attach(client)
+                self._s3_clients[id(config)] = (config, client)
+            return self._s3_clients[id(config)][1]
+
+    def managed_s3filesystem(self, **kwargs) -> ManagedS3FileSystem:
+        """
+        Shared owlna.filesystem.ManagedS3FileSystem, one per kwargs
+        """
+        key = repr(sorted(kwargs.items()))
+
+        with self._lock:
+            if key not in self._filesystems:
+                self._filesystems[key] = ManagedS3FileSystem(self.session, **kwargs)
+            return self._filesystems[key]
+
+    def s3filesystem(self, **kwargs) -> S3FileSystem:
+        """
+        Shared S3FileSystem with current session credentials, see self.managed_s3filesystem
+        """
+        return self.managed_s3filesystem(**kwargs).filesystem
 
-    def pyarrow_s3filesystem(self, **kwargs):
-        credentials = self.session.get_credentials()
+    def pool(self, config: Config = DEFAULT_BOTO_CLIENT_CONFIG) -> ConnectionPool:
+        """
+        Shared owlna.pool.ConnectionPool, one per config
+        """
+        with self._lock:
+            if id(config) not in self._pools:
+                self._pools[id(config)] = ConnectionPool(
+                    self, config=config, size=self.pool_size, timeout=self.pool_timeout
+                )
+            return self._pools[id(config)]
 
-        return S3FileSystem(
-            secret_key=credentials.secret_key,
-            access_key=credentials.access_key,
-            region=self.session.region_name,
-            session_token=credentials.token,
-            **kwargs
+    def connect(
+        self,
+        config: Config = DEFAULT_BOTO_CLIENT_CONFIG,
+        query_options: Optional[dict] = None,
+        shared_polling: bool = False,
+        cache: Optional[ResultCache] = None,
+        single_flight: bool = False,
+        shared_client: bool = False,
+        hooks: Iterable[Callable] = ()
+    ):
+        return Connection(
+            self, config=config, query_options=query_options, shared_polling=shared_polling, cache=cache,
+            single_flight=single_flight, shared_client=shared_client, hooks=hooks
+        )
+
+    def connect_async(
+        self,
+        config: Config = DEFAULT_BOTO_CLIENT_CONFIG,
+        query_options: Optional[dict] = None,
+        shared_polling: bool = False,
+        cache: Optional[ResultCache] = None,
+        single_flight: bool = False,
+        hooks: Iterable[Callable] = ()
+    ):
+        return AsyncConnection(
+            self, config=config, query_options=query_options, shared_polling=shared_polling, cache=cache,
+            single_flight=single_flight, hooks=hooks
         )
+
+    def cursor(self, config: Config = DEFAULT_BOTO_CLIENT_CONFIG):
+        """
+        Cursor on a pooled connection, returned to self.pool(config) on cursor close
+        """
+        return self.pool(config).cursor()
+
+    def pyarrow_s3filesystem(self, **kwargs) -> S3FileSystem:
+        """
+        New S3FileSystem with current session credentials, not refreshed, see self.s3filesystem
+
+        :param kwargs: see owlna.filesystem.s3filesystem_options
+        """
+        return ManagedS3FileSystem(self.session, **kwargs).filesystem
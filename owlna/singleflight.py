@@ -0,0 +1,132 @@
+__all__ = ["SingleFlight"]
+
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from .cache import ResultCache, READ_ONLY
+from .config import DEFAULT_SINGLE_FLIGHT_TTL
+
+
+class SingleFlight:
+    """
+    In process registry of running query executions
+
+    Identical read only queries, same normalized text and start_query_execution kwargs,
+    started while one is in flight attach to its QueryExecutionId instead of starting a new one
+    An entry is released as soon as a cursor sees the execution done, all its cursors are
+    detached or closed, or ttl seconds after it started: an execution nobody polls is not attached forever
+    """
+
+    def __init__(self, ttl: float = DEFAULT_SINGLE_FLIGHT_TTL):
+        """
+        :param ttl: seconds an in flight execution can be attached to
+        """
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # key: Future[QueryExecutionId]
+        self.calls: dict[str, Future] = {}
+        # key: monotonic start time
+        self.created: dict[str, float] = {}
+        # QueryExecutionId: key
+        self.keys: dict[str, str] = {}
+        # QueryExecutionId: attached cursors
+        self.cursors = Counter()
+        self.started = 0
+        self.attached = 0
+
+    def __repr__(self):
+        return "SingleFlight(inflight=%s, started=%s, attached=%s)" % (
+            len(self.calls), self.started, self.attached
+        )
+
+    @staticmethod
+    def key(query: str, **options) -> Optional[str]:
+        """
+        :return: deduplication key, None if query is not read only
+        """
+        query = ResultCache.normalize(query)
+
+        if READ_ONLY.match(query) is None:
+            return None
+
+        return hashlib.sha256(json.dumps(
+            {"query": query, "options": options},
+            sort_keys=True, default=str
+        ).encode()).hexdigest()
+
+    def start(self, key: str, start: Callable[[], str]) -> str:
+        """
+        :param key: SingleFlight.key
+        :param start: function starting the query, returns QueryExecutionId
+        :return: in flight QueryExecutionId or start() result
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            if call is not None and call.done() and time.monotonic() - self.created[key] > self.ttl:
+                # expired, its done() must not release the next execution
+                self.keys.pop(call.result(), None)
+                self.calls.pop(key)
+                self.created.pop(key)
+                call = None
+
+            leader = call is None
+            if leader:
+                call = self.calls[key] = Future()
+                self.created[key] = time.monotonic()
+
+        if leader:
+            try:
+                query_id = start()
+            except BaseException as e:
+                with self.lock:
+                    self.calls.pop(key, None)
+                    self.created.pop(key, None)
+                call.set_exception(e)
+                raise
+
+            with self.lock:
+                self.keys[query_id] = key
+                self.cursors[query_id] += 1
+                self.started += 1
+            call.set_result(query_id)
+            return query_id
+
+        query_id = call.result()
+        with self.lock:
+            if query_id in self.keys:
+                self.cursors[query_id] += 1
+            self.attached += 1
+        return query_id
+
+    def done(self, query_id: str):
+        """
+        Release execution, next identical query will start a new one
+        """
+        with self.lock:
+            key = self.keys.pop(query_id, None)
+            if key is not None:
+                self.calls.pop(key, None)
+                self.created.pop(key, None)
+            self.cursors.pop(query_id, None)
+
+    def detach(self, query_id: str) -> int:
+        """
+        Detach one cursor
+
+        :return: remaining attached cursors
+        """
+        with self.lock:
+            if self.cursors[query_id] > 1:
+                self.cursors[query_id] -= 1
+                return self.cursors[query_id]
+
+        self.done(query_id)
+        return 0
+
+    def __len__(self):
+        return len(self.calls)
@@ -1,17 +1,46 @@
 __all__ = ["Table"]
 
+import datetime
+import inspect
+import itertools
 import os
-from typing import Optional, Union, Iterable
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union, Iterable, Callable
 
 import pyarrow
 import pyarrow.csv as pcsv
+import pyarrow.parquet as pq
 from pyarrow import Schema, RecordBatch, schema, RecordBatchReader
+from pyarrow.compute import Expression
 from pyarrow.dataset import FileFormat, CsvFileFormat, ParquetFileFormat, write_dataset, \
-    partitioning as partitioning_builder, Partitioning
-from pyarrow.fs import S3FileSystem
+    partitioning as partitioning_builder, Partitioning, Dataset, dataset as dataset_builder, Scanner, \
+    ParquetFragmentScanOptions, FileSystemDataset
+from pyarrow.fs import S3FileSystem, FileSystem
 
-from .config import DEFAULT_SAFE_MODE
+from .config import DEFAULT_SAFE_MODE, DEFAULT_MAX_WORKERS, DEFAULT_TARGET_FILE_SIZE, DEFAULT_ROW_GROUP_SIZE, \
+    DEFAULT_REGISTER_PARTITIONS, DEFAULT_MAX_QUERY_LENGTH, DEFAULT_SORT_MEMORY, DEFAULT_WRITE_MEMORY
+from .exception import CompactionError
+from .index import TableIndex
 from .utils.arrow import cast_arrow
+from .utils.parallel import imap
+from .utils.sort import external_sort, sort_keys
+from .writer import WriteStats, TableWriter, iter_batches, file_sizing, partition_count
+
+# parallel insert_arrow cast unit
+DEFAULT_BATCH_ROWS = 131072
+# Table.compact old file delete attempts, doubling wait from DELETE_RETRY_WAIT seconds
+DELETE_ATTEMPTS = 5
+DELETE_RETRY_WAIT = 0.5
+# Table.compact filesystem type_name written without staged files: atomic PUT, rename = copy then delete
+ATOMIC_WRITE_FILESYSTEMS = {"s3", "gcs"}
+# pyarrow.dataset.write_dataset max_open_files default
+DEFAULT_MAX_OPEN_FILES = 1024
+# pyarrow >= 15 write_dataset keeps sorted input order with threads
+PRESERVE_ORDER = "preserve_order" in inspect.signature(write_dataset).parameters
+# pyarrow >= 10 Scanner.from_dataset fragment_readahead, cython method documented parameters
+FRAGMENT_READAHEAD = "fragment_readahead" in (Scanner.from_dataset.__doc__ or "")
 
 SERIALIZATION_TO_CLASSIFICATION = {
     "org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe": "parquet",
@@ -41,6 +70,9 @@ class Table:
 
         self._file_format = None
         self.write_options = {}
+        self._index = None
+        # partition directories added with self.add_partitions
+        self.registered_partitions: set[str] = set()
 
     def __repr__(self):
         return "AthenaTable('%s', '%s', '%s')" % (
@@ -89,6 +121,8 @@ class Table:
                     ),
                     pcsv.ReadOptions(
                         skip_rows=max(0, skip_rows - 1),
+                        # files without header row
+                        column_names=None if skip_rows > 0 else self.schema_arrow.names,
                         encoding="utf8"
                     )
                 )
@@ -102,6 +136,177 @@ class Table:
     def partitioned(self):
         return len(self.partitioning.schema) > 0
 
+    @property
+    def index(self) -> TableIndex:
+        """
+        Local file index, see owlna.index.TableIndex
+        """
+        if self._index is None:
+            self._index = TableIndex(self)
+        return self._index
+
+    @index.setter
+    def index(self, index: TableIndex):
+        self._index = index
+
+    def partitions(self, refresh: Optional[str] = None) -> list[dict[str, str]]:
+        """
+        Hive partition values from self.index
+
+        :param refresh: refresh index first with mode 'start_after', 'modified' or 'full'
+        """
+        if refresh:
+            self.index.refresh(refresh)
+        return self.index.partitions()
+
+    def partition_spec(self, directory: str) -> str:
+        """
+        Hive partition directory like 'day=2020-01-01/hour=0' as ALTER TABLE PARTITION (...) LOCATION '...'
+        """
+        values = dict(_.split("=", 1) for _ in directory.strip("/").split("/"))
+        columns = []
+
+        for field in self.partitioning.schema:
+            # pyarrow hive partitioning escapes values like URLs
+            value = urllib.parse.unquote(values[field.name])
+            if not pyarrow.types.is_integer(field.type):
+                value = "'%s'" % value.replace("\\", "\\\\").replace("'", "\\'")
+            columns.append("`%s` = %s" % (field.name, value))
+
+        return "PARTITION (%s) LOCATION '%s/%s/'" % (
+            ", ".join(columns), self.location.rstrip("/"), directory.strip("/")
+        )
+
+    def add_partitions_queries(
+        self,
+        partitions: Iterable[Union[str, dict]],
+        max_length: int = DEFAULT_MAX_QUERY_LENGTH
+    ) -> list[str]:
+        """
+        ALTER TABLE ADD IF NOT EXISTS PARTITION statements, as many partitions per statement as max_length allows
+        """
+        names = self.partitioning.schema.names
+        head = "ALTER TABLE `%s`.`%s` ADD IF NOT EXISTS" % (self.database, self.name)
+        queries, specs, length = [], [], len(head)
+
+        for partition in partitions:
+            if isinstance(partition, dict):
+                partition = "/".join("%s=%s" % (k, partition[k]) for k in names)
+            spec = self.partition_spec(partition)
+
+            if specs and length + len(spec) + 1 > max_length:
+                queries.append("\n".join([head, *specs]))
+                specs, length = [], len(head)
+            specs.append(spec)
+            length += len(spec) + 1
+
+        if specs:
+            queries.append("\n".join([head, *specs]))
+        return queries
+
+    def add_partitions(
+        self,
+        partitions: Iterable[Union[str, dict]],
+        max_length: int = DEFAULT_MAX_QUERY_LENGTH,
+        **kwargs
+    ) -> list["owlna.cursor.Cursor"]:
+        """
+        Register partitions in the catalog with bulk ALTER TABLE ADD IF NOT EXISTS PARTITION,
+        instead of scanning the whole location with MSCK REPAIR TABLE
+
+        table.add_partitions([{"day": "2020-01-01", "hour": 0}, "day=2020-01-01/hour=1"])
+
+        :param partitions: partition dicts or hive directories relative to location
+        :param max_length: max query length, Athena limit is 256 KB
+        :param kwargs: Connection.execute options
+        :return: executed cursors, one per statement
+        """
+        names = self.partitioning.schema.names
+        directories = list(dict.fromkeys(
+            "/".join("%s=%s" % (k, _[k]) for k in names) if isinstance(_, dict) else _.strip("/")
+            for _ in partitions
+        ))
+        cursors = []
+
+        for query in self.add_partitions_queries(directories, max_length):
+            cursors.append(self.connection.execute(query, **kwargs))
+
+        self.registered_partitions.update(directories)
+        return cursors
+
+    @property
+    def dataset_schema(self) -> Schema:
+        """
+        Partition columns then table columns, like written by self.insert_arrow
+        """
+        return schema(
+            [*self.partitioning.schema, *self.schema_arrow],
+            metadata=self.schema_arrow.metadata
+        )
+
+    def dataset(self, filesystem: Optional[FileSystem] = None, cached: bool = False) -> Dataset:
+        """
+        Table files as pyarrow.dataset.Dataset, with partition columns
+
+        :param filesystem: default self.s3fs
+        :param cached: files from self.index instead of listing the location
+        """
+        if cached:
+            return self.index.dataset(filesystem)
+
+        try:
+            return dataset_builder(
+                self.pyarrow_location,
+                schema=self.dataset_schema,
+                format=self.file_format,
+                filesystem=filesystem if filesystem else self.s3fs,
+                partitioning=self.partitioning
+            )
+        except FileNotFoundError:
+            return dataset_builder([], schema=self.dataset_schema)
+
+    def scan(
+        self,
+        columns: Optional[Iterable[str]] = None,
+        filter: Optional[Expression] = None,
+        filesystem: Optional[FileSystem] = None,
+        batch_size: int = 131072,
+        fragment_readahead: int = DEFAULT_MAX_WORKERS,
+        cached: bool = False,
+        **kwargs
+    ) -> Scanner:
+        """
+        Read table files directly, without Athena
+
+        Partition files not matching filter are skipped, Parquet row groups are filtered
+        with their min / max statistics, files are read concurrently
+
+        table.scan(["id", "value"], filter=pyarrow.compute.field("day") == "2020-01-01").to_table()
+
+        :param columns: column names, default all with partition columns first
+        :param filter: pyarrow.compute.Expression on columns and partition columns
+        :param filesystem: default self.s3fs
+        :param batch_size: max rows per batch
+        :param fragment_readahead: files read concurrently, ignored before pyarrow 10
+        :param cached: files from self.index instead of listing the location
+        :param kwargs: other pyarrow.dataset.Scanner.from_dataset options
+        """
+        if isinstance(self.file_format, ParquetFileFormat):
+            # coalesced and concurrent column chunk reads, fewer S3 GET requests
+            kwargs.setdefault("fragment_scan_options", ParquetFragmentScanOptions(pre_buffer=True))
+
+        if FRAGMENT_READAHEAD:
+            kwargs.setdefault("fragment_readahead", fragment_readahead)
+
+        return Scanner.from_dataset(
+            self.dataset(filesystem, cached),
+            columns=list(columns) if columns is not None else None,
+            filter=filter,
+            batch_size=batch_size,
+            use_threads=True,
+            **kwargs
+        )
+
     def insert_arrow(
         self,
         batch: Union[
@@ -117,8 +322,17 @@ class Table:
         filesystem: Optional[S3FileSystem] = None,
         format: Union[FileFormat, str] = None,
         file_options: Optional[dict] = None,
+        parallel: Union[int, bool] = 0,
+        target_file_size: int = DEFAULT_TARGET_FILE_SIZE,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        write_memory: int = DEFAULT_WRITE_MEMORY,
+        register_partitions: bool = DEFAULT_REGISTER_PARTITIONS,
+        sort_by: Optional[Iterable[Union[str, tuple[str, str]]]] = None,
+        sort_memory: int = DEFAULT_SORT_MEMORY,
+        dictionary_columns: Union[Iterable[str], bool, None] = None,
+        compression: Optional[str] = None,
         **kwargs
-    ) -> None:
+    ) -> WriteStats:
         """
         See https://arrow.apache.org/docs/python/generated/pyarrow.dataset.write_dataset.html#pyarrow.dataset.write_dataset
 
@@ -136,7 +350,25 @@ class Table:
         :param filesystem: default by current boto3.Session() credentials
         :param format: pyarrow.FileFormat
         :param file_options:
+        :param parallel: high throughput mode, int = cast threads, True = DEFAULT_MAX_WORKERS
+            casts run on a thread pool ahead of the writer, bounded to 2 * parallel batches,
+            files and row groups are sized from target_file_size and row_group_size,
+            partition files are written concurrently
+        :param target_file_size: parallel or sort_by mode Arrow bytes per file, sets max_rows_per_file
+        :param row_group_size: parallel or sort_by mode Arrow bytes per row group, sets min / max_rows_per_group
+        :param write_memory: parallel or sort_by mode Arrow bytes buffered in row groups over all open files,
+            min_rows_per_group = write_memory / written partitions, counted on the input table or the first batch
+            of streams, at most max_open_files, see owlna.writer.file_sizing
+        :param register_partitions: add written partitions with self.add_partitions, skips partitions
+            in self.registered_partitions; files in self.index do not mean a partition is in the catalog
+        :param sort_by: column names or (name, 'ascending' / 'descending'), rows are sorted before writing
+            with owlna.utils.sort.external_sort so Parquet row group min / max statistics prune filters on them,
+            written as Parquet sorting_columns
+        :param sort_memory: sort_by Arrow bytes sorted in memory, more are spilled to local temporary files
+        :param dictionary_columns: Parquet dictionary encoded columns, True / False for all
+        :param compression: Parquet codec like 'snappy', 'zstd', 'gzip'
         :param kwargs: other pyarrow.write_dataset options
+        :return: owlna.writer.WriteStats
         """
         partitioning = self.partitioning
 
@@ -177,6 +409,9 @@ class Table:
 
         if self.file_format.__class__ == ParquetFileFormat:
             _file_options = self.file_format.make_write_options()
+            _file_options.update(**self.parquet_options(
+                schema_arrow, partitioning, sort_by, dictionary_columns, compression
+            ))
 
             if file_options:
                 file_options.update(self.write_options)
@@ -185,7 +420,7 @@ class Table:
                 _file_options.update(**self.write_options)
 
             if not basename_template:
-                basename_template = "part-{i}-%s.snappy.parquet" % os.urandom(12).hex()
+                basename_template = "part-{i}-%s.%s.parquet" % (os.urandom(12).hex(), compression or "snappy")
         elif self.file_format.__class__ == CsvFileFormat:
             if file_options:
                 file_options.update(self.write_options)
@@ -198,14 +433,357 @@ class Table:
         else:
             _file_options = None
 
-        write_dataset(
-            cast_arrow(batch, schema_arrow, safe=safe) if cast else batch,
-            base_dir=base_dir,
-            basename_template=basename_template,
-            partitioning=partitioning,
-            existing_data_behavior=existing_data_behavior,
-            filesystem=filesystem if filesystem else self.s3fs,
-            format=format if format else self.file_format,
-            file_options=_file_options,
-            **kwargs
+        register_partitions = register_partitions and self.partitioned
+
+        stats = WriteStats()
+        written, file_visitor = [], kwargs.pop("file_visitor", None)
+        location = self.pyarrow_location.rstrip("/")
+
+        def visit(file):
+            size = getattr(file, "size", None)
+            written.append((file.path, size, datetime.datetime.now(datetime.timezone.utc)))
+            stats.add_file(size, file.path[len(location) + 1:].rpartition("/")[0])
+            if file_visitor is not None:
+                file_visitor(file)
+
+        max_open_files = kwargs.get("max_open_files", DEFAULT_MAX_OPEN_FILES)
+        names = partitioning.schema.names
+
+        def sizing(first: RecordBatch) -> dict[str, int]:
+            # open files = written partitions, of the whole input table or of the first batch of streams
+            sample = batch if isinstance(batch, pyarrow.Table) and all(_ in batch.column_names for _ in names) \
+                else first
+            open_files = min(partition_count(sample, names), max_open_files)
+            return file_sizing(
+                first.nbytes / max(first.num_rows, 1), target_file_size, row_group_size, open_files, write_memory
+            )
+
+        if parallel:
+            data, executor = self.parallel_cast(
+                batch, schema_arrow, cast, safe,
+                DEFAULT_MAX_WORKERS if parallel is True else int(parallel),
+                sizing, stats, kwargs
+            )
+        else:
+            data, executor = self.counted(cast_arrow(batch, schema_arrow, safe=safe) if cast else batch, stats), None
+
+        if sort_by:
+            data = self.sort_batches(data, sort_by, sort_memory, sizing, kwargs)
+
+        try:
+            write_dataset(
+                data,
+                base_dir=base_dir,
+                basename_template=basename_template,
+                partitioning=partitioning,
+                existing_data_behavior=existing_data_behavior,
+                filesystem=filesystem if filesystem else self.s3fs,
+                format=format if format else self.file_format,
+                file_options=_file_options,
+                file_visitor=visit,
+                **kwargs
+            )
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+        if self._index is not None:
+            # keep a loaded index up to date without listing
+            self._index.add(written)
+
+        if register_partitions:
+            new = sorted(stats.partitions - self.registered_partitions)
+            if new:
+                self.add_partitions(new)
+
+        return stats.finish()
+
+    def compact(
+        self,
+        partitions: Optional[Iterable[Union[str, dict]]] = None,
+        target_file_size: int = DEFAULT_TARGET_FILE_SIZE,
+        row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+        sort_by: Optional[Iterable[Union[str, tuple[str, str]]]] = None,
+        min_files: int = 2,
+        safe: bool = DEFAULT_SAFE_MODE,
+        filesystem: Optional[FileSystem] = None,
+        workers: int = DEFAULT_MAX_WORKERS,
+        cached: bool = False
+    ) -> WriteStats:
+        """
+        Rewrite partition files into fewer, bigger files of the table format
+
+        Each partition is read through self.schema_arrow cast and written to new files, then old files are deleted
+        On S3 and GCS, where PUT is atomic, files are written with their final names; on other filesystems to hidden
+        '_part-*' files, ignored by Athena and pyarrow, renamed once complete
+
+        Readers never see partial files nor miss rows, but queries listing the partition between the first
+        new file and the last delete read both old and new files and return duplicate rows.
+        If a write or rename fails, new files are deleted again and old files are kept.
+        Old files deletes are retried DELETE_ATTEMPTS times, then owlna.exception.CompactionError lists
+        the old files left, duplicated until deleted
+
+        table.compact([{"day": "2020-01-01"}], sort_by=["id"])
+
+        :param partitions: partition dicts or directories like 'day=2020-01-01', default all,
+            leading partition keys match all sub partitions, like {"year": 2024} on a year / month table
+        :param target_file_size: Arrow bytes per file
+        :param row_group_size: Arrow bytes per row group
+        :param sort_by: column names or (name, 'ascending' / 'descending'), see insert_arrow
+        :param min_files: skip partitions with fewer files, unless sort_by
+        :param safe: cast safe mode
+        :param filesystem: default self.s3fs
+        :param workers: partitions compacted concurrently
+        :param cached: files from self.index instead of listing the location
+        :return: owlna.writer.WriteStats, with deleted_files
+        :raise CompactionError: old files could not be deleted
+        """
+        filesystem = filesystem if filesystem else self.s3fs
+        location = self.pyarrow_location.rstrip("/")
+        names = self.partitioning.schema.names
+
+        files: dict[str, list[str]] = {}
+        for fragment in self.dataset(filesystem, cached).get_fragments():
+            files.setdefault(fragment.path[len(location) + 1:].rpartition("/")[0], []).append(fragment.path)
+
+        if partitions is not None:
+            directories = []
+            for partition in partitions:
+                if isinstance(partition, dict):
+                    if set(partition) != set(names[:len(partition)]):
+                        raise ValueError("Partition %s must have leading partition keys of %s" % (partition, names))
+                    directories.append("/".join("%s=%s" % (k, partition[k]) for k in names if k in partition))
+                else:
+                    directories.append(partition.strip("/"))
+
+            files = {
+                k: v for k, v in files.items()
+                if any(k == _ or k.startswith(_ + "/") for _ in directories)
+            }
+
+        selected = [
+            (directory, paths) for directory, paths in files.items()
+            if len(paths) >= min_files or (sort_by and paths)
+        ]
+        stats = WriteStats()
+
+        def compact_partition(item: tuple[str, list[str]]) -> WriteStats:
+            return self.compact_partition(
+                item[0], item[1], target_file_size, row_group_size, sort_by, safe, filesystem
+            )
+
+        if selected:
+            with ThreadPoolExecutor(min(workers, len(selected)), thread_name_prefix="owlna-compact") as executor:
+                for result in executor.map(compact_partition, selected):
+                    stats.merge(result)
+
+        return stats.finish()
+
+    def compact_partition(
+        self,
+        directory: str,
+        paths: list[str],
+        target_file_size: int,
+        row_group_size: int,
+        sort_by: Optional[Iterable[Union[str, tuple[str, str]]]],
+        safe: bool,
+        filesystem: FileSystem
+    ) -> WriteStats:
+        """
+        Compact one partition directory files, see self.compact
+        """
+        scan_options = {}
+        if isinstance(self.file_format, ParquetFileFormat):
+            scan_options["fragment_scan_options"] = ParquetFragmentScanOptions(pre_buffer=True)
+
+        data = FileSystemDataset.from_paths(
+            paths, schema=self.schema_arrow, format=self.file_format, filesystem=filesystem
+        ).scanner(batch_size=DEFAULT_BATCH_ROWS, use_threads=True, **scan_options).to_reader()
+
+        batches = iter_batches(data)
+        first = next(batches, None)
+        sizing = file_sizing(
+            first.nbytes / max(first.num_rows, 1) if first is not None else 1., target_file_size, row_group_size
+        )
+        data = RecordBatchReader.from_batches(
+            data.schema, itertools.chain([first] if first is not None else [], batches)
+        )
+
+        extension = ".snappy.parquet" if isinstance(self.file_format, ParquetFileFormat) \
+            else "." + self.file_format.default_extname
+        prefix = "" if filesystem.type_name in ATOMIC_WRITE_FILESYSTEMS else "_"
+        staged, published = [], []
+
+        try:
+            stats = self.insert_arrow(
+                data,
+                safe=safe,
+                base_dir=directory,
+                basename_template="%spart-{i}-%s%s" % (prefix, os.urandom(12).hex(), extension),
+                filesystem=filesystem,
+                file_visitor=lambda file: (staged if prefix else published).append(file.path),
+                register_partitions=False,
+                sort_by=sort_by,
+                **sizing
+            )
+
+            for path in staged:
+                folder, _, name = path.rpartition("/")
+                filesystem.move(path, folder + "/" + name[1:])
+                published.append(folder + "/" + name[1:])
+        except BaseException:
+            # back to old files only, published copies first
+            for path in [*published, *staged]:
+                try:
+                    filesystem.delete_file(path)
+                except FileNotFoundError:
+                    pass
+            raise
+
+        remaining, error = list(paths), None
+        for attempt in range(DELETE_ATTEMPTS):
+            if attempt:
+                time.sleep(DELETE_RETRY_WAIT * 2 ** (attempt - 1))
+
+            failed = []
+            for path in remaining:
+                try:
+                    filesystem.delete_file(path)
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    failed.append(path)
+                    error = e
+            remaining = failed
+
+            if not remaining:
+                break
+
+        deleted = [_ for _ in paths if _ not in remaining]
+        stats.deleted_files = len(deleted)
+
+        if self._index is not None:
+            self._index.remove(deleted)
+            self._index.add(
+                (_.path, _.size, _.mtime) for _ in filesystem.get_file_info(published)
+            )
+
+        if remaining:
+            raise CompactionError(directory, remaining, error)
+        return stats
+
+    def writer(self, **options) -> TableWriter:
+        """
+        Buffered writer for many small batches, see owlna.writer.TableWriter
+        """
+        return TableWriter(self, **options)
+
+    def parquet_options(
+        self,
+        schema_arrow: Schema,
+        partitioning: Partitioning,
+        sort_by: Optional[Iterable[Union[str, tuple[str, str]]]],
+        dictionary_columns: Union[Iterable[str], bool, None],
+        compression: Optional[str]
+    ) -> dict:
+        """
+        ParquetFileWriteOptions for insert_arrow sort_by, dictionary_columns and compression
+        """
+        options = {"write_statistics": True}
+
+        if compression:
+            options["compression"] = compression
+        if dictionary_columns is not None:
+            options["use_dictionary"] = dictionary_columns if isinstance(dictionary_columns, bool) \
+                else list(dictionary_columns)
+        if sort_by and hasattr(pq, "SortingColumn"):
+            # partition columns are constant in a file and not written
+            file_schema = schema([_ for _ in schema_arrow if _.name not in partitioning.schema.names])
+            keys = [_ for _ in sort_keys(sort_by) if _[0] not in partitioning.schema.names]
+            if keys:
+                options["sorting_columns"] = pq.SortingColumn.from_ordering(file_schema, keys)
+
+        return options
+
+    @staticmethod
+    def sort_batches(
+        data,
+        sort_by: Iterable[Union[str, tuple[str, str]]],
+        memory: int,
+        sizing: Callable[[RecordBatch], dict[str, int]],
+        write_options: dict
+    ):
+        """
+        Sort batches with owlna.utils.sort.external_sort
+
+        Sets write_options sizing of the first batch, keeps order
+        """
+        batches = iter_batches(data, DEFAULT_BATCH_ROWS)
+        first = next(batches, None)
+
+        if first is None:
+            # nothing left to sort
+            return data
+
+        for key, value in sizing(first).items():
+            write_options.setdefault(key, value)
+        if PRESERVE_ORDER:
+            write_options.setdefault("preserve_order", True)
+        else:
+            write_options["use_threads"] = False
+
+        return RecordBatchReader.from_batches(
+            first.schema,
+            external_sort(itertools.chain([first], batches), first.schema, sort_by, memory)
         )
+
+    @staticmethod
+    def counted(data, stats: WriteStats):
+        if isinstance(data, (RecordBatch, pyarrow.Table)):
+            stats.add(data)
+            return data
+        elif isinstance(data, (list, tuple)):
+            for _ in data:
+                stats.add(_)
+            return data
+        elif isinstance(data, RecordBatchReader):
+            return RecordBatchReader.from_batches(data.schema, stats.counted(data))
+        return stats.counted(iter_batches(data))
+
+    def parallel_cast(
+        self,
+        data,
+        schema_arrow: Schema,
+        cast: bool,
+        safe: bool,
+        workers: int,
+        sizing: Callable[[RecordBatch], dict[str, int]],
+        stats: WriteStats,
+        write_options: dict
+    ) -> tuple[RecordBatchReader, ThreadPoolExecutor]:
+        """
+        Cast batches on a thread pool, at most 2 * workers batches ahead of the writer
+
+        Sets write_options sizing of the first batch
+        """
+        batches = iter_batches(data, DEFAULT_BATCH_ROWS)
+        first = next(batches, None)
+
+        if first is None:
+            return RecordBatchReader.from_batches(schema_arrow, []), None
+
+        def cast_batch(b: RecordBatch) -> RecordBatch:
+            return cast_arrow(b, schema_arrow, safe=safe) if cast else b
+
+        first = cast_batch(first)
+        for key, value in sizing(first).items():
+            write_options.setdefault(key, value)
+        write_options.setdefault("use_threads", True)
+
+        executor = ThreadPoolExecutor(workers, thread_name_prefix="owlna-insert")
+        return RecordBatchReader.from_batches(
+            first.schema,
+            stats.counted(itertools.chain(
+                [first], imap(cast_batch, batches, executor, max_pending=2 * workers)
+            ))
+        ), executor
@@ -1,5 +1,6 @@
 __all__ = [
     "cast_batch", "cast_array", "cast_arrow",
+    "strings_to_array",
     "intersect_schemas",
     "timestamp_to_timestamp",
     "FLOAT64",
@@ -16,7 +17,8 @@ import pyarrow as pa
 import pyarrow.compute as pc
 
 from pyarrow import RecordBatch, Schema, schema as schema_builder, Field, field as field_builder, Array, DataType, \
-    Decimal128Type, Decimal256Type, TimestampType, ArrowInvalid, Time64Type, Table, RecordBatchReader, array
+    Decimal128Type, Decimal256Type, TimestampType, ArrowInvalid, ArrowNotImplementedError, Time64Type, Table, \
+    RecordBatchReader, array
 
 from ..config import DEFAULT_SAFE_MODE
 
@@ -130,7 +132,9 @@ def string_to_date(arr: Array, safe: bool = DEFAULT_SAFE_MODE, **kwargs):
 
 
 def string_to_time(arr: Array, dtype: Time64Type, safe: bool = DEFAULT_SAFE_MODE, **kwargs):
-    return string_to_timestamp(arr, pyarrow.timestamp(dtype.unit), safe=safe).cast(dtype, safe)
+    # 'HH:MM:SS[.fff]' is no timestamp text, parsed on epoch day
+    day = pc.binary_join_element_wise("1970-01-01 ", arr, "")
+    return string_to_timestamp(day, pyarrow.timestamp("ns"), safe=safe).cast(TIMENS, safe).cast(dtype, safe)
 
 
 def timestamp_to_timestamp(arr: Array, dtype: TimestampType, safe: bool = DEFAULT_SAFE_MODE, **kwargs):
@@ -197,6 +201,27 @@ def cast_array(array: Array, dtype: DataType, safe: bool = DEFAULT_SAFE_MODE):
         return array.cast(dtype, safe=safe)
 
 
+def strings_to_array(
+    values: list[Optional[str]],
+    dtype: DataType,
+    safe: bool = DEFAULT_SAFE_MODE
+) -> Array:
+    """
+    Build typed array from text values, like Athena get_query_results VarCharValue
+
+    Uses arrow string parsing, exact for integers and decimals, cast_array as fallback
+    """
+    arr = array(values, STRING)
+
+    if pa.types.is_timestamp(dtype) and dtype.tz is not None:
+        return timestamp_to_timestamp(string_to_timestamp(arr, pa.timestamp(dtype.unit), safe), dtype, safe)
+
+    try:
+        return arr.cast(dtype, safe=safe)
+    except (ArrowInvalid, ArrowNotImplementedError):
+        return cast_array(arr, dtype, safe)
+
+
 def cast_batch(
     batch: Union[RecordBatch, Table], schema: Schema, safe: bool = DEFAULT_SAFE_MODE,
     fill_empty: bool = True,
@@ -0,0 +1,46 @@
+__all__ = ["LRUDict"]
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUDict:
+    """
+    Thread safe dict keeping the maxsize last used keys
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key: Hashable):
+        return key in self.data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            try:
+                self.data.move_to_end(key)
+                return self.data[key]
+            except KeyError:
+                return default
+
+    def __setitem__(self, key: Hashable, value: Any):
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            return self.data.pop(key, default)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
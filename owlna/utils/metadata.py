@@ -2,10 +2,12 @@ __all__ = [
     "dict_table_metadata_to_table",
     "dict_to_pyarrow_field",
     "sqltype_to_datatype",
-    "query_result_column_to_pyarrow_field"
+    "query_result_column_to_pyarrow_field",
+    "decode_csv_metadata"
 ]
 
-from typing import Optional
+import re
+from typing import Optional, Union
 
 import pyarrow
 from pyarrow import field, DataType, Field
@@ -54,7 +56,20 @@ DATATYPES = {
     "varchar": lambda precision=None, *args, **kwargs:
         pyarrow.large_string() if precision is not None and precision > 42000 else pyarrow.string(),
     "time": lambda precision=9, *args, **kwargs: TIMETYPES[int_to_timeunit(precision)],
-    "timestamp with time zone": lambda **kwargs: pyarrow.string()
+    "timestamp with time zone": lambda **kwargs: pyarrow.string(),
+    "real": lambda *args, **kwargs: pyarrow.float32(),
+    # query result CSV text representations, read as string
+    "varbinary": lambda *args, **kwargs: pyarrow.string(),
+    "time with time zone": lambda **kwargs: pyarrow.string(),
+    "interval year to month": lambda **kwargs: pyarrow.string(),
+    "interval day to second": lambda **kwargs: pyarrow.string(),
+    "json": lambda *args, **kwargs: pyarrow.string(),
+    "ipaddress": lambda *args, **kwargs: pyarrow.string(),
+    "uuid": lambda *args, **kwargs: pyarrow.string(),
+    "array": lambda *args, **kwargs: pyarrow.string(),
+    "map": lambda *args, **kwargs: pyarrow.string(),
+    "row": lambda *args, **kwargs: pyarrow.string(),
+    "unknown": lambda *args, **kwargs: pyarrow.string()
 }
 
 
@@ -64,9 +79,19 @@ def sqltype_to_datatype(
     tz: Optional[str] = "UTC",
     **kwargs
 ) -> DataType:
-    if '(' in sqltype:
+    if "with time zone" in sqltype:
+        # timestamp(3) with time zone: per row zone name, like 2022-01-01 00:00:00.000 UTC
+        return DATATYPES[re.sub(r"\s*\(\d+\)", "", sqltype)](**kwargs)
+    elif '(' in sqltype:
         key, args = sqltype.split("(", 1)
-        return DATATYPES[key](*(int(_) for _ in args[:-1].split(",")))
+        key = key.strip()
+
+        if key in {"array", "map", "row"}:
+            return DATATYPES[key]()
+        args = [int(_) for _ in args[:-1].split(",")]
+        if key == "decimal":
+            return DATATYPES[key](*args)
+        return DATATYPES[key](unit=unit, tz=tz, **{**kwargs, "precision": args[0]})
     else:
         return DATATYPES[sqltype](unit=unit, tz=tz, **kwargs)
 
@@ -128,3 +153,94 @@ def query_result_column_to_pyarrow_field(meta: dict) -> Field:
             k: str(v) for k, v in meta.items() if k not in {"Name", "Nullable"}
         }
     )
+
+
+# Athena <QueryExecutionId>.csv.metadata protobuf fields
+CSV_METADATA_COLUMN_INFO = {
+    1: "CatalogName",
+    2: "SchemaName",
+    3: "TableName",
+    4: "Name",
+    5: "Label",
+    6: "Type",
+    7: "Precision",
+    8: "Scale",
+    9: "Nullable",
+    10: "CaseSensitive"
+}
+CSV_METADATA_NULLABLE = ["NOT_NULL", "NULLABLE", "UNKNOWN"]
+
+
+def read_varint(data: bytes, position: int) -> tuple[int, int]:
+    result, shift = 0, 0
+    while True:
+        byte = data[position]
+        position += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, position
+        shift += 7
+
+
+def decode_protobuf(data: bytes) -> list[tuple[int, Union[int, bytes]]]:
+    """
+    Decode protobuf wire format message to [(field number, varint or bytes)]
+    """
+    fields, position = [], 0
+
+    while position < len(data):
+        key, position = read_varint(data, position)
+        number, wire_type = key >> 3, key & 0x07
+
+        if wire_type == 0:
+            value, position = read_varint(data, position)
+        elif wire_type == 1:
+            value, position = data[position:position + 8], position + 8
+        elif wire_type == 2:
+            size, position = read_varint(data, position)
+            value, position = data[position:position + size], position + size
+        elif wire_type == 5:
+            value, position = data[position:position + 4], position + 4
+        else:
+            raise ValueError("Unsupported protobuf wire type %s" % wire_type)
+
+        if position > len(data):
+            raise ValueError("Truncated protobuf message")
+        fields.append((number, value))
+
+    return fields
+
+
+def decode_csv_metadata(data: bytes) -> list[dict]:
+    """
+    Parse Athena query result .csv.metadata file to get_query_results ColumnInfo dicts
+
+    :param data: raw file bytes
+    :rtype list[dict]: [{'Name': ..., 'Type': ..., 'Precision': ..., 'Scale': ..., 'Nullable': ...}]
+    """
+    columns = []
+
+    for number, value in decode_protobuf(data):
+        if number != 1 or not isinstance(value, bytes):
+            continue
+
+        column = {"Precision": 0, "Scale": 0, "Nullable": "NOT_NULL", "CaseSensitive": False}
+        for key, item in decode_protobuf(value):
+            name = CSV_METADATA_COLUMN_INFO.get(key)
+
+            if name is None:
+                continue
+            elif name == "Nullable":
+                column[name] = CSV_METADATA_NULLABLE[item]
+            elif name == "CaseSensitive":
+                column[name] = bool(item)
+            elif isinstance(item, bytes):
+                column[name] = item.decode("utf-8")
+            else:
+                column[name] = item
+
+        if "Name" not in column or "Type" not in column:
+            raise ValueError("Invalid column metadata %s" % column)
+        columns.append(column)
+
+    return columns
@@ -0,0 +1,274 @@
+__all__ = [
+    "imap",
+    "prefetched",
+    "byte_ranges",
+    "record_boundary",
+    "read_csv_ranges"
+]
+
+import queue
+import threading
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, Iterator, Optional, TypeVar, Union
+
+import pyarrow
+import pyarrow.csv as pcsv
+from pyarrow import RecordBatch, NativeFile
+
+from ..config import DEFAULT_MAX_WORKERS
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def imap(
+    func: Callable[[T], R],
+    iterable: Iterable[T],
+    executor: ThreadPoolExecutor,
+    max_pending: int,
+    ordered: bool = True
+) -> Iterator[R]:
+    """
+    Lazy executor.map with at most max_pending submitted tasks
+
+    :param func: function to apply
+    :param iterable: input items, consumed as results are yielded
+    :param executor: concurrent.futures.ThreadPoolExecutor
+    :param max_pending: bound submitted, not yet yielded tasks = memory bound
+    :param ordered: yield in input order, else in completion order
+    """
+    pending: deque[Future] = deque()
+    items = iter(iterable)
+    exhausted = False
+
+    try:
+        while True:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    pending.append(executor.submit(func, next(items)))
+                except StopIteration:
+                    exhausted = True
+
+            if not pending:
+                return
+
+            if ordered:
+                yield pending.popleft().result()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def prefetched(
+    iterable: Iterable[T],
+    size: int,
+    name: str = "owlna-prefetch"
+) -> Iterator[T]:
+    """
+    Consume iterable on a background thread, at most size items ahead of the caller
+
+    Producer exceptions are raised in the caller, closing the returned generator
+    stops the producer and closes the iterable
+
+    :param iterable: input items, generators are closed in the background thread
+    :param size: bounded queue size, 0 = no background thread
+    :param name: thread name
+    """
+    if size <= 0:
+        yield from iterable
+        return
+
+    items: queue.Queue = queue.Queue(maxsize=size)
+    stop = threading.Event()
+    done = object()
+
+    def put(item: tuple) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        iterator = iter(iterable)
+        try:
+            for item in iterator:
+                if not put((item, None)):
+                    return
+        except BaseException as e:
+            put((done, e))
+            return
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+        put((done, None))
+
+    thread = threading.Thread(target=produce, name=name, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item, error = items.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def byte_ranges(size: int, block_size: int) -> list[tuple[int, int]]:
+    return [
+        (offset, min(block_size, size - offset))
+        for offset in range(0, size, block_size)
+    ]
+
+
+def record_boundary(
+    data: bytes,
+    in_quotes: bool = False,
+    quote_char: Union[bytes, bool] = b'"',
+    newline: bytes = b"\n"
+) -> int:
+    """
+    Find the first record start in data, a newline outside quoted field
+
+    Quotes are escaped by doubling so quote parity tells if we are inside a field
+
+    :param data: bytes chunk
+    :param in_quotes: chunk starts inside a quoted field
+    :param quote_char: CSV quote char, False if not quoted
+    :param newline: record delimiter
+    :return: position after the newline, -1 if not found
+    """
+    position, quotes = 0, int(in_quotes)
+
+    while True:
+        end = data.find(newline, position)
+        if end < 0:
+            return -1
+        if quote_char:
+            quotes += data.count(quote_char, position, end)
+        if quotes % 2 == 0:
+            return end + 1
+        position = end + 1
+
+
+def read_range(file: NativeFile, offset: int, length: int) -> bytes:
+    # read_at is thread safe, S3 ranged GET
+    return file.read_at(length, offset)
+
+
+def aligned_blocks(
+    chunks: Iterable[bytes],
+    quote_char: Union[bytes, bool] = b'"'
+) -> Iterator[bytes]:
+    """
+    Re-cut ordered byte chunks on record boundaries
+    """
+    carry, in_quotes = b"", False
+
+    for chunk in chunks:
+        boundary = record_boundary(chunk, in_quotes, quote_char)
+
+        if boundary < 0:
+            carry += chunk
+        else:
+            block = carry + chunk[:boundary]
+            if block:
+                yield block
+            carry = chunk[boundary:]
+
+        if quote_char:
+            in_quotes = (int(in_quotes) + chunk.count(quote_char)) % 2 == 1
+
+    if carry:
+        yield carry
+
+
+def read_csv_ranges(
+    file: NativeFile,
+    column_names: list[str],
+    read_options: Optional[pcsv.ReadOptions] = None,
+    parse_options: Optional[pcsv.ParseOptions] = None,
+    convert_options: Optional[pcsv.ConvertOptions] = None,
+    block_size: int = 44040192,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    ordered: bool = True,
+    timeline: Optional["QueryTimeline"] = None
+) -> Iterator[RecordBatch]:
+    """
+    Download CSV file with concurrent byte range requests and parse blocks on a thread pool
+
+    File is split in block_size ranges, re-aligned on record boundaries (quoted newlines included)
+    The first line is skipped as header, column_names are used for all blocks
+
+    :param file: random access file, from pyarrow.fs.FileSystem.open_input_file
+    :param column_names: CSV header names
+    :param read_options: pyarrow.csv.ReadOptions, skip_rows and column_names are overridden
+    :param parse_options: pyarrow.csv.ParseOptions
+    :param convert_options: pyarrow.csv.ConvertOptions
+    :param block_size: byte range size
+    :param max_workers: concurrent downloads / parsing
+    :param ordered: keep file order, else yield batches as soon as parsed
+    :param timeline: owlna.metrics.QueryTimeline, adds download and parse durations
+    """
+    read_options = read_options if read_options else pcsv.ReadOptions()
+    parse_options = parse_options if parse_options else pcsv.ParseOptions()
+    quote_char = parse_options.quote_char.encode() if parse_options.quote_char else False
+
+    def timer(name: str):
+        return nullcontext() if timeline is None else timeline.timer(name)
+
+    def download(args: tuple[int, int]) -> bytes:
+        with timer("download"):
+            return read_range(file, *args)
+
+    def parse(args: tuple[int, bytes]) -> list[RecordBatch]:
+        with timer("parse"):
+            return parse_block(*args)
+
+    def parse_block(index: int, block: bytes) -> list[RecordBatch]:
+        options = pcsv.ReadOptions(
+            use_threads=False,
+            block_size=len(block) + 1,
+            skip_rows=1 if index == 0 else 0,
+            column_names=column_names,
+            encoding=read_options.encoding
+        )
+        return pcsv.read_csv(
+            pyarrow.py_buffer(block),
+            read_options=options,
+            parse_options=parse_options,
+            convert_options=convert_options
+        ).to_batches()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        chunks = imap(
+            download,
+            byte_ranges(file.size(), block_size),
+            executor,
+            max_pending=max_workers
+        )
+
+        for batches in imap(
+            parse,
+            enumerate(aligned_blocks(chunks, quote_char)),
+            executor,
+            max_pending=max_workers,
+            ordered=ordered
+        ):
+            for batch in batches:
+                yield batch
@@ -0,0 +1,196 @@
+__all__ = ["TokenBucket", "AdaptiveRateLimiter"]
+
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from ..config import DEFAULT_API_RATE, DEFAULT_API_MIN_RATE
+
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "Throttling",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "SlowDown",
+    "RequestThrottled",
+    "RequestThrottledException"
+}
+
+
+class TokenBucket:
+    """
+    Thread safe token bucket, rate tokens per second up to burst tokens
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        :param rate: tokens added per second
+        :param burst: bucket capacity, default max(1, rate)
+        """
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1., rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return "TokenBucket(rate=%s, burst=%s)" % (self.rate, self.burst)
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """
+        :return: 0 if acquired, else seconds to wait before tokens are available
+        """
+        with self.lock:
+            self.refill(time.monotonic())
+
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Block until tokens are available
+
+        :param timeout: maximum seconds to wait, None = no limit
+        :return: False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return True
+            if deadline is not None:
+                if time.monotonic() + wait > deadline:
+                    return False
+            time.sleep(wait)
+
+
+class AdaptiveRateLimiter:
+    """
+    Process wide client side rate limit per API operation, additive increase / multiplicative decrease
+
+    Attached boto3 clients take a token before every HTTP attempt, retries included,
+    throttling errors divide the operation rate by 1 / decrease,
+    successes bring it back up by about increase calls per second, every second
+
+    owlna.Athena attaches its athena and s3 boto3 clients, like TableIndex listings; pyarrow S3FileSystem
+    calls go through the AWS C++ SDK, not botocore, and are only retried by it, see S3_MAX_ATTEMPTS
+    """
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_API_RATE,
+        min_rate: float = DEFAULT_API_MIN_RATE,
+        increase: float = 1.,
+        decrease: float = 0.5
+    ):
+        """
+        :param rate: initial and maximum calls per second per operation
+        :param min_rate: minimum calls per second per operation
+        :param increase: calls per second added per second of successful calls
+        :param decrease: rate factor on throttling
+        """
+        self.rate = rate
+        self.min_rate = min_rate
+        self.increase = increase
+        self.decrease = decrease
+
+        self.buckets: dict[str, TokenBucket] = {}
+        self.calls = Counter()
+        self.throttles = Counter()
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return "AdaptiveRateLimiter(rate=%s, operations=%s)" % (self.rate, len(self.buckets))
+
+    @classmethod
+    def shared(cls) -> "AdaptiveRateLimiter":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def bucket(self, operation: str) -> TokenBucket:
+        with self.lock:
+            if operation not in self.buckets:
+                self.buckets[operation] = TokenBucket(self.rate)
+            return self.buckets[operation]
+
+    def set_rate(self, bucket: TokenBucket, rate: float):
+        with bucket.lock:
+            bucket.refill(time.monotonic())
+            bucket.rate = rate
+            bucket.burst = max(1., rate)
+            bucket.tokens = min(bucket.tokens, bucket.burst)
+
+    def acquire(self, operation: str):
+        self.bucket(operation).acquire()
+
+    def succeeded(self, operation: str):
+        bucket = self.bucket(operation)
+        with self.lock:
+            self.calls[operation] += 1
+        if bucket.rate < self.rate:
+            self.set_rate(bucket, min(self.rate, bucket.rate + self.increase / bucket.rate))
+
+    def throttled(self, operation: str):
+        bucket = self.bucket(operation)
+        with self.lock:
+            self.calls[operation] += 1
+            self.throttles[operation] += 1
+        self.set_rate(bucket, max(self.min_rate, bucket.rate * self.decrease))
+
+    def rates(self) -> dict[str, dict]:
+        """
+        :return: {operation: {"rate": current calls per second, "calls": attempts, "throttles": throttled attempts}}
+        """
+        with self.lock:
+            return {
+                operation: {
+                    "rate": bucket.rate,
+                    "calls": self.calls[operation],
+                    "throttles": self.throttles[operation]
+                }
+                for operation, bucket in self.buckets.items()
+            }
+
+    # botocore events
+    @staticmethod
+    def operation(event_name: str) -> str:
+        # before-send.athena.GetQueryExecution -> athena.GetQueryExecution
+        return event_name.split(".", 1)[-1]
+
+    def before_send(self, event_name: str, **kwargs):
+        self.acquire(self.operation(event_name))
+
+    def needs_retry(self, event_name: str, response=None, caught_exception=None, **kwargs):
+        operation = self.operation(event_name)
+
+        if response is not None:
+            code = response[1].get("Error", {}).get("Code")
+            if code in THROTTLING_ERROR_CODES:
+                self.throttled(operation)
+            elif response[0].status_code < 400:
+                self.succeeded(operation)
+
+    def attach(self, client):
+        """
+        Rate limit boto3 client calls, attaching twice is a no-op
+        """
+        events = getattr(getattr(client, "meta", None), "events", None)
+        if events is None:
+            return
+
+        service = client.meta.service_model.service_id.hyphenize()
+        events.register("before-send.%s" % service, self.before_send, unique_id="owlna-ratelimit-send")
+        # registered first: the retry handler stops the event emission when returning its delay
+        events.register_first("needs-retry.%s" % service, self.needs_retry, unique_id="owlna-ratelimit-retry")
@@ -0,0 +1,161 @@
+__all__ = [
+    "sort_keys",
+    "external_sort"
+]
+
+import math
+import os
+import tempfile
+from typing import Iterable, Iterator, Optional, Union
+
+import pyarrow
+import pyarrow.compute as pc
+import pyarrow.ipc
+from pyarrow import RecordBatch, Schema, Table
+
+from ..config import DEFAULT_SORT_MEMORY
+
+SortKeys = Iterable[Union[str, tuple[str, str]]]
+# spilled run file batch rows, sliced to the merge memory budget
+SPILL_BATCH_ROWS = 65536
+
+
+def sort_keys(keys: SortKeys) -> list[tuple[str, str]]:
+    """
+    Column names or (name, 'ascending' / 'descending') as pyarrow sort keys
+    """
+    return [(_, "ascending") if isinstance(_, str) else (_[0], _[1]) for _ in keys]
+
+
+def sorted_until(table: Table, bound: dict, keys: list[tuple[str, str]]) -> int:
+    """
+    Number of first rows of sorted table ordered before or equal to bound row,
+    like Table.sort_by: NaN after other values, nulls last, in both orders
+    """
+    before = None
+    for name, order in reversed(keys):
+        column, value = table[name], bound[name]
+        nan = pc.fill_null(pc.is_nan(column), False) if pyarrow.types.is_floating(column.type) else None
+
+        if value is None:
+            lt, eq = pc.is_valid(column), pc.is_null(column)
+        elif isinstance(value, float) and math.isnan(value):
+            lt, eq = pc.and_(pc.is_valid(column), pc.invert(nan)), nan
+        else:
+            # NaN compares false, ordered after value
+            lt = pc.fill_null(pc.less(column, value) if order == "ascending" else pc.greater(column, value), False)
+            eq = pc.fill_null(pc.equal(column, value), False)
+
+        before = pc.or_(lt, eq) if before is None else pc.or_(lt, pc.and_(eq, before))
+
+    return pc.sum(before).as_py() or 0
+
+
+def spill(table: Table, directory: str, batch_rows: int) -> str:
+    path = os.path.join(directory, "run-%s.arrow" % os.urandom(8).hex())
+    with pyarrow.ipc.new_file(path, table.schema) as writer:
+        writer.write_table(table, max_chunksize=batch_rows)
+    return path
+
+
+def chunks(path: str, rows: int) -> Iterator[Table]:
+    """
+    Run file as tables of at most rows rows, memory mapped and sliced without copy
+    """
+    with pyarrow.memory_map(path) as source:
+        reader = pyarrow.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            for offset in range(0, batch.num_rows, rows):
+                yield Table.from_batches([batch.slice(offset, rows)])
+
+
+def merge(paths: list[str], schema: Schema, keys: list[tuple[str, str]], memory: int) -> Iterator[RecordBatch]:
+    """
+    Merge sorted run files: rows up to the smallest buffered run tail are final
+
+    Each run buffers memory / len(paths) Arrow bytes, so merged rows are bounded by memory for any number of runs
+    """
+    rows = []
+    for path in paths:
+        with pyarrow.memory_map(path) as source:
+            reader = pyarrow.ipc.open_file(source)
+            batch = reader.get_batch(0) if reader.num_record_batches else None
+            bytes_per_row = batch.nbytes / max(batch.num_rows, 1) if batch is not None else 1.
+        rows.append(max(int(memory / len(paths) / max(bytes_per_row, 1.)), 1))
+
+    runs = [chunks(path, n) for path, n in zip(paths, rows)]
+    buffers: list[Optional[Table]] = [None] * len(runs)
+
+    try:
+        while True:
+            for i, run in enumerate(runs):
+                if run is not None and (buffers[i] is None or buffers[i].num_rows == 0):
+                    buffers[i] = next(run, None)
+                    if buffers[i] is None:
+                        runs[i] = None
+
+            active = [i for i, buffer in enumerate(buffers) if buffer is not None and buffer.num_rows]
+            if not active:
+                return
+
+            tails = pyarrow.concat_tables([buffers[i].slice(buffers[i].num_rows - 1) for i in active])
+            tails = tails.append_column("__run", pyarrow.array(active, pyarrow.int64())).sort_by(keys)
+            bound = tails.slice(0, 1).to_pylist()[0]
+
+            parts = []
+            for i in active:
+                # the bound run buffer is taken whole: progress whatever comparisons return
+                n = buffers[i].num_rows if i == bound["__run"] else sorted_until(buffers[i], bound, keys)
+                if n:
+                    parts.append(buffers[i].slice(0, n))
+                    buffers[i] = buffers[i].slice(n)
+
+            if parts:
+                yield from pyarrow.concat_tables(parts).sort_by(keys).combine_chunks().to_batches()
+    finally:
+        for run in runs:
+            if run is not None:
+                run.close()
+
+
+def external_sort(
+    batches: Iterable[RecordBatch],
+    schema: Schema,
+    keys: SortKeys,
+    memory: int = DEFAULT_SORT_MEMORY,
+    directory: Optional[str] = None
+) -> Iterator[RecordBatch]:
+    """
+    Sort batches with bounded memory
+
+    Batches are buffered up to memory Arrow bytes, sorted and spilled to local Arrow IPC run files,
+    then merged; input fitting in memory is sorted without spilling
+
+    :param batches: record batches of schema
+    :param schema: batches schema
+    :param keys: column names or (name, 'ascending' / 'descending')
+    :param memory: Arrow bytes buffered before spilling a sorted run, and merged at once
+    :param directory: run files directory, default tempfile.gettempdir()
+    """
+    keys = sort_keys(keys)
+    buffer, size, runs = [], 0, []
+
+    with tempfile.TemporaryDirectory(prefix="owlna-sort-", dir=directory) as tmp:
+        for batch in batches:
+            buffer.append(batch)
+            size += batch.nbytes
+
+            if size >= memory:
+                runs.append(spill(Table.from_batches(buffer, schema).sort_by(keys), tmp, SPILL_BATCH_ROWS))
+                buffer, size = [], 0
+
+        if not runs:
+            yield from Table.from_batches(buffer, schema).sort_by(keys).combine_chunks().to_batches()
+            return
+
+        if buffer:
+            runs.append(spill(Table.from_batches(buffer, schema).sort_by(keys), tmp, SPILL_BATCH_ROWS))
+            buffer = []
+
+        yield from merge(runs, schema, keys, memory)
@@ -0,0 +1,379 @@
+__all__ = ["WriteStats", "TableWriter"]
+
+import threading
+import time
+from typing import Union, Iterable, Iterator, Optional
+
+import pyarrow
+import pyarrow.compute as pc
+from pyarrow import RecordBatch, RecordBatchReader
+
+from .config import DEFAULT_SAFE_MODE, DEFAULT_TARGET_FILE_SIZE, DEFAULT_WRITER_MAX_ROWS, DEFAULT_WRITER_MAX_DELAY, \
+    DEFAULT_WRITE_MEMORY, DEFAULT_WRITER_MAX_BUFFERED_BYTES, DEFAULT_REGISTER_PARTITIONS
+from .utils.arrow import cast_arrow
+
+
+class WriteStats:
+    """
+    Table.insert_arrow rows, bytes and files written, with throughput
+
+    bytes = Arrow in memory size of written rows, file_bytes = written file sizes
+    partitions = written hive partition directories relative to table location, like 'day=2020-01-01'
+    deleted_files = files replaced by Table.compact
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.bytes = 0
+        self.files = 0
+        self.file_bytes = 0
+        self.partitions: set[str] = set()
+        self.deleted_files = 0
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return "WriteStats(rows=%s, files=%s, %.0f rows/s, %.1f MB/s)" % (
+            self.rows, self.files, self.rows_per_second, self.bytes_per_second / 1024 ** 2
+        )
+
+    @property
+    def seconds(self) -> float:
+        return (self.finished if self.finished is not None else time.perf_counter()) - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.
+
+    def add(self, data: Union[RecordBatch, pyarrow.Table]):
+        with self.lock:
+            self.rows += data.num_rows
+            self.bytes += data.nbytes
+
+    def add_file(self, size: Optional[int], partition: str):
+        with self.lock:
+            self.files += 1
+            self.file_bytes += size or 0
+            if partition:
+                self.partitions.add(partition)
+
+    def counted(self, batches: Iterable[RecordBatch]) -> Iterator[RecordBatch]:
+        for batch in batches:
+            self.add(batch)
+            yield batch
+
+    def finish(self) -> "WriteStats":
+        self.finished = time.perf_counter()
+        return self
+
+    def merge(self, other: "WriteStats"):
+        with self.lock:
+            self.rows += other.rows
+            self.bytes += other.bytes
+            self.files += other.files
+            self.file_bytes += other.file_bytes
+            self.partitions.update(other.partitions)
+            self.deleted_files += other.deleted_files
+
+
+def iter_batches(
+    data: Union[RecordBatch, pyarrow.Table, RecordBatchReader, Iterable[Union[RecordBatch, pyarrow.Table]]],
+    max_chunksize: Optional[int] = None
+) -> Iterator[RecordBatch]:
+    """
+    Split insert_arrow input in record batches, tables in chunks of at most max_chunksize rows
+    """
+    if isinstance(data, RecordBatch):
+        yield data
+    elif isinstance(data, pyarrow.Table):
+        yield from data.to_batches(max_chunksize)
+    else:
+        for item in data:
+            yield from iter_batches(item, max_chunksize)
+
+
+def file_sizing(
+    bytes_per_row: float,
+    target_file_size: int,
+    row_group_size: int,
+    open_files: int = 1,
+    memory: int = DEFAULT_WRITE_MEMORY
+) -> dict[str, int]:
+    """
+    pyarrow.dataset.write_dataset row limits for Arrow byte size targets
+
+    write_dataset buffers min_rows_per_group rows per open file before writing a row group,
+    so min_rows_per_group is capped to memory / open_files: buffered rows peak at about memory
+    Arrow bytes, plus the batches in flight; open_files should be the partitions actually written,
+    one or a few partitions keep full row_group_size row groups
+
+    :param bytes_per_row: Arrow in memory bytes per row
+    :param target_file_size: Arrow bytes per file
+    :param row_group_size: Arrow bytes per row group, max_rows_per_group
+    :param open_files: files written at once, write_dataset max_open_files when partitioned
+    :param memory: Arrow bytes buffered by write_dataset over all open files
+    """
+    bytes_per_row = max(bytes_per_row, 1.)
+    rows_per_file = max(int(target_file_size / bytes_per_row), 1)
+    rows_per_group = min(max(int(row_group_size / bytes_per_row), 1), rows_per_file)
+
+    return {
+        "max_rows_per_file": rows_per_file,
+        "min_rows_per_group": max(min(rows_per_group, int(memory / max(open_files, 1) / bytes_per_row)), 1),
+        "max_rows_per_group": rows_per_group
+    }
+
+
+def partition_count(data: Union[RecordBatch, pyarrow.Table], names: list[str]) -> int:
+    """
+    Distinct partition values in data, 1 if not partitioned
+    """
+    if not names or data.num_rows == 0:
+        return 1
+    if isinstance(data, RecordBatch):
+        data = pyarrow.Table.from_batches([data])
+    return data.select(names).group_by(names).aggregate([]).num_rows
+
+
+class PartitionBuffer:
+
+    def __init__(self):
+        self.batches: list[RecordBatch] = []
+        self.rows = 0
+        self.bytes = 0
+        self.created = time.monotonic()
+
+    def append(self, batch: RecordBatch):
+        self.batches.append(batch)
+        self.rows += batch.num_rows
+        self.bytes += batch.nbytes
+
+
+class TableWriter:
+    """
+    Buffer small batches per partition, write one file per partition when full
+
+    A partition buffer is written with Table.insert_arrow when it holds max_rows rows,
+    max_bytes Arrow bytes, or is older than max_delay seconds; the largest buffers are written
+    when all hold more than max_buffered_bytes; everything left is written on close
+
+    A buffer failing to write before any file is kept and written again on the next flush, a buffer
+    failing once files are written is not, to not duplicate rows; partitions are registered after
+    their files, failed registrations are retried on the next flush
+    The background thread keeps retrying, its last error is raised once by the next write,
+    close raises and flush can be called again
+
+    with table.writer(max_rows=1000000) as writer:
+        for batch in stream:
+            writer.write(batch)
+    """
+
+    def __init__(
+        self,
+        table: "owlna.table.Table",
+        max_rows: int = DEFAULT_WRITER_MAX_ROWS,
+        max_bytes: int = DEFAULT_TARGET_FILE_SIZE,
+        max_delay: Optional[float] = DEFAULT_WRITER_MAX_DELAY,
+        max_buffered_bytes: int = DEFAULT_WRITER_MAX_BUFFERED_BYTES,
+        safe: bool = DEFAULT_SAFE_MODE,
+        register_partitions: bool = DEFAULT_REGISTER_PARTITIONS,
+        **insert_options
+    ):
+        """
+        :param table: owlna.Table
+        :param max_rows: rows per partition file
+        :param max_bytes: Arrow bytes per partition file
+        :param max_delay: seconds before a partition buffer is written, checked by a background
+            thread, None = only on size or close
+        :param max_buffered_bytes: Arrow bytes buffered over all partitions
+        :param safe: cast safe mode
+        :param register_partitions: add written partitions with table.add_partitions
+        :param insert_options: other Table.insert_arrow options, like filesystem
+        """
+        self.table = table
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self.max_buffered_bytes = max_buffered_bytes
+        self.safe = safe
+        self.register_partitions = register_partitions and table.partitioned
+        self.insert_options = insert_options
+        # written partitions to register
+        self.unregistered: set[str] = set()
+
+        self.schema = table.dataset_schema if table.partitioned else table.schema_arrow
+        self.keys = table.partitioning.schema.names
+        self.buffers: dict[tuple, PartitionBuffer] = {}
+        self.stats = WriteStats()
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+        self.error: Optional[BaseException] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def __repr__(self):
+        return "TableWriter(%s, buffered=%s, %s)" % (self.table, len(self.buffers), self.stats)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def buffered_rows(self) -> int:
+        with self.lock:
+            return sum(_.rows for _ in self.buffers.values())
+
+    def split(self, batch: RecordBatch) -> Iterator[tuple[tuple, RecordBatch]]:
+        """
+        Split batch by partition values
+        """
+        if not self.keys or batch.num_rows == 0:
+            yield (), batch
+            return
+
+        table = pyarrow.Table.from_batches([batch])
+        if all(pc.count_distinct(table[_]).as_py() <= 1 for _ in self.keys):
+            yield tuple(table[_][0].as_py() for _ in self.keys), batch
+            return
+
+        groups = table.append_column("__index", pyarrow.array(range(table.num_rows), pyarrow.int64())) \
+            .group_by(self.keys).aggregate([("__index", "list")])
+        for row, indices in zip(groups.select(self.keys).to_pylist(), groups["__index_list"]):
+            part = table.take(indices.values)
+            for chunk in part.to_batches():
+                yield tuple(row[_] for _ in self.keys), chunk
+
+    def write(self, data: Union[RecordBatch, pyarrow.Table, RecordBatchReader, Iterable[RecordBatch]]):
+        """
+        Cast and buffer data, write full partition buffers
+        """
+        if self.closed.is_set():
+            raise ValueError("%s is closed" % self)
+        if self.error is not None:
+            # background flush failure, its buffers are kept
+            error, self.error = self.error, None
+            raise error
+
+        full = []
+        for batch in iter_batches(data):
+            batch = cast_arrow(batch, self.schema, safe=self.safe)
+
+            with self.lock:
+                for key, part in self.split(batch):
+                    buffer = self.buffers.setdefault(key, PartitionBuffer())
+                    buffer.append(part)
+
+                    if buffer.rows >= self.max_rows or buffer.bytes >= self.max_bytes:
+                        full.append((key, self.buffers.pop(key)))
+
+                size = sum(_.bytes for _ in self.buffers.values())
+                while size > self.max_buffered_bytes:
+                    key = max(self.buffers, key=lambda _: self.buffers[_].bytes)
+                    size -= self.buffers[key].bytes
+                    full.append((key, self.buffers.pop(key)))
+
+        if self.max_delay is not None and self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="owlna-writer", daemon=True)
+            self.thread.start()
+
+        self.write_buffers(full)
+
+    def write_buffers(self, buffers: list[tuple[tuple, PartitionBuffer]]):
+        """
+        Write buffers and register their partitions, remaining buffers are put back before raising,
+        the failed one only if none of its files was written
+        """
+        for i, (key, buffer) in enumerate(buffers):
+            written = []
+            try:
+                self.write_buffer(buffer, written)
+            except BaseException:
+                for _ in buffers[i + 1:] if written else buffers[i:]:
+                    self.restore(*_)
+                raise
+
+        self.register()
+
+    def restore(self, key: tuple, buffer: PartitionBuffer):
+        with self.lock:
+            current = self.buffers.get(key)
+            if current is not None:
+                # rows buffered meanwhile go after the failed ones
+                for batch in current.batches:
+                    buffer.append(batch)
+            self.buffers[key] = buffer
+
+    def write_buffer(self, buffer: PartitionBuffer, written: list[str]):
+        """
+        :param written: appended with written file paths
+        """
+        if buffer.rows:
+            options = {"existing_data_behavior": "overwrite_or_ignore", **self.insert_options}
+            file_visitor = options.pop("file_visitor", None)
+
+            def visit(file):
+                written.append(file.path)
+                if file_visitor is not None:
+                    file_visitor(file)
+
+            stats = self.table.insert_arrow(
+                pyarrow.Table.from_batches(buffer.batches, schema=self.schema),
+                cast=False, register_partitions=False, file_visitor=visit, **options
+            )
+            self.stats.merge(stats)
+
+            if self.register_partitions:
+                with self.lock:
+                    self.unregistered.update(stats.partitions)
+
+    def register(self):
+        """
+        Register written partitions, kept to retry on failure
+        """
+        with self.lock:
+            new = sorted(self.unregistered - self.table.registered_partitions)
+
+        if new:
+            self.table.add_partitions(new)
+
+        with self.lock:
+            self.unregistered.difference_update(new)
+
+    def flush(self, max_age: Optional[float] = None):
+        """
+        Write partition buffers
+
+        :param max_age: only buffers older than max_age seconds, default all
+        """
+        now = time.monotonic()
+        with self.lock:
+            keys = [
+                key for key, buffer in self.buffers.items()
+                if max_age is None or now - buffer.created >= max_age
+            ]
+            buffers = [(_, self.buffers.pop(_)) for _ in keys]
+
+        self.write_buffers(buffers)
+
+    def run(self):
+        while not self.closed.wait(self.max_delay / 2):
+            try:
+                self.flush(self.max_delay)
+            except BaseException as e:
+                # owlna exceptions are BaseException, kept and retried next tick, raised in the producer on next write
+                self.error = e
+
+    def close(self):
+        if not self.closed.is_set():
+            self.closed.set()
+            if self.thread is not None:
+                self.thread.join()
+            self.error = None
+            self.flush()
+            self.stats.finish()
@@ -17,6 +17,9 @@ setup(
     python_requires=">= 3.9",
     author_email='nfillot.pro@gmail.com',
     install_requires=open('requirements.txt').read().splitlines(),
+    extras_require={
+        "local": ["duckdb"]
+    },
     description='Athena with PyArrow',
     long_description=open('README.md').read(),
     long_description_content_type='text/markdown',
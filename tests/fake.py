@@ -0,0 +1,87 @@
+from pyarrow.fs import LocalFileSystem, FileSystemHandler, PyFileSystem
+
+from benchmarks.fake import FakeAthena, FakeAthenaClient, datatype_to_sqltype, encode_csv_metadata, athena_text, \
+    column_info
+
+
+def fake_connection(server: "owlna.Athena", directory: str, polls: int = 2, **kwargs):
+    connection = server.connect(**kwargs)
+    connection.client = FakeAthenaClient(directory, polls=polls)
+    connection.s3fs = LocalFileSystem()
+    return connection
+
+
+class FailingHandler(FileSystemHandler):
+    """
+    pyarrow.fs.PyFileSystem handler on LocalFileSystem, failing operations on chosen paths
+
+    FailingHandler.filesystem(fail={"delete_file": lambda path: path.endswith(".parquet")})
+    """
+
+    def __init__(self, fail: dict):
+        """
+        :param fail: operation name: function of the path, True to raise OSError
+        """
+        self.local = LocalFileSystem()
+        self.fail = fail
+
+    @classmethod
+    def filesystem(cls, fail: dict) -> PyFileSystem:
+        return PyFileSystem(cls(fail))
+
+    def check(self, operation: str, path: str):
+        if self.fail.get(operation, lambda _: False)(path):
+            raise OSError("%s failed on '%s'" % (operation, path))
+
+    def __eq__(self, other):
+        return self is other
+
+    def __ne__(self, other):
+        return self is not other
+
+    def get_type_name(self):
+        return "failing"
+
+    def normalize_path(self, path):
+        return self.local.normalize_path(path)
+
+    def get_file_info(self, paths):
+        return self.local.get_file_info(paths)
+
+    def get_file_info_selector(self, selector):
+        return self.local.get_file_info(selector)
+
+    def create_dir(self, path, recursive):
+        self.local.create_dir(path, recursive=recursive)
+
+    def delete_dir(self, path):
+        self.local.delete_dir(path)
+
+    def delete_dir_contents(self, path, missing_dir_ok=False):
+        self.local.delete_dir_contents(path, missing_dir_ok=missing_dir_ok)
+
+    def delete_root_dir_contents(self):
+        raise OSError("refusing to delete root")
+
+    def delete_file(self, path):
+        self.check("delete_file", path)
+        self.local.delete_file(path)
+
+    def move(self, src, dest):
+        self.check("move", src)
+        self.local.move(src, dest)
+
+    def copy_file(self, src, dest):
+        self.local.copy_file(src, dest)
+
+    def open_input_stream(self, path):
+        return self.local.open_input_stream(path)
+
+    def open_input_file(self, path):
+        return self.local.open_input_file(path)
+
+    def open_output_stream(self, path, metadata):
+        return self.local.open_output_stream(path, metadata=metadata)
+
+    def open_append_stream(self, path, metadata):
+        return self.local.open_append_stream(path, metadata=metadata)
@@ -0,0 +1,106 @@
+import asyncio
+import tempfile
+import threading
+
+import pyarrow
+from pyarrow.fs import LocalFileSystem
+
+from owlna import AsyncConnection, AsyncCursor
+from owlna.exception import AthenaError
+from tests import AthenaTestCase
+from tests.fake import FakeAthenaClient
+
+
+class AsyncCursorTests(AthenaTestCase):
+    data = pyarrow.table({
+        "string": ["a", None, "c"],
+        "bigint": pyarrow.array([1, 2, None], pyarrow.int64())
+    })
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.connection = self.server.connect_async()
+        self.connection.connection.client = FakeAthenaClient(self.tempdir.name)
+        self.connection.connection.s3fs = LocalFileSystem()
+        self.connection.connection.client.register("SELECT 1", self.data)
+
+    def tearDown(self) -> None:
+        self.connection.close()
+        self.tempdir.cleanup()
+
+    def test_connect_async(self):
+        self.assertIsInstance(self.connection, AsyncConnection)
+        self.assertIsInstance(self.connection.cursor(), AsyncCursor)
+
+    def test_execute_wait(self):
+        async def run():
+            async with self.connection.cursor() as cursor:
+                await cursor.execute("SELECT 1", wait=0.001)
+                return cursor
+
+        cursor = asyncio.run(run())
+        self.assertEqual("SUCCEEDED", cursor.cursor.state)
+        self.assertTrue(cursor.closed)
+
+    def test_await_sync_cursor(self):
+        cursor = self.connection.connection.cursor().execute("SELECT 1", wait=False)
+
+        self.assertIs(cursor, asyncio.run(self.await_(cursor)))
+        self.assertEqual("SUCCEEDED", cursor.state)
+
+    def test_execute_error(self):
+        async def run():
+            await self.connection.execute("SELECT unknown", wait=0.001)
+
+        with self.assertRaises(AthenaError):
+            asyncio.run(run())
+
+    def test_fetch_arrow(self):
+        async def run():
+            cursor = await self.connection.execute("SELECT 1", wait=False)
+            return await cursor.schema_arrow(), await cursor.fetch_arrow()
+
+        schema, table = asyncio.run(run())
+        self.assertEqual(["string", "bigint"], schema.names)
+        self.assertEqual(self.data.to_pydict(), table.to_pydict())
+
+    def test_fetch_arrow_batches(self):
+        async def run():
+            cursor = await self.connection.execute("SELECT 1", wait=False)
+            return [batch async for batch in cursor.fetch_arrow_batches()]
+
+        batches = asyncio.run(run())
+        self.assertEqual(self.data.to_pydict(), pyarrow.Table.from_batches(batches).to_pydict())
+
+    def test_fetch_arrow_batches_cancelled(self):
+        started, release, closed = threading.Event(), threading.Event(), []
+
+        def batches(**kwargs):
+            try:
+                started.set()
+                release.wait(5)
+                yield self.data.to_batches()[0]
+            finally:
+                closed.append(True)
+
+        async def run():
+            cursor = await self.connection.execute("SELECT 1")
+            cursor.cursor.fetch_arrow_batches = batches
+
+            async def consume():
+                return [batch async for batch in cursor.fetch_arrow_batches()]
+
+            task = asyncio.ensure_future(consume())
+            await asyncio.to_thread(started.wait, 5)
+            task.cancel()
+            await asyncio.sleep(0.05)
+            release.set()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        self.assertEqual([True], closed)
+
+    @staticmethod
+    async def await_(awaitable):
+        return await awaitable
@@ -0,0 +1,41 @@
+import unittest
+
+from benchmarks.suite import run, compare
+
+
+class BenchmarkSuiteTests(unittest.TestCase):
+
+    def test_run(self):
+        result = run(rows=[100], datasets=["mixed"], repeat=1, workers=2)
+
+        self.assertEqual(
+            {
+                "fetch_arrow/mixed/100", "fetch_arrow_parallel/mixed/100", "fetch_arrow_batches/mixed/100",
+                "cast_arrow/mixed/100", "insert_arrow/mixed/100", "insert_arrow_parallel/mixed/100",
+                "scan_pruning/unsorted/100", "scan_pruning/sorted/100"
+            },
+            set(result["results"])
+        )
+        for key, value in result["results"].items():
+            if not key.startswith("scan_pruning"):
+                self.assertEqual(100, value["rows"])
+            self.assertGreater(value["seconds"], 0)
+
+        unsorted, ordered = result["results"]["scan_pruning/unsorted/100"], result["results"]["scan_pruning/sorted/100"]
+        self.assertEqual(1, unsorted["rows"])
+        self.assertEqual(1, ordered["rows"])
+        self.assertLess(ordered["scanned_bytes"], unsorted["scanned_bytes"])
+        self.assertLess(ordered["row_groups_read"], unsorted["row_groups_read"])
+
+    def test_compare(self):
+        before = {"results": {
+            "a": {"seconds": 1., "peak_memory": 10},
+            "b": {"seconds": 1., "peak_memory": 10},
+            "c": {"seconds": 1., "peak_memory": 10}
+        }}
+        after = {"results": {
+            "a": {"seconds": 1.05, "peak_memory": 10},
+            "b": {"seconds": 1.5, "peak_memory": 20}
+        }}
+
+        self.assertEqual(["b"], compare(before, after, threshold=0.1))
@@ -0,0 +1,140 @@
+import os
+import tempfile
+import time
+
+import pyarrow
+
+from owlna.cache import ResultCache
+from tests import AthenaTestCase
+from tests.fake import fake_connection
+
+
+class ResultCacheTests(AthenaTestCase):
+    data = pyarrow.table({
+        "string": ["a", None, "c"],
+        "bigint": pyarrow.array([1, 2, None], pyarrow.int64())
+    })
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(os.path.join(self.tempdir.name, "cache"), max_size=10 * 1024 ** 2, ttl=60)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def test_key_normalized(self):
+        self.assertEqual(
+            self.cache.key("SELECT  *\n FROM t;", WorkGroup="wg"),
+            self.cache.key("SELECT * FROM t", WorkGroup="wg")
+        )
+        self.assertNotEqual(
+            self.cache.key("SELECT * FROM t", WorkGroup="wg"),
+            self.cache.key("SELECT * FROM t", WorkGroup="other")
+        )
+        self.assertNotEqual(
+            self.cache.key("SELECT * FROM t", QueryExecutionContext={"Database": "a"}),
+            self.cache.key("SELECT * FROM t", QueryExecutionContext={"Database": "b"})
+        )
+
+    def test_put_get(self):
+        self.assertIsNone(self.cache.get("key"))
+        self.cache.put("key", self.data)
+
+        path = self.cache.get("key")
+        self.assertEqual(self.data, self.cache.open(path).read_all())
+        self.assertEqual({"hits": 1, "misses": 1, "evictions": 0}, {
+            k: v for k, v in self.cache.stats().items() if k in {"hits", "misses", "evictions"}
+        })
+
+    def test_ttl(self):
+        self.cache.ttl = 0
+        self.cache.put("key", self.data)
+        time.sleep(0.01)
+
+        self.assertIsNone(self.cache.get("key"))
+        self.assertEqual(0, self.cache.stats()["entries"])
+
+    def test_write_partial_not_cached(self):
+        batches = self.cache.write("key", iter(self.data.to_batches(1)))
+        next(batches)
+        batches.close()
+
+        self.assertIsNone(self.cache.get("key"))
+        self.assertEqual([], os.listdir(self.cache.directory))
+
+    def test_lru_eviction(self):
+        self.cache.put("first", self.data)
+        self.cache.put("second", self.data)
+        self.cache.max_size = os.path.getsize(self.cache.path("first")) * 2
+
+        now = time.time()
+        os.utime(self.cache.path("first"), (now - 10, now))
+        self.cache.get("first")
+        self.cache.put("third", self.data)
+
+        self.assertIsNotNone(self.cache.get("first"))
+        self.assertIsNone(self.cache.get("second"))
+        self.assertEqual(1, self.cache.evictions)
+
+    def test_cursor_cache(self):
+        connection = fake_connection(self.server, self.tempdir.name, cache=self.cache)
+        connection.client.register("SELECT 1", self.data)
+
+        expected = connection.execute("SELECT 1").fetch_arrow()
+
+        cursor = connection.execute("SELECT 1;")
+        self.assertIsNone(cursor.id)
+        self.assertEqual(expected, cursor.fetch_arrow())
+        self.assertEqual(expected.schema, cursor.schema_arrow)
+        self.assertEqual(expected, cursor.reader().read_all())
+        self.assertEqual(
+            expected.select(["bigint"]),
+            pyarrow.Table.from_batches(cursor.fetch_arrow_batches(include_columns=["bigint"]))
+        )
+        self.assertEqual(1, connection.client.calls["start_query_execution"])
+
+        connection.execute("SELECT 1", cache=False)
+        self.assertEqual(2, connection.client.calls["start_query_execution"])
+
+    def test_cursor_cache_read_only(self):
+        connection = fake_connection(self.server, self.tempdir.name, cache=self.cache)
+        connection.client.register("INSERT INTO t SELECT 1", self.data)
+
+        self.assertIsNone(self.cache.key("INSERT INTO t SELECT 1"))
+        for _ in range(2):
+            cursor = connection.execute("INSERT INTO t SELECT 1")
+            self.assertIsNotNone(cursor.id)
+            cursor.fetch_arrow()
+
+        self.assertEqual(2, connection.client.calls["start_query_execution"])
+        self.assertEqual(0, self.cache.stats()["entries"])
+
+    def test_cursor_cache_output_location(self):
+        connection = fake_connection(self.server, self.tempdir.name, cache=self.cache)
+        connection.client.register("SELECT 1", self.data)
+
+        first = connection.execute("SELECT 1")
+        first.fetch_arrow()
+
+        cursor = connection.execute("SELECT 1")
+        self.assertIsNone(cursor.id)
+        self.assertEqual(first.output_location, cursor.output_location)
+
+        # entry without metadata
+        self.cache.put(self.cache.key("SELECT 2"), self.data)
+        cursor = connection.execute("SELECT 2")
+        self.assertEqual({}, cursor.result)
+        with self.assertRaises(ValueError):
+            cursor.output_location
+
+        self.cache.clear()
+        self.assertEqual([], os.listdir(self.cache.directory))
+
+    def test_cursor_cache_batches(self):
+        connection = fake_connection(self.server, self.tempdir.name, cache=self.cache)
+        connection.client.register("SELECT 1", self.data)
+
+        expected = pyarrow.Table.from_batches(connection.execute("SELECT 1").fetch_arrow_batches())
+
+        self.assertEqual(expected, connection.execute("SELECT 1").fetch_arrow())
+        self.assertEqual(1, connection.client.calls["start_query_execution"])
@@ -0,0 +1,232 @@
+import datetime
+import decimal
+import os
+import tempfile
+
+import pyarrow
+
+from tests import AthenaTestCase
+from tests.fake import fake_connection
+
+
+class CursorTests(AthenaTestCase):
+    data = pyarrow.table({
+        "string": ['a\n"b"\n', None, "x", 'x"\n"y'] * 100,
+        "bigint": pyarrow.array(list(range(400)), pyarrow.int64()),
+        "double": pyarrow.array([0.5, None, 1.5, 2.] * 100, pyarrow.float64())
+    })
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.connection = fake_connection(self.server, self.tempdir.name)
+        self.connection.client.register("SELECT 1", self.data)
+
+    def tearDown(self) -> None:
+        self.connection.close()
+        self.tempdir.cleanup()
+
+    def test_schema_arrow(self):
+        cursor = self.connection.execute("SELECT 1")
+
+        self.assertEqual(["string", "bigint", "double"], cursor.schema_arrow.names)
+        self.assertEqual(pyarrow.int64(), cursor.schema_arrow.field("bigint").type)
+
+    def test_schema_arrow_from_metadata(self):
+        cursor = self.connection.execute("SELECT 1")
+        cursor.fetch_arrow(small_result=False)
+        cursor.unpersist()
+        cursor.fetch_arrow(small_result=False)
+
+        self.assertEqual(0, self.connection.client.calls["get_query_results"])
+
+    def test_schema_arrow_without_metadata(self):
+        self.connection.client.metadata = False
+        cursor = self.connection.execute("SELECT 1")
+
+        self.assertEqual(self.data.to_pydict(), cursor.fetch_arrow(small_result=False).to_pydict())
+        cursor.unpersist()
+        self.assertEqual(["string", "bigint", "double"], cursor.schema_arrow.names)
+        self.assertEqual(1, self.connection.client.calls["get_query_results"])
+
+    def test_fetch_arrow(self):
+        cursor = self.connection.execute("SELECT 1")
+
+        self.assertEqual(self.data.to_pydict(), cursor.fetch_arrow().to_pydict())
+
+    def test_fetch_arrow_small_result(self):
+        cursor = self.connection.execute("SELECT 1")
+
+        self.assertEqual(self.data.to_pydict(), cursor.fetch_arrow(small_result=True).to_pydict())
+        self.assertEqual(1, self.connection.client.calls["get_query_results"])
+
+        # DataScannedInBytes above threshold
+        self.assertEqual(self.data.to_pydict(), cursor.fetch_arrow(small_result=1).to_pydict())
+        self.assertEqual(1, self.connection.client.calls["get_query_results"])
+
+    def test_fetch_arrow_small_result_pages(self):
+        data = pyarrow.concat_tables([self.data] * 5)
+        self.connection.client.register("SELECT 2", data)
+        cursor = self.connection.execute("SELECT 2")
+
+        # more than DEFAULT_SMALL_RESULT_PAGES pages, read from S3
+        self.assertIsNone(cursor.fetch_small_result())
+        self.assertEqual(data.to_pydict(), cursor.fetch_arrow().to_pydict())
+        self.assertEqual(data.to_pydict(), cursor.fetch_arrow(small_result=True).to_pydict())
+        self.assertEqual(1 + 1 + 3, self.connection.client.calls["get_query_results"])
+
+    def test_fetch_arrow_small_result_time(self):
+        data = pyarrow.table({
+            "string": ["", None, "a"],
+            "time": pyarrow.array([datetime.time(1, 2, 3, 456000), None, datetime.time(23, 59, 59)], pyarrow.time32("ms"))
+        })
+        self.connection.client.register("SELECT 2", data)
+        cursor = self.connection.execute("SELECT 2")
+
+        self.assertEqual(data.to_pydict(), cursor.fetch_arrow().to_pydict())
+        self.assertEqual(
+            {"string": ["", "", "a"], "time": data["time"].to_pylist()},
+            cursor.fetch_arrow(strings_can_be_null=False).to_pydict()
+        )
+        self.assertEqual(
+            cursor.fetch_arrow(small_result=False, strings_can_be_null=False).to_pydict(),
+            cursor.fetch_arrow(strings_can_be_null=False).to_pydict()
+        )
+        self.assertEqual(3, self.connection.client.calls["get_query_results"])
+
+    def test_fetch_query_results_types(self):
+        data = pyarrow.table({
+            "string": ["", None, "a,b"],
+            "boolean": [True, None, False],
+            "bigint": pyarrow.array([9007199254740993, None, -1], pyarrow.int64()),
+            "decimal": pyarrow.array([decimal.Decimal("1.25"), None, decimal.Decimal("-3.10")], pyarrow.decimal128(10, 2)),
+            "date": pyarrow.array([datetime.date(2020, 1, 2), None, datetime.date(1970, 1, 1)], pyarrow.date32()),
+            "timestamp": pyarrow.array(
+                [datetime.datetime(2020, 1, 2, 3, 4, 5, 123000), None, datetime.datetime(1970, 1, 1)],
+                pyarrow.timestamp("ms")
+            )
+        })
+        self.connection.client.register("SELECT 3", data)
+        cursor = self.connection.execute("SELECT 3")
+
+        result = cursor.fetch_query_results()
+        self.assertEqual(data.schema.types[1:], result.schema.types[1:])
+        self.assertEqual(data.to_pydict(), result.to_pydict())
+        self.assertEqual(result.schema, cursor.schema_arrow)
+
+    def test_fetch_arrow_csv_types(self):
+        data = pyarrow.table({
+            "string": ["", None, "NA", "a\nb", "null"] * 20,
+            "boolean": [True, None, False, True, False] * 20,
+            "double": [float("inf"), None, 0.5, float("-inf"), 1e3] * 20,
+            "decimal": pyarrow.array([decimal.Decimal("1.25"), None, decimal.Decimal("-3.10"), 0, 1] * 20, pyarrow.decimal128(10, 2)),
+            "date": pyarrow.array([datetime.date(2020, 1, 2), None, datetime.date(1970, 1, 1), None, None] * 20, pyarrow.date32()),
+            "timestamp": pyarrow.array(
+                [datetime.datetime(2020, 1, 2, 3, 4, 5, 123000), None, datetime.datetime(1970, 1, 1), None, None] * 20,
+                pyarrow.timestamp("ms")
+            ),
+            "time": pyarrow.array([datetime.time(1, 2, 3, 456000), None, None, None, None] * 20, pyarrow.time32("ms"))
+        })
+        self.connection.client.register("SELECT 3", data)
+        cursor = self.connection.execute("SELECT 3")
+
+        for result in (
+            cursor.fetch_arrow(block_size=256, small_result=False),
+            cursor.fetch_arrow(block_size=256, parallel=2, small_result=False)
+        ):
+            self.assertEqual(data.schema.types[1:], result.schema.types[1:])
+            self.assertEqual(data.to_pydict(), result.to_pydict())
+
+    def test_fetch_arrow_parallel(self):
+        cursor = self.connection.execute("SELECT 1")
+
+        self.assertEqual(
+            self.data.to_pydict(),
+            cursor.fetch_arrow(block_size=128, parallel=4, small_result=False).to_pydict()
+        )
+
+    def test_fetch_arrow_parallel_include_columns(self):
+        cursor = self.connection.execute("SELECT 1")
+        expected = self.data.select(["double", "bigint"])
+
+        self.assertEqual(expected, cursor.fetch_arrow(include_columns=["double", "bigint"], small_result=False))
+        self.assertEqual(
+            expected,
+            cursor.fetch_arrow(include_columns=["double", "bigint"], parallel=2, small_result=False)
+        )
+
+    def test_fetch_arrow_batches_parallel_unordered(self):
+        cursor = self.connection.execute("SELECT 1")
+
+        self.assertEqual(
+            self.data.to_pydict(),
+            pyarrow.Table.from_batches(
+                cursor.fetch_arrow_batches(block_size=128, parallel=4, ordered=False)
+            ).sort_by("bigint").to_pydict()
+        )
+
+    def test_reader_parallel(self):
+        cursor = self.connection.execute("SELECT 1")
+
+        self.assertEqual(
+            self.data.to_pydict(),
+            cursor.reader(block_size=128, parallel=True).read_all().to_pydict()
+        )
+
+    def test_reader_prefetch(self):
+        cursor = self.connection.execute("SELECT 1")
+
+        self.assertEqual(
+            self.data.to_pydict(),
+            cursor.reader(block_size=128, parallel=2, prefetch=2).read_all().to_pydict()
+        )
+
+    def test_fetch_arrow_batches_prefetch_error(self):
+        cursor = self.connection.execute("SELECT 1")
+
+        with self.assertRaises(KeyError):
+            list(cursor.fetch_arrow_batches(include_columns=["missing"], prefetch=2))
+
+    def test_execute_parquet(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT 1;", result_format="parquet")
+            location = cursor.unload_location[5:]
+
+            self.assertTrue(cursor.unload_location.startswith("s3://" + self.tempdir.name + "/owlna-unload/"))
+            self.assertEqual(self.data.schema, cursor.schema_arrow)
+            self.assertEqual(self.data, cursor.fetch_arrow())
+            self.assertEqual(self.data, cursor.reader().read_all())
+            self.assertEqual(
+                self.data.select(["bigint"]),
+                pyarrow.Table.from_batches(cursor.fetch_arrow_batches(include_columns=["bigint"]))
+            )
+            self.assertEqual(
+                pyarrow.int32(),
+                cursor.fetch_arrow(column_types={"bigint": pyarrow.int32()}).schema.field("bigint").type
+            )
+            self.assertTrue(os.path.exists(location))
+
+        self.assertFalse(os.path.exists(location))
+
+    def test_execute_parquet_empty(self):
+        empty = self.data.slice(0, 0)
+        self.connection.client.register("SELECT 2", empty)
+        self.connection.client.register("SELECT * FROM (SELECT 2) LIMIT 0", empty)
+
+        with self.connection.execute("SELECT 2;", result_format="parquet") as cursor:
+            # Athena result types
+            self.assertEqual(self.data.schema.names, cursor.schema_arrow.names)
+            self.assertEqual(pyarrow.int64(), cursor.schema_arrow.field("bigint").type)
+
+            table = cursor.fetch_arrow()
+            self.assertEqual((0, self.data.column_names), (table.num_rows, table.column_names))
+            self.assertEqual(["bigint"], cursor.fetch_arrow(include_columns=["bigint"]).column_names)
+
+    def test_execute_parquet_output_location(self):
+        cursor = self.connection.execute(
+            "SELECT 1", result_format="parquet",
+            ResultConfiguration={"OutputLocation": "s3://" + self.tempdir.name + "/custom"}
+        )
+
+        self.assertTrue(cursor.unload_location.startswith("s3://" + self.tempdir.name + "/custom/owlna-unload/"))
+        self.assertEqual(self.data, cursor.fetch_arrow())
+        cursor.close()
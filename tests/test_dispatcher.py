@@ -0,0 +1,81 @@
+import tempfile
+import time
+import unittest
+
+import pyarrow
+
+from owlna.dispatcher import QueryDispatcher
+from owlna.utils.ratelimit import TokenBucket
+from tests import AthenaTestCase
+from tests.fake import fake_connection
+
+
+class TokenBucketTests(unittest.TestCase):
+
+    def test_acquire(self):
+        bucket = TokenBucket(rate=100, burst=2)
+        start = time.monotonic()
+
+        for _ in range(12):
+            self.assertTrue(bucket.acquire())
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_acquire_timeout(self):
+        bucket = TokenBucket(rate=1, burst=1)
+
+        self.assertTrue(bucket.acquire(timeout=0))
+        self.assertFalse(bucket.acquire(timeout=0.1))
+
+
+class ExecuteManyTests(AthenaTestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.connection = fake_connection(self.server, self.tempdir.name)
+        self.connection.poller.tick = 0.01
+
+        for i in range(20):
+            self.connection.client.register("SELECT %s" % i, pyarrow.table({"i": [i]}))
+
+    def tearDown(self) -> None:
+        self.connection.close()
+        self.tempdir.cleanup()
+
+    def test_execute_many(self):
+        queries = ["SELECT %s" % i for i in range(20)]
+
+        results = [
+            cursor.fetch_arrow()["i"][0].as_py()
+            for cursor in self.connection.execute_many(queries, max_concurrency=4, rate=1000)
+        ]
+
+        self.assertEqual(list(range(20)), sorted(results))
+        self.assertEqual(20, self.connection.client.calls["start_query_execution"])
+        # shared batch polling
+        self.assertEqual(0, self.connection.client.calls["get_query_execution"])
+
+    def test_execute_many_priority(self):
+        queries = ["SELECT %s" % i for i in range(5)]
+
+        results = [
+            cursor.fetch_arrow()["i"][0].as_py()
+            for cursor in self.connection.execute_many(
+                queries, max_concurrency=1, rate=1000, priority=lambda q: -int(q.split()[1])
+            )
+        ]
+
+        self.assertEqual([4, 3, 2, 1, 0], results)
+
+    def test_execute_many_failed(self):
+        cursors = list(self.connection.execute_many(["SELECT 1", "UNKNOWN"], rate=1000))
+
+        self.assertEqual({"SUCCEEDED", "FAILED"}, {_.state for _ in cursors})
+
+    def test_dispatcher_bounded(self):
+        with QueryDispatcher(self.connection, max_concurrency=3, rate=1000) as dispatcher:
+            futures = [dispatcher.submit("SELECT %s" % i) for i in range(12)]
+            self.assertEqual(12, len({_.result().id for _ in futures}))
+
+        self.assertEqual(12, dispatcher.started)
+        self.assertLessEqual(dispatcher.peak, 3)
@@ -0,0 +1,47 @@
+import unittest
+from collections import namedtuple
+
+import pyarrow.fs
+
+from owlna.filesystem import ManagedS3FileSystem, s3filesystem_options
+
+ReadOnlyCredentials = namedtuple("ReadOnlyCredentials", ["access_key", "secret_key", "token"])
+
+
+class RefreshingSession:
+    """
+    boto3.Session stand-in, credentials replaced like botocore RefreshableCredentials
+    """
+    region_name = "eu-west-1"
+
+    def __init__(self):
+        self.credentials = ReadOnlyCredentials("key", "secret", "token1")
+
+    def get_credentials(self):
+        return self
+
+    def get_frozen_credentials(self):
+        return self.credentials
+
+
+class ManagedS3FileSystemTests(unittest.TestCase):
+
+    def test_options(self):
+        options = s3filesystem_options(request_timeout=5, max_attempts=3)
+
+        self.assertEqual(5, options["request_timeout"])
+        self.assertTrue(options["background_writes"])
+        self.assertIsInstance(options["retry_strategy"], pyarrow.fs.AwsStandardS3RetryStrategy)
+
+    def test_refresh(self):
+        session = RefreshingSession()
+        managed = ManagedS3FileSystem(session, request_timeout=5)
+
+        filesystem = managed.filesystem
+        self.assertIs(filesystem, managed.filesystem)
+        self.assertEqual(0, managed.refreshes)
+
+        session.credentials = ReadOnlyCredentials("key", "secret", "token2")
+        self.assertIsNot(filesystem, managed.filesystem)
+        self.assertEqual(1, managed.refreshes)
+        self.assertEqual(("key", "secret", "token2"), managed.credentials)
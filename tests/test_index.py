@@ -0,0 +1,148 @@
+import os
+import tempfile
+import unittest
+
+import pyarrow
+import pyarrow.dataset
+from pyarrow.fs import LocalFileSystem, FileSelector
+
+from owlna.index import TableIndex
+from owlna.utils.metadata import dict_table_metadata_to_table
+
+
+class TableIndexTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.table = dict_table_metadata_to_table(
+            None, "AwsDataCatalog", "unittest",
+            {
+                'Name': 'events', 'TableType': 'EXTERNAL_TABLE',
+                'Columns': [{'Name': 'value', 'Type': 'bigint'}],
+                'PartitionKeys': [{'Name': 'day', 'Type': 'string'}, {'Name': 'hour', 'Type': 'int'}],
+                'Parameters': {
+                    'location': 's3://' + self.tempdir.name + '/events',
+                    'serde.serialization.lib': 'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe'
+                }
+            }
+        )
+        self.index_dir = os.path.join(self.tempdir.name, "index")
+        self.table.index = TableIndex(self.table, LocalFileSystem(), self.index_dir)
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def insert(self, day: str, hours: list[int]):
+        self.table.insert_arrow(
+            pyarrow.table({
+                "day": [day] * len(hours),
+                "hour": hours,
+                "value": list(range(len(hours)))
+            }),
+            filesystem=LocalFileSystem()
+        )
+
+    def test_partitions(self):
+        self.insert("2020-01-01", [0, 1])
+        # _SUCCESS like markers are not data files
+        with open(os.path.join(self.table.pyarrow_location, "_SUCCESS"), "w"):
+            pass
+
+        self.assertEqual(
+            [{"day": "2020-01-01", "hour": "0"}, {"day": "2020-01-01", "hour": "1"}],
+            self.table.partitions()
+        )
+        self.assertEqual(2, len(self.table.index))
+
+    def test_persisted(self):
+        self.insert("2020-01-01", [0])
+        self.assertEqual(1, len(self.table.index))
+
+        # files written while the index is not loaded are not listed again
+        self.table.index = TableIndex(self.table, LocalFileSystem(), self.index_dir)
+        self.insert("2020-01-02", [0])
+        self.assertEqual(1, len(self.table.index))
+
+    def test_refresh_start_after(self):
+        self.insert("2020-01-01", [0])
+        self.assertEqual(1, len(self.table.index))
+        self.table.index = TableIndex(self.table, LocalFileSystem(), self.index_dir)
+
+        self.insert("2020-01-02", [0, 1])
+        self.assertEqual(2, self.table.index.refresh("start_after"))
+        self.assertEqual(0, self.table.index.refresh("start_after"))
+        self.assertEqual(3, len(self.table.partitions()))
+
+    def test_refresh_modified(self):
+        self.insert("2020-01-02", [0])
+        self.assertEqual(1, len(self.table.index))
+        self.table.index = TableIndex(self.table, LocalFileSystem(), self.index_dir)
+
+        # before last key, missed by start_after
+        self.insert("2020-01-01", [0])
+        self.assertEqual(0, self.table.index.refresh("start_after"))
+        self.assertEqual(1, self.table.index.refresh("modified"))
+        self.assertEqual(
+            ["2020-01-02", "2020-01-01"], [_["day"] for _ in self.table.partitions()]
+        )
+
+    def test_refresh_modified_before_watermark(self):
+        self.insert("2020-01-02", [0])
+        self.assertEqual(1, len(self.table.index))
+        self.table.index = TableIndex(self.table, LocalFileSystem(), self.index_dir)
+
+        # upload finished after the last refresh, LastModified before the watermark
+        self.insert("2020-01-03", [0])
+        path = [_.path for _ in self.table.index.filesystem.get_file_info(
+            FileSelector(self.table.pyarrow_location + "/day=2020-01-03", recursive=True)
+        ) if _.is_file][0]
+        os.utime(path, (0, 0))
+
+        self.assertEqual(1, self.table.index.refresh("modified"))
+        self.assertEqual(0, self.table.index.refresh("modified"))
+        self.assertEqual(2, len(self.table.partitions()))
+
+    def test_refresh_full(self):
+        self.insert("2020-01-01", [0, 1])
+        self.assertEqual(2, len(self.table.index))
+
+        self.table.index.filesystem.delete_dir(self.table.pyarrow_location + "/day=2020-01-01/hour=1")
+        self.table.index.refresh("full")
+        self.assertEqual([{"day": "2020-01-01", "hour": "0"}], self.table.partitions())
+
+        with self.assertRaises(ValueError):
+            self.table.index.refresh("unknown")
+
+    def test_insert_updates_loaded_index(self):
+        self.insert("2020-01-01", [0])
+        self.assertEqual(1, len(self.table.index))
+
+        self.insert("2020-01-02", [0])
+        self.assertEqual(2, len(self.table.index))
+
+    def test_dataset_cached(self):
+        self.insert("2020-01-01", [0, 1])
+        self.insert("2020-01-02", [0])
+        expression = (pyarrow.dataset.field("day") == "2020-01-01") & (pyarrow.dataset.field("hour") == 1)
+
+        dataset = self.table.dataset(cached=True)
+        self.assertEqual(3, len(list(dataset.get_fragments())))
+        self.assertEqual(1, len(list(dataset.get_fragments(filter=expression))))
+        self.assertEqual(
+            {"day": ["2020-01-01"], "hour": [1], "value": [1]},
+            self.table.scan(filter=expression, cached=True).to_table().to_pydict()
+        )
+
+    def test_compact_updates_loaded_index(self):
+        self.insert("2020-01-01", [0, 0])
+        self.insert("2020-01-01", [0])
+        self.assertEqual(2, len(self.table.index))
+
+        stats = self.table.compact(filesystem=LocalFileSystem(), cached=True)
+        self.assertEqual(2, stats.deleted_files)
+        self.assertEqual(1, len(self.table.index))
+        self.assertEqual(
+            [_.path for _ in self.table.dataset(LocalFileSystem()).get_fragments()],
+            self.table.index.files["path"].to_pylist()
+        )
+        self.assertEqual(3, self.table.scan(cached=True).count_rows())
@@ -0,0 +1,127 @@
+import datetime
+import decimal
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pyarrow
+from pyarrow.fs import LocalFileSystem
+
+from owlna.exception import AthenaError
+from owlna.utils.metadata import dict_table_metadata_to_table
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+from owlna.local import LocalConnection
+
+
+def table_metadata(location: str, serde: str, partitions: list[dict] = ()) -> dict:
+    return {
+        'Name': 'events', 'TableType': 'EXTERNAL_TABLE',
+        'Columns': [{'Name': 'string', 'Type': 'string'}, {'Name': 'bigint', 'Type': 'bigint'},
+                    {'Name': 'timestamp', 'Type': 'timestamp'}, {'Name': 'decimal', 'Type': 'decimal(10,2)'}],
+        'PartitionKeys': list(partitions),
+        'Parameters': {
+            'EXTERNAL': 'TRUE',
+            'location': 's3://' + location,
+            'serde.serialization.lib': serde
+        }
+    }
+
+
+class LocalImportTests(unittest.TestCase):
+
+    def test_missing_duckdb(self):
+        with patch.dict(sys.modules, {"duckdb": None}):
+            with self.assertRaisesRegex(ImportError, r"owlna\[local\]"):
+                LocalConnection()
+
+
+@unittest.skipIf(duckdb is None, "duckdb not installed")
+class LocalConnectionTests(unittest.TestCase):
+    data = pyarrow.table({
+        "day": ["2020-01-01", "2020-01-02", "2020-01-02"],
+        "string": ["a", None, "c"],
+        "bigint": pyarrow.array([1, 2, 3], pyarrow.int64()),
+        "timestamp": pyarrow.array([datetime.datetime(2020, 1, 1, 1)] * 3, pyarrow.timestamp("ms")),
+        "decimal": pyarrow.array([decimal.Decimal(_) for _ in "123"], pyarrow.decimal128(10, 2))
+    })
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.table = dict_table_metadata_to_table(
+            None, "AwsDataCatalog", "unittest",
+            table_metadata(
+                self.tempdir.name + "/events",
+                "org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe",
+                [{'Name': 'day', 'Type': 'string'}]
+            )
+        )
+        self.table.insert_arrow(self.data, filesystem=LocalFileSystem())
+        self.connection = LocalConnection([self.table])
+
+    def tearDown(self) -> None:
+        self.connection.close()
+        self.tempdir.cleanup()
+
+    def test_execute(self):
+        cursor = self.connection.execute(
+            'SELECT day, bigint, decimal FROM "unittest"."events" WHERE day = \'2020-01-02\' ORDER BY bigint'
+        )
+
+        self.assertEqual("SUCCEEDED", cursor.state)
+        self.assertEqual(pyarrow.decimal128(10, 2), cursor.schema_arrow.field("decimal").type)
+        self.assertEqual(
+            {"day": ["2020-01-02", "2020-01-02"], "bigint": [2, 3], "decimal": [decimal.Decimal(2), decimal.Decimal(3)]},
+            cursor.fetch_arrow().to_pydict()
+        )
+
+    def test_types(self):
+        cursor = self.connection.execute('SELECT * FROM "unittest"."events"')
+
+        # Athena query results timestamps have no time zone
+        self.assertEqual(
+            [pyarrow.timestamp("us") if pyarrow.types.is_timestamp(_) else _ for _ in self.table.dataset_schema.types],
+            cursor.schema_arrow.types
+        )
+        self.assertEqual(3, cursor.reader(block_size=1).read_all().num_rows)
+        self.assertEqual(
+            pyarrow.int32(),
+            cursor.fetch_arrow(column_types={"bigint": pyarrow.int32()}).schema.field("bigint").type
+        )
+        self.assertEqual(["bigint"], cursor.fetch_arrow(include_columns=["bigint"]).column_names)
+
+    def test_refresh(self):
+        self.table.insert_arrow(self.data, filesystem=LocalFileSystem())
+
+        self.assertEqual(3, len(self.connection.execute('SELECT * FROM "unittest"."events"').fetch_arrow()))
+        self.connection.refresh()
+        self.assertEqual(6, len(self.connection.execute('SELECT * FROM "unittest"."events"').fetch_arrow()))
+
+    def test_csv_table(self):
+        table = dict_table_metadata_to_table(
+            None, "AwsDataCatalog", "unittest",
+            table_metadata(self.tempdir.name + "/csv", "org.apache.hadoop.hive.serde2.OpenCSVSerde")
+        )
+        table.parameters["serde.param.quoteChar"] = '"'
+        table.insert_arrow(self.data.drop(["day"]), filesystem=LocalFileSystem())
+        self.connection.register(table)
+
+        # OpenCSVSerde reads empty fields as empty strings
+        self.assertEqual(
+            {**self.data.drop(["day"]).to_pydict(), "string": ["a", "", "c"]},
+            self.connection.execute('SELECT * FROM "unittest"."events" ORDER BY bigint').fetch_arrow().to_pydict()
+        )
+
+    def test_error(self):
+        with self.assertRaises(AthenaError):
+            self.connection.execute('SELECT * FROM "unittest"."missing"')
+
+        cursor = self.connection.execute("SELECT CAST('x' AS INTEGER)", wait=False)
+        with self.assertRaises(AthenaError):
+            cursor.fetch_arrow()
+        self.assertEqual("FAILED", cursor.state)
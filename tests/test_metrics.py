@@ -0,0 +1,109 @@
+import os
+import tempfile
+
+import pyarrow
+
+from owlna.metrics import PrometheusExporter, SpanExporter, QueryTimeline
+from tests import AthenaTestCase
+from tests.fake import fake_connection
+
+
+class MetricsTests(AthenaTestCase):
+    data = pyarrow.table({
+        "string": ["a", None, "b,c"] * 100,
+        "bigint": pyarrow.array(list(range(300)), pyarrow.int64())
+    })
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.prometheus = PrometheusExporter()
+        self.spans = []
+        self.connection = fake_connection(
+            self.server, self.tempdir.name,
+            hooks=[self.prometheus, SpanExporter(self.spans.extend)]
+        )
+        self.connection.client.register("SELECT 1", self.data)
+
+    def tearDown(self) -> None:
+        self.connection.close()
+        self.tempdir.cleanup()
+
+    def test_timeline(self):
+        cursor = self.connection.execute("SELECT 1", WorkGroup="analytics")
+        cursor.fetch_arrow(block_size=256, parallel=2, small_result=False)
+        timeline = cursor.timeline
+
+        self.assertEqual(cursor.id, timeline.query_id)
+        self.assertEqual("analytics", timeline.workgroup)
+        self.assertEqual("SUCCEEDED", timeline.state)
+        self.assertEqual(3, timeline.counters["polls"])
+        self.assertEqual(300, timeline.counters["rows"])
+        self.assertGreater(timeline.counters["bytes"], 0)
+
+        for name in ("submit", "poll", "wait", "download", "parse", "fetch"):
+            self.assertGreater(timeline.durations[name], 0, name)
+
+        # fetch metrics are reset on each fetch
+        cursor.fetch_arrow(small_result=True)
+        self.assertEqual(1, timeline.counters["pages"])
+        self.assertEqual(300, timeline.counters["rows"])
+        self.assertNotIn("bytes", timeline.counters)
+        self.assertEqual(["submit", "done", "fetch", "fetch"], [_[0] for _ in timeline.events])
+
+    def test_timeline_bytes(self):
+        cursor = self.connection.execute("SELECT 1")
+        size = os.path.getsize(cursor.output_location[5:])
+
+        # streamed reads count the result object bytes like parallel reads
+        for fetch in (
+            lambda: cursor.fetch_arrow(small_result=False),
+            lambda: list(cursor.fetch_arrow_batches(block_size=256)),
+            lambda: cursor.fetch_arrow(block_size=256, parallel=2, small_result=False)
+        ):
+            fetch()
+            self.assertEqual(size, cursor.timeline.counters["bytes"])
+
+    def test_prometheus(self):
+        for _ in range(2):
+            cursor = self.connection.execute("SELECT 1")
+            list(cursor.fetch_arrow_batches())
+
+        text = self.prometheus.render()
+
+        self.assertIn('owlna_queries_total{workgroup="primary",state="SUCCEEDED"} 2\n', text)
+        self.assertIn('owlna_rows_total{workgroup="primary"} 600\n', text)
+        self.assertIn('owlna_query_duration_seconds_count{workgroup="primary"} 2\n', text)
+        self.assertIn('owlna_query_duration_seconds_bucket{workgroup="primary",le="+Inf"} 2\n', text)
+        self.assertIn('owlna_phase_seconds_total{workgroup="primary",phase="read"}', text)
+
+    def test_spans(self):
+        cursor = self.connection.execute("SELECT 1")
+        cursor.fetch_arrow(small_result=True)
+
+        root, fetch = self.spans[0], self.spans[-1]
+        trace_id = cursor.id.replace("-", "")
+
+        self.assertEqual({trace_id}, {_["trace_id"] for _ in self.spans})
+        self.assertEqual("athena.query", root["name"])
+        self.assertEqual("SUCCEEDED", root["attributes"]["athena.state"])
+        self.assertEqual("owlna.fetch", fetch["name"])
+        self.assertEqual(300, fetch["attributes"]["owlna.rows"])
+        self.assertLessEqual(root["start_time_unix_nano"], root["end_time_unix_nano"])
+
+        for span in self.spans[1:-1]:
+            self.assertEqual(root["span_id"], span["parent_span_id"])
+
+    def test_hook_once_per_query(self):
+        events = []
+        self.connection.hooks.append(lambda event, timeline: events.append(event))
+        cursor = self.connection.execute("SELECT 1")
+        cursor.wait()
+        cursor.get_query_execution()
+
+        self.assertEqual(["done"], events)
+
+    def test_timeline_timed(self):
+        timeline = QueryTimeline()
+
+        self.assertEqual([0, 1, 2], list(timeline.timed(range(3), "read")))
+        self.assertIn("read", timeline.durations)
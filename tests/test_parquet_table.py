@@ -1,4 +1,7 @@
+import os
+import random
 import tempfile
+from unittest.mock import patch
 
 import pandas
 import pyarrow.dataset
@@ -6,9 +9,11 @@ import pyarrow.parquet
 from pyarrow import RecordBatch, schema, RecordBatchReader, Table
 from pyarrow.fs import LocalFileSystem
 
+from owlna.exception import CompactionError
 from owlna.utils.arrow import cast_batch
 from owlna.utils.metadata import dict_table_metadata_to_table
 from tests import AthenaTestCase
+from tests.fake import FailingHandler
 
 
 class AthenaTableTests(AthenaTestCase):
@@ -238,3 +243,250 @@ class AthenaTableTests(AthenaTestCase):
             pyarrow.Table.from_batches([cast_batch(data, schema_arrow)]).select(["string", "int"]),
             pyarrow.parquet.read_table(athena_table.pyarrow_location).select(["string", "int"])
         )
+
+    def test_partition_table_scan(self):
+        athena_table = self.parquet_partition_table
+        data = pyarrow.table({
+            "pstring": ["a", "a", "b", "b"],
+            "pint": pyarrow.array([1, 2, 1, 2], pyarrow.int64()),
+            "string": ["w", "x", "y", "z"],
+            "int": pyarrow.array([1, 2, 3, 4], pyarrow.int32())
+        })
+        athena_table.insert_arrow(
+            data,
+            filesystem=LocalFileSystem(),
+            existing_data_behavior="delete_matching"
+        )
+        expression = (pyarrow.dataset.field("pstring") == "b") & (pyarrow.dataset.field("int") > 3)
+
+        scanner = athena_table.scan(["pint", "string", "int"], filter=expression, filesystem=LocalFileSystem())
+        self.assertEqual(
+            {"pint": [2], "string": ["z"], "int": [4]},
+            scanner.to_table().to_pydict()
+        )
+
+        # partition pruning
+        self.assertEqual(
+            2, len(list(athena_table.dataset(LocalFileSystem()).get_fragments(filter=expression)))
+        )
+        self.assertEqual(
+            athena_table.dataset_schema.names,
+            athena_table.scan(filesystem=LocalFileSystem()).projected_schema.names
+        )
+
+    def test_table_scan_row_group_statistics(self):
+        data = pyarrow.table({"int": pyarrow.array(range(100), pyarrow.int32())})
+        self.parquet_table.insert_arrow(
+            data,
+            filesystem=LocalFileSystem(),
+            existing_data_behavior="delete_matching",
+            min_rows_per_group=10,
+            max_rows_per_group=10
+        )
+        expression = pyarrow.dataset.field("int") >= 95
+        fragment, = self.parquet_table.dataset(LocalFileSystem()).get_fragments()
+
+        self.assertEqual(1, len(fragment.split_by_row_group(expression)))
+        self.assertEqual(
+            list(range(95, 100)),
+            self.parquet_table.scan(["int"], filter=expression, filesystem=LocalFileSystem()).to_table()["int"].to_pylist()
+        )
+
+    def test_partition_table_insert_parallel(self):
+        athena_table = self.parquet_partition_table
+        data = pyarrow.table({
+            "pstring": ["a", "b"] * 500,
+            "pint": pyarrow.array([1] * 1000, pyarrow.int64()),
+            "string": [str(i) for i in range(1000)],
+            "int": pyarrow.array(range(1000), pyarrow.int32())
+        })
+
+        stats = athena_table.insert_arrow(
+            [data.slice(0, 300), data.slice(300)],
+            filesystem=LocalFileSystem(),
+            existing_data_behavior="delete_matching",
+            parallel=2,
+            target_file_size=100 * data.nbytes // 1000,
+            row_group_size=50 * data.nbytes // 1000
+        )
+
+        self.assertEqual(1000, stats.rows)
+        self.assertEqual({"pstring=a/pint=1", "pstring=b/pint=1"}, stats.partitions)
+        self.assertGreater(stats.files, 2)
+        self.assertGreater(stats.rows_per_second, 0)
+
+        result = athena_table.scan(filesystem=LocalFileSystem()).to_table()
+        self.assertEqual(list(range(1000)), sorted(result["int"].to_pylist()))
+        fragments = list(athena_table.dataset(LocalFileSystem()).get_fragments())
+        self.assertEqual(stats.files, len(fragments))
+        self.assertLess(max(_.metadata.num_rows for _ in fragments), 500)
+
+    def test_partition_table_compact(self):
+        athena_table = self.parquet_partition_table
+        athena_table.insert_arrow(
+            pyarrow.table({"pstring": ["a"], "pint": [1], "int": pyarrow.array([0], pyarrow.int32())}),
+            filesystem=LocalFileSystem(),
+            existing_data_behavior="delete_matching"
+        )
+        for i in range(1, 5):
+            athena_table.insert_arrow(
+                pyarrow.table({
+                    "pstring": ["a", "b"], "pint": [1, 1], "int": pyarrow.array([10 - i, 10 + i], pyarrow.int32())
+                }),
+                filesystem=LocalFileSystem()
+            )
+
+        stats = athena_table.compact(
+            [{"pstring": "a", "pint": 1}, "pstring=b/pint=1"],
+            sort_by=["int"],
+            filesystem=LocalFileSystem()
+        )
+
+        self.assertEqual(9, stats.rows)
+        self.assertEqual(9, stats.deleted_files)
+        self.assertEqual(2, stats.files)
+        self.assertEqual({"pstring=a/pint=1", "pstring=b/pint=1"}, stats.partitions)
+
+        fragments = sorted(athena_table.dataset(LocalFileSystem()).get_fragments(), key=lambda _: _.path)
+        self.assertEqual(2, len(fragments))
+        self.assertTrue(all(_.path.rpartition("/")[2].startswith("part-") for _ in fragments))
+        self.assertEqual([0, 6, 7, 8, 9], fragments[0].to_table()["int"].to_pylist())
+        self.assertEqual([11, 12, 13, 14], fragments[1].to_table()["int"].to_pylist())
+
+        # single file partitions are left as is
+        self.assertEqual(0, athena_table.compact(filesystem=LocalFileSystem()).files)
+
+    def test_partition_table_compact_prefix(self):
+        athena_table = self.parquet_partition_table
+        for i in range(2):
+            athena_table.insert_arrow(
+                pyarrow.table({
+                    "pstring": ["a", "a", "b"], "pint": [1, 2, 1], "int": pyarrow.array([i] * 3, pyarrow.int32())
+                }),
+                filesystem=LocalFileSystem(),
+                existing_data_behavior="delete_matching" if i == 0 else "overwrite_or_ignore"
+            )
+
+        # leading keys match sub partitions
+        stats = athena_table.compact([{"pstring": "a"}], filesystem=LocalFileSystem())
+        self.assertEqual({"pstring=a/pint=1", "pstring=a/pint=2"}, stats.partitions)
+        self.assertEqual(4, stats.deleted_files)
+
+        with self.assertRaises(ValueError):
+            athena_table.compact([{"pint": 1}], filesystem=LocalFileSystem())
+
+    def test_partition_table_compact_atomic_writes(self):
+        athena_table = self.parquet_partition_table
+        for i in range(2):
+            athena_table.insert_arrow(
+                pyarrow.table({"pstring": ["a"], "pint": [1], "int": pyarrow.array([i], pyarrow.int32())}),
+                filesystem=LocalFileSystem(),
+                existing_data_behavior="delete_matching" if i == 0 else "overwrite_or_ignore"
+            )
+
+        # no staged file renames on atomic PUT filesystems like S3
+        with patch("owlna.table.ATOMIC_WRITE_FILESYSTEMS", {"py::failing"}):
+            stats = athena_table.compact(filesystem=FailingHandler.filesystem({"move": lambda _: True}))
+        self.assertEqual((1, 2), (stats.files, stats.deleted_files))
+        self.assertEqual([0, 1], sorted(athena_table.scan(filesystem=LocalFileSystem()).to_table()["int"].to_pylist()))
+
+    def test_table_insert_sorted(self):
+        values = list(range(1000))
+        random.Random(1).shuffle(values)
+        data = pyarrow.table({
+            "int": pyarrow.array(values, pyarrow.int32()),
+            "string": [str(_ % 7) for _ in values]
+        })
+
+        stats = self.parquet_table.insert_arrow(
+            data.to_batches(100),
+            filesystem=LocalFileSystem(),
+            existing_data_behavior="delete_matching",
+            sort_by=["int"],
+            sort_memory=data.nbytes // 3,
+            row_group_size=100 * data.nbytes // 1000,
+            dictionary_columns=["string"],
+            compression="zstd"
+        )
+        self.assertEqual(1000, stats.rows)
+
+        fragment, = self.parquet_table.dataset(LocalFileSystem()).get_fragments()
+        self.assertTrue(fragment.path.endswith(".zstd.parquet"))
+        metadata = fragment.metadata
+        self.assertGreater(metadata.num_row_groups, 2)
+        self.assertEqual("ZSTD", metadata.row_group(0).column(3).compression)
+        self.assertEqual((pyarrow.parquet.SortingColumn(3),), metadata.row_group(0).sorting_columns)
+
+        # disjoint row group ranges, a filter reads one row group
+        ranges = [
+            (metadata.row_group(_).column(3).statistics.min, metadata.row_group(_).column(3).statistics.max)
+            for _ in range(metadata.num_row_groups)
+        ]
+        self.assertTrue(all(a[1] < b[0] for a, b in zip(ranges, ranges[1:])))
+        self.assertEqual(1, len(fragment.split_by_row_group(pyarrow.dataset.field("int") == 512)))
+        self.assertEqual(
+            list(range(1000)),
+            self.parquet_table.scan(["int"], filesystem=LocalFileSystem()).to_table()["int"].to_pylist()
+        )
+
+    def test_partition_table_compact_failures(self):
+        athena_table = self.parquet_partition_table
+        for i in range(3):
+            athena_table.insert_arrow(
+                pyarrow.table({"pstring": ["c"], "pint": [1], "int": pyarrow.array([i], pyarrow.int32())}),
+                filesystem=LocalFileSystem(),
+                existing_data_behavior="delete_matching" if i == 0 else "overwrite_or_ignore"
+            )
+
+        def files():
+            return sorted(
+                _.path for _ in athena_table.dataset(LocalFileSystem()).get_fragments(
+                    filter=pyarrow.dataset.field("pstring") == "c"
+                )
+            )
+        old = files()
+
+        # failed rename: published files are removed, old files kept
+        with self.assertRaises(OSError):
+            athena_table.compact(["pstring=c/pint=1"], filesystem=FailingHandler.filesystem({"move": lambda _: True}))
+        self.assertEqual(old, files())
+        self.assertEqual([], [
+            _ for _ in os.listdir(self.tempdir.name + "/parquet_partition_table/pstring=c/pint=1") if _.startswith("_")
+        ])
+
+        # failed deletes: retried, then the old files left are reported
+        undeletable = old[0]
+        with patch("owlna.table.DELETE_RETRY_WAIT", 0):
+            with self.assertRaises(CompactionError) as raised:
+                athena_table.compact(
+                    ["pstring=c/pint=1"],
+                    filesystem=FailingHandler.filesystem({"delete_file": lambda _: _ == undeletable})
+                )
+        self.assertEqual([undeletable], raised.exception.remaining)
+        self.assertEqual("pstring=c/pint=1", raised.exception.directory)
+        self.assertEqual(2, len(files()))
+        self.assertIn(undeletable, files())
+
+    def test_csv_table_header(self):
+        for skip, content, rows in [
+            # no header row: table column names
+            (None, "a,1\nb,2\n", [("a", 1), ("b", 2)]),
+            ("1", "string,bigint\na,1\n", [("a", 1)])
+        ]:
+            directory = tempfile.mkdtemp(dir=self.tempdir.name)
+            table = dict_table_metadata_to_table(
+                None, "AwsDataCatalog", "unittest",
+                {'Name': 'csv', 'TableType': 'EXTERNAL_TABLE',
+                 'Columns': [{'Name': 'string', 'Type': 'string'}, {'Name': 'bigint', 'Type': 'bigint'}],
+                 'PartitionKeys': [],
+                 'Parameters': {
+                     'location': 's3://' + directory,
+                     'serde.serialization.lib': 'org.apache.hadoop.hive.serde2.OpenCSVSerde',
+                     **({'skip.header.line.count': skip} if skip else {})
+                 }}
+            )
+            with open(os.path.join(directory, "data.csv"), "w") as f:
+                f.write(content)
+
+            data = table.dataset(LocalFileSystem()).to_table()
+            self.assertEqual(rows, list(zip(data["string"].to_pylist(), data["bigint"].to_pylist())))
@@ -0,0 +1,120 @@
+import asyncio
+import tempfile
+
+import pyarrow
+from botocore.exceptions import ClientError
+
+from owlna.exception import OwlnaException
+from tests import AthenaTestCase
+from tests.fake import fake_connection
+
+
+class QueryPollerTests(AthenaTestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.connection = fake_connection(self.server, self.tempdir.name, shared_polling=True)
+        self.connection.poller.tick = 0.001
+        self.connection.client.register("SELECT 1", pyarrow.table({"a": [1]}))
+
+    def tearDown(self) -> None:
+        self.connection.close()
+        self.tempdir.cleanup()
+
+    def test_wait_shared(self):
+        cursors = [self.connection.execute("SELECT 1", wait=False) for _ in range(120)]
+        futures = [cursor.future() for cursor in cursors]
+
+        for cursor, future in zip(cursors, futures):
+            future.result(timeout=5)
+            cursor.wait()
+            self.assertEqual("SUCCEEDED", cursor.state)
+
+        client = self.connection.client
+        self.assertEqual(0, client.calls["get_query_execution"])
+        # 3 polls per query = 360 get_query_execution, 120 ids by chunks of 50
+        self.assertLessEqual(client.calls["batch_get_query_execution"], 36)
+
+    def test_future(self):
+        cursor = self.connection.execute("SELECT 1", wait=False)
+
+        self.assertIs(cursor, cursor.future().result(timeout=5))
+        self.assertTrue(cursor.future().done())
+
+    def test_async_wait_shared(self):
+        connection = self.server.connect_async(shared_polling=True)
+        connection.connection = self.connection
+
+        async def run():
+            return await asyncio.gather(*(
+                connection.execute("SELECT 1") for _ in range(10)
+            ))
+
+        for cursor in asyncio.run(run()):
+            self.assertEqual("SUCCEEDED", cursor.cursor.state)
+
+    def test_unprocessed(self):
+        cursor = self.connection.cursor()
+        cursor.id = "unknown"
+
+        with self.assertRaises(OwlnaException):
+            cursor.future().result(timeout=5)
+
+    def test_close_cancel(self):
+        self.connection.poller.tick = 10
+        self.connection.client.polls = 100
+        future = self.connection.execute("SELECT 1", wait=False).future()
+        self.connection.close()
+
+        self.assertTrue(future.cancelled())
+
+    def flaky(self, errors: list):
+        """
+        batch_get_query_execution raising or returning errors first
+        """
+        client = self.connection.client
+        batch_get_query_execution = client.batch_get_query_execution
+
+        def flaky_batch_get_query_execution(QueryExecutionIds: list[str]):
+            if errors:
+                error = errors.pop(0)
+                if isinstance(error, BaseException):
+                    raise error
+                return {"QueryExecutions": [], "UnprocessedQueryExecutionIds": [
+                    {"QueryExecutionId": _, "ErrorCode": error, "ErrorMessage": error} for _ in QueryExecutionIds
+                ]}
+            return batch_get_query_execution(QueryExecutionIds)
+
+        client.batch_get_query_execution = flaky_batch_get_query_execution
+
+    def test_retry_throttling(self):
+        throttled = ClientError(
+            {"Error": {"Code": "ThrottlingException", "Message": "Rate exceeded"}}, "BatchGetQueryExecution"
+        )
+        self.flaky([throttled, throttled, "InternalServerException"])
+        cursors = [self.connection.execute("SELECT 1", wait=False) for _ in range(60)]
+
+        for cursor in cursors:
+            cursor.wait()
+            self.assertEqual("SUCCEEDED", cursor.state)
+        self.assertEqual(0, self.connection.client.calls["stop_query_execution"])
+        self.assertEqual(0, self.connection.poller.errors)
+
+    def test_fail_not_retryable(self):
+        self.flaky([
+            ClientError({"Error": {"Code": "AccessDeniedException", "Message": "denied"}}, "BatchGetQueryExecution")
+        ])
+        cursor = self.connection.execute("SELECT 1", wait=False)
+
+        with self.assertRaises(ClientError):
+            cursor.future().result(timeout=5)
+
+    def test_fail_after_max_errors(self):
+        self.connection.poller.max_errors = 3
+        errors = [ConnectionError("reset")] * 10
+        self.flaky(errors)
+        cursor = self.connection.execute("SELECT 1", wait=False)
+
+        with self.assertRaises(ConnectionError):
+            cursor.future().result(timeout=5)
+        self.assertEqual(7, len(errors))
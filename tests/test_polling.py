@@ -0,0 +1,88 @@
+import tempfile
+import unittest
+
+import pyarrow
+
+from owlna.polling import FixedPolling, BackoffPolling, StatisticsPolling, polling_strategy
+from tests import AthenaTestCase
+from tests.fake import fake_connection
+
+
+def meta(state: str, queue: int = None, engine: int = None) -> dict:
+    statistics = {}
+    if queue is not None:
+        statistics["QueryQueueTimeInMillis"] = queue
+    if engine is not None:
+        statistics["EngineExecutionTimeInMillis"] = engine
+    return {"Status": {"State": state}, "Statistics": statistics}
+
+
+class PollingTests(unittest.TestCase):
+
+    def test_polling_strategy(self):
+        self.assertIsInstance(polling_strategy(True), BackoffPolling)
+        self.assertIsInstance(polling_strategy(None), BackoffPolling)
+        self.assertEqual(0.5, polling_strategy(0.5).tick)
+
+    def test_polling_strategy_copy(self):
+        strategy = BackoffPolling()
+        strategy.attempts = 3
+
+        copied = polling_strategy(strategy)
+        self.assertIsNot(strategy, copied)
+        self.assertEqual(0, copied.attempts)
+
+    def test_fixed(self):
+        self.assertEqual(0.3, FixedPolling(0.3).next_interval(meta("RUNNING")))
+
+    def test_backoff(self):
+        strategy = BackoffPolling(initial=0.1, maximum=1, jitter=0)
+
+        self.assertEqual(
+            [0.1, 0.2, 0.4, 0.8, 1, 1],
+            [round(strategy.next_interval(meta("RUNNING")), 6) for _ in range(6)]
+        )
+
+    def test_backoff_jitter(self):
+        strategy = BackoffPolling(initial=1, maximum=10, jitter=0.5)
+
+        for _ in range(20):
+            strategy.reset()
+            self.assertTrue(0.5 <= strategy.next_interval(meta("RUNNING")) <= 1.5)
+
+    def test_statistics_elapsed_ratio(self):
+        strategy = StatisticsPolling(initial=0.1, maximum=30, jitter=0, ratio=0.5)
+
+        self.assertEqual(0.1, strategy.next_interval(meta("RUNNING", engine=0)))
+        self.assertEqual(5, strategy.next_interval(meta("RUNNING", engine=10000)))
+        self.assertEqual(30, strategy.next_interval(meta("RUNNING", engine=100000)))
+
+    def test_statistics_state_change_resets_backoff(self):
+        strategy = StatisticsPolling(initial=0.1, maximum=30, jitter=0, ratio=0)
+
+        self.assertEqual(0.1, strategy.next_interval(meta("QUEUED", queue=0)))
+        self.assertEqual(0.2, strategy.next_interval(meta("QUEUED", queue=100)))
+        self.assertEqual(0.1, strategy.next_interval(meta("RUNNING", engine=0)))
+        self.assertEqual(["QUEUED", "RUNNING"], [_[1] for _ in strategy.history])
+
+    def test_statistics_expected(self):
+        strategy = StatisticsPolling(initial=0.1, maximum=30, jitter=0, expected=10)
+
+        self.assertEqual(8, strategy.next_interval(meta("RUNNING", engine=2000)))
+        # past expected end
+        self.assertEqual(6, strategy.next_interval(meta("RUNNING", engine=12000)))
+
+
+class CursorPollingTests(AthenaTestCase):
+
+    def test_wait_strategy(self):
+        with tempfile.TemporaryDirectory() as directory:
+            connection = fake_connection(self.server, directory, polls=3)
+            connection.client.register("SELECT 1", pyarrow.table({"a": [1]}))
+
+            cursor = connection.cursor().execute(
+                "SELECT 1", wait=BackoffPolling(initial=0.001, maximum=0.01)
+            )
+
+            self.assertEqual("SUCCEEDED", cursor.state)
+            self.assertEqual(4, connection.client.calls["get_query_execution"])
@@ -0,0 +1,61 @@
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow
+
+from tests import AthenaTestCase
+from tests.fake import FakeAthena
+
+
+class ConnectionPoolTests(AthenaTestCase):
+    data = pyarrow.table({"bigint": pyarrow.array(list(range(10)), pyarrow.int64())})
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.athena = FakeAthena(self.server.session, self.tempdir.name, pool_size=2, pool_timeout=0.05)
+        self.athena.fake_client.register("SELECT 1", self.data)
+
+    def tearDown(self) -> None:
+        self.athena.close()
+        self.tempdir.cleanup()
+
+    def test_shared_client(self):
+        self.assertIs(self.server.client(), self.server.client())
+        self.assertIs(self.server.s3filesystem(), self.server.s3filesystem())
+        self.assertIsNot(self.server.s3filesystem(), self.server.s3filesystem(request_timeout=5))
+
+        with self.server.connect(shared_client=True) as connection:
+            self.assertIs(self.server.client(), connection.client)
+        self.assertIsNotNone(self.server.client().meta)
+
+    def test_acquire_bounded(self):
+        pool = self.athena.pool()
+        first, second = pool.acquire(), pool.acquire()
+
+        with self.assertRaises(TimeoutError):
+            pool.acquire()
+
+        pool.release(first)
+        self.assertIs(first, pool.acquire())
+        self.assertEqual(2, pool.created)
+        self.assertIs(first.client, second.client)
+
+    def test_cursor(self):
+        with self.athena.cursor() as cursor:
+            self.assertEqual(self.data, cursor.execute("SELECT 1").fetch_arrow())
+            self.assertEqual(0, self.athena.pool().idle.qsize())
+        self.assertEqual(1, self.athena.pool().idle.qsize())
+
+        # garbage collected cursor returns its connection
+        self.athena.cursor()
+        self.assertEqual(1, self.athena.pool().idle.qsize())
+        self.assertFalse(self.athena.fake_client.closed)
+
+    def test_cursor_concurrent(self):
+        def run(_):
+            with self.athena.pool().cursor(timeout=5) as cursor:
+                return cursor.execute("SELECT 1", wait=0.01).fetch_arrow().num_rows
+
+        with ThreadPoolExecutor(8) as executor:
+            self.assertEqual([10] * 16, list(executor.map(run, range(16))))
+        self.assertEqual(2, self.athena.pool().created)
@@ -0,0 +1,90 @@
+import io
+import unittest
+
+import boto3
+from botocore.awsrequest import AWSResponse
+from botocore.config import Config
+
+from owlna import Athena
+from owlna.utils.ratelimit import AdaptiveRateLimiter
+
+
+class RawResponse(io.BytesIO):
+
+    def stream(self, **kwargs):
+        yield self.read()
+
+
+class FakeHTTP:
+    """
+    before-send handler answering with queued (status, body)
+    """
+
+    def __init__(self, responses: list[tuple[int, bytes]]):
+        self.responses = responses
+
+    def __call__(self, request, **kwargs):
+        status, body = self.responses.pop(0)
+        return AWSResponse(request.url, status, {}, RawResponse(body))
+
+
+class AdaptiveRateLimiterTests(unittest.TestCase):
+
+    def test_aimd(self):
+        limiter = AdaptiveRateLimiter(rate=10, min_rate=1, increase=1, decrease=0.5)
+
+        limiter.throttled("athena.StartQueryExecution")
+        limiter.throttled("athena.StartQueryExecution")
+        self.assertEqual(2.5, limiter.rates()["athena.StartQueryExecution"]["rate"])
+
+        for _ in range(100):
+            limiter.succeeded("athena.StartQueryExecution")
+        self.assertEqual(10, limiter.rates()["athena.StartQueryExecution"]["rate"])
+
+        for _ in range(10):
+            limiter.throttled("athena.StartQueryExecution")
+        self.assertEqual(1, limiter.rates()["athena.StartQueryExecution"]["rate"])
+        self.assertEqual(12, limiter.rates()["athena.StartQueryExecution"]["throttles"])
+
+    def test_attach(self):
+        limiter = AdaptiveRateLimiter(rate=1000)
+        client = boto3.Session(
+            aws_access_key_id="key", aws_secret_access_key="secret", region_name="eu-west-1"
+        ).client("athena", config=Config(retries={"max_attempts": 2, "mode": "standard"}))
+        limiter.attach(client)
+        limiter.attach(client)
+
+        client.meta.events.register("before-send.athena", FakeHTTP([
+            (400, b'{"__type": "ThrottlingException", "Message": "Rate exceeded"}'),
+            (200, b'{"QueryExecution": {"QueryExecutionId": "id"}}')
+        ]))
+
+        client.get_query_execution(QueryExecutionId="id")
+
+        rates = limiter.rates()["athena.GetQueryExecution"]
+        self.assertEqual(2, rates["calls"])
+        self.assertEqual(1, rates["throttles"])
+        self.assertLess(rates["rate"], 1000)
+
+    def test_shared(self):
+        self.assertIs(AdaptiveRateLimiter.shared(), AdaptiveRateLimiter.shared())
+
+    def test_athena_s3_client(self):
+        limiter = AdaptiveRateLimiter(rate=1000)
+        athena = Athena(boto3.Session(
+            aws_access_key_id="key", aws_secret_access_key="secret", region_name="eu-west-1"
+        ), rate_limiter=limiter)
+        config = Config(retries={"max_attempts": 2, "mode": "standard"})
+        client = athena.s3_client(config)
+        self.assertIs(client, athena.s3_client(config))
+
+        client.meta.events.register("before-send.s3", FakeHTTP([
+            (503, b'<Error><Code>SlowDown</Code><Message>Reduce your request rate</Message></Error>'),
+            (200, b'<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/"><Name>bucket</Name>'
+                  b'<KeyCount>0</KeyCount></ListBucketResult>')
+        ]))
+        client.list_objects_v2(Bucket="bucket")
+
+        rates = limiter.rates()["s3.ListObjectsV2"]
+        self.assertEqual((2, 1), (rates["calls"], rates["throttles"]))
+        athena.close()
@@ -0,0 +1,102 @@
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow
+
+from owlna.singleflight import SingleFlight
+from tests import AthenaTestCase
+from tests.fake import fake_connection
+
+
+class SingleFlightTests(AthenaTestCase):
+    data = pyarrow.table({"bigint": pyarrow.array(list(range(10)), pyarrow.int64())})
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.connection = fake_connection(self.server, self.tempdir.name, single_flight=True)
+        self.connection.client.register("SELECT 1", self.data)
+        self.connection.client.register("INSERT INTO t SELECT 1", self.data)
+
+    def tearDown(self) -> None:
+        self.connection.close()
+        self.tempdir.cleanup()
+
+    def test_key(self):
+        self.assertEqual(SingleFlight.key("SELECT 1"), SingleFlight.key(" SELECT\n  1 ;"))
+        self.assertNotEqual(SingleFlight.key("SELECT 1"), SingleFlight.key("SELECT 1", WorkGroup="other"))
+        self.assertIsNotNone(SingleFlight.key("(with t AS (SELECT 1) SELECT * FROM t)"))
+        self.assertIsNone(SingleFlight.key("INSERT INTO t SELECT 1"))
+
+    def test_attach_in_flight(self):
+        first = self.connection.execute("SELECT 1", wait=False)
+        second = self.connection.execute("SELECT 1", wait=False)
+
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(1, self.connection.client.calls["start_query_execution"])
+        self.assertEqual(self.data, second.fetch_arrow())
+        self.assertEqual(self.data, first.fetch_arrow())
+
+        # released once done
+        third = self.connection.execute("SELECT 1", wait=False)
+        self.assertNotEqual(first.id, third.id)
+        self.assertEqual(1, len(self.connection.single_flight))
+
+    def test_concurrent_execute(self):
+        with ThreadPoolExecutor(8) as executor:
+            cursors = list(executor.map(lambda _: self.connection.execute("SELECT 1", wait=False), range(8)))
+
+        self.assertEqual(1, len({_.id for _ in cursors}))
+        self.assertEqual(1, self.connection.client.calls["start_query_execution"])
+
+    def test_not_read_only(self):
+        self.connection.execute("INSERT INTO t SELECT 1", wait=False)
+        self.connection.execute("INSERT INTO t SELECT 1", wait=False)
+        self.connection.execute("SELECT 1", wait=False, single_flight=False)
+
+        self.assertEqual(3, self.connection.client.calls["start_query_execution"])
+
+    def test_stop_attached(self):
+        first = self.connection.execute("SELECT 1", wait=False)
+        second = self.connection.execute("SELECT 1", wait=False)
+
+        first.stop()
+        self.assertEqual(0, self.connection.client.calls["stop_query_execution"])
+        second.stop()
+        self.assertEqual(1, self.connection.client.calls["stop_query_execution"])
+
+    def test_close_detached(self):
+        first = self.connection.execute("SELECT 1", wait=False)
+        second = self.connection.execute("SELECT 1", wait=False)
+
+        first.close()
+        first.close()
+        self.assertEqual(1, len(self.connection.single_flight))
+        second.close()
+        self.assertEqual(0, len(self.connection.single_flight))
+
+        third = self.connection.execute("SELECT 1", wait=False)
+        self.assertNotEqual(first.id, third.id)
+
+    def test_ttl(self):
+        self.connection.single_flight.ttl = 0
+        first = self.connection.execute("SELECT 1", wait=False)
+        second = self.connection.execute("SELECT 1", wait=False)
+
+        self.assertNotEqual(first.id, second.id)
+        self.assertEqual(2, self.connection.client.calls["start_query_execution"])
+
+        # expired execution done does not release the new one
+        first.wait()
+        self.assertEqual(1, len(self.connection.single_flight))
+
+    def test_result_reuse(self):
+        first = self.connection.execute("SELECT 1", result_reuse_max_age=60)
+        second = self.connection.execute("SELECT 1", result_reuse_max_age=60)
+
+        self.assertEqual(
+            {"ResultReuseByAgeConfiguration": {"Enabled": True, "MaxAgeInMinutes": 60}},
+            self.connection.client.executions[second.id]["kwargs"]["ResultReuseConfiguration"]
+        )
+        self.assertFalse(first.reused_previous_result)
+        self.assertTrue(second.reused_previous_result)
+        self.assertEqual(self.data, second.fetch_arrow())
@@ -0,0 +1,90 @@
+import tempfile
+
+import pyarrow
+from pyarrow.fs import LocalFileSystem
+
+from owlna.index import TableIndex
+from owlna.utils.metadata import dict_table_metadata_to_table
+from tests import AthenaTestCase
+from tests.fake import fake_connection
+
+
+class TablePartitionsTests(AthenaTestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.connection = fake_connection(self.server, self.tempdir.name, polls=0)
+        self.table = dict_table_metadata_to_table(
+            self.connection, "AwsDataCatalog", "unittest",
+            {
+                'Name': 'events', 'TableType': 'EXTERNAL_TABLE',
+                'Columns': [{'Name': 'value', 'Type': 'bigint'}],
+                'PartitionKeys': [{'Name': 'day', 'Type': 'string'}, {'Name': 'hour', 'Type': 'int'}],
+                'Parameters': {
+                    'location': 's3://' + self.tempdir.name + '/events',
+                    'serde.serialization.lib': 'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe'
+                }
+            }
+        )
+
+    def tearDown(self) -> None:
+        self.connection.close()
+        self.tempdir.cleanup()
+
+    def queries(self) -> list[str]:
+        return [
+            _["query"] for _ in self.connection.client.executions.values() if _["query"].startswith("ALTER")
+        ]
+
+    def insert(self, day: str, hours: list[int]):
+        return self.table.insert_arrow(
+            pyarrow.table({"day": [day] * len(hours), "hour": hours, "value": list(range(len(hours)))}),
+            filesystem=LocalFileSystem(),
+            register_partitions=True
+        )
+
+    def test_add_partitions_queries(self):
+        location = self.table.location
+        self.assertEqual(
+            [
+                "ALTER TABLE `unittest`.`events` ADD IF NOT EXISTS\n"
+                "PARTITION (`day` = '2020-01-01', `hour` = 0) LOCATION '%s/day=2020-01-01/hour=0/'\n"
+                "PARTITION (`day` = 'it\\'s 1%%', `hour` = 1) LOCATION '%s/day=it%%27s%%201%%25/hour=1/'" % (
+                    location, location
+                )
+            ],
+            self.table.add_partitions_queries([{"day": "2020-01-01", "hour": 0}, "day=it%27s%201%25/hour=1"])
+        )
+
+        queries = self.table.add_partitions_queries(
+            ["day=2020-01-%02d/hour=0" % _ for _ in range(1, 11)], max_length=400
+        )
+        self.assertGreater(len(queries), 1)
+        self.assertTrue(all(len(_) <= 400 for _ in queries))
+        self.assertEqual(10, sum(_.count("PARTITION (") for _ in queries))
+
+    def test_insert_registers_new_partitions(self):
+        stats = self.insert("2020-01-01", [0, 1])
+        self.assertEqual({"day=2020-01-01/hour=0", "day=2020-01-01/hour=1"}, stats.partitions)
+
+        query, = self.queries()
+        self.assertEqual(2, query.count("PARTITION ("))
+        self.assertIn("`hour` = 1", query)
+
+        # registered partitions are skipped
+        self.insert("2020-01-01", [1, 2])
+        self.assertEqual(2, len(self.queries()))
+        self.assertEqual(1, self.queries()[-1].count("PARTITION ("))
+        self.assertIn("`hour` = 2", self.queries()[-1])
+
+    def test_insert_registers_indexed_partitions(self):
+        # written before without registration: listed files are not catalog partitions
+        self.table.index = TableIndex(self.table, LocalFileSystem(), self.tempdir.name + "/index")
+        self.table.insert_arrow(
+            pyarrow.table({"day": ["2020-01-01"], "hour": [0], "value": [0]}), filesystem=LocalFileSystem()
+        )
+        self.assertEqual(1, len(self.table.index))
+
+        self.insert("2020-01-01", [0])
+        query, = self.queries()
+        self.assertIn("`day` = '2020-01-01', `hour` = 0", query)
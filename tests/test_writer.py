@@ -0,0 +1,239 @@
+import tempfile
+import time
+import unittest
+
+import pyarrow
+from pyarrow.fs import LocalFileSystem
+
+from owlna.exception import AthenaError
+from owlna.utils.metadata import dict_table_metadata_to_table
+from owlna.writer import WriteStats, file_sizing, partition_count
+
+
+class TableWriterTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.table = dict_table_metadata_to_table(
+            None, "AwsDataCatalog", "unittest",
+            {
+                'Name': 'events', 'TableType': 'EXTERNAL_TABLE',
+                'Columns': [{'Name': 'value', 'Type': 'bigint'}],
+                'PartitionKeys': [{'Name': 'day', 'Type': 'string'}],
+                'Parameters': {
+                    'location': 's3://' + self.tempdir.name + '/events',
+                    'serde.serialization.lib': 'org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe'
+                }
+            }
+        )
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def files(self) -> dict[str, int]:
+        return {
+            fragment.path[len(self.table.pyarrow_location) + 1:].rpartition("/")[0]:
+                fragment.metadata.num_rows
+            for fragment in self.table.dataset(LocalFileSystem()).get_fragments()
+        }
+
+    def batch(self, days: list[str], start: int = 0) -> pyarrow.RecordBatch:
+        return pyarrow.RecordBatch.from_pydict({
+            "day": days,
+            "value": pyarrow.array(range(start, start + len(days)), pyarrow.int32())
+        })
+
+    def test_coalesce(self):
+        with self.table.writer(max_rows=100, max_delay=None, filesystem=LocalFileSystem()) as writer:
+            for i in range(30):
+                writer.write(self.batch(["2020-01-01", "2020-01-02", "2020-01-01"], i * 3))
+
+            # 60 rows 2020-01-01, 30 rows 2020-01-02, all buffered
+            self.assertEqual(90, writer.buffered_rows)
+            self.assertEqual(0, writer.stats.files)
+
+            writer.write(self.batch(["2020-01-01"] * 40, 90))
+            self.assertEqual({"day=2020-01-01": 100}, self.files())
+
+        self.assertEqual(0, writer.buffered_rows)
+        self.assertEqual({"day=2020-01-01": 100, "day=2020-01-02": 30}, self.files())
+        self.assertEqual(130, writer.stats.rows)
+        self.assertEqual(2, writer.stats.files)
+        self.assertEqual({"day=2020-01-01", "day=2020-01-02"}, writer.stats.partitions)
+        self.assertEqual(
+            pyarrow.int64(), self.table.scan(filesystem=LocalFileSystem()).projected_schema.field("value").type
+        )
+
+    def test_max_bytes(self):
+        batch = self.batch(["2020-01-01"] * 10)
+
+        with self.table.writer(max_bytes=batch.nbytes * 3, max_delay=None, filesystem=LocalFileSystem()) as writer:
+            for _ in range(7):
+                writer.write(batch)
+
+        self.assertEqual(3, writer.stats.files)
+
+    def test_max_delay(self):
+        writer = self.table.writer(max_delay=0.05, filesystem=LocalFileSystem())
+        writer.write(self.batch(["2020-01-01"] * 10))
+
+        for _ in range(100):
+            if writer.stats.files:
+                break
+            time.sleep(0.01)
+        self.assertEqual({"day=2020-01-01": 10}, self.files())
+
+        writer.close()
+        with self.assertRaises(ValueError):
+            writer.write(self.batch(["2020-01-01"]))
+
+    def test_flush_failure(self):
+        insert_arrow, calls = self.table.insert_arrow, []
+
+        def failing(*args, **kwargs):
+            calls.append(1)
+            if len(calls) <= 2:
+                raise OSError("write failed")
+            return insert_arrow(*args, **kwargs)
+
+        self.table.insert_arrow = failing
+        writer = self.table.writer(max_rows=10, max_delay=0.05, filesystem=LocalFileSystem())
+
+        # full buffer write fails, rows are kept
+        with self.assertRaises(OSError):
+            writer.write(self.batch(["2020-01-01"] * 10))
+        self.assertEqual(10, writer.buffered_rows)
+        writer.write(self.batch(["2020-01-02"] * 5, 10))
+
+        # background flush fails once then retries
+        for _ in range(200):
+            if writer.stats.files == 2:
+                break
+            time.sleep(0.01)
+        self.assertEqual(4, len(calls))
+        self.assertEqual({"day=2020-01-01": 10, "day=2020-01-02": 5}, self.files())
+        self.assertEqual(0, writer.buffered_rows)
+
+        # background error raised once, before buffering data
+        with self.assertRaises(OSError):
+            writer.write(self.batch(["2020-01-03"]))
+        writer.write(self.batch(["2020-01-03"]))
+        writer.close()
+        self.assertEqual(16, writer.stats.rows)
+
+    def test_register_failure(self):
+        calls = []
+
+        def add_partitions(partitions):
+            calls.append(list(partitions))
+            if len(calls) == 1:
+                raise OSError("register failed")
+            self.table.registered_partitions.update(partitions)
+
+        self.table.add_partitions = add_partitions
+        writer = self.table.writer(
+            max_rows=10, max_delay=None, register_partitions=True, filesystem=LocalFileSystem()
+        )
+
+        # files are written, only registration is retried
+        with self.assertRaises(OSError):
+            writer.write(self.batch(["2020-01-01"] * 10))
+        self.assertEqual(0, writer.buffered_rows)
+
+        writer.write(self.batch(["2020-01-02"] * 10, 10))
+        writer.close()
+
+        self.assertEqual({"day=2020-01-01": 10, "day=2020-01-02": 10}, self.files())
+        self.assertEqual([["day=2020-01-01"], ["day=2020-01-01", "day=2020-01-02"]], calls)
+
+    def test_failure_after_files_written(self):
+        insert_arrow = self.table.insert_arrow
+
+        def failing(*args, **kwargs):
+            insert_arrow(*args, **kwargs)
+            raise OSError("failed after write")
+
+        self.table.insert_arrow = failing
+        writer = self.table.writer(max_rows=10, max_delay=None, filesystem=LocalFileSystem())
+
+        with self.assertRaises(OSError):
+            writer.write(self.batch(["2020-01-01"] * 10))
+        self.assertEqual(0, writer.buffered_rows)
+
+        self.table.insert_arrow = insert_arrow
+        writer.close()
+        self.assertEqual({"day=2020-01-01": 10}, self.files())
+
+    def test_background_athena_error(self):
+        insert_arrow, calls = self.table.insert_arrow, []
+
+        def failing(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise AthenaError(1, 1, True, "failed", "failed")
+            return insert_arrow(*args, **kwargs)
+
+        self.table.insert_arrow = failing
+        writer = self.table.writer(max_delay=0.05, filesystem=LocalFileSystem())
+        writer.write(self.batch(["2020-01-01"] * 10))
+
+        for _ in range(200):
+            if writer.stats.files:
+                break
+            time.sleep(0.01)
+        self.assertEqual({"day=2020-01-01": 10}, self.files())
+
+        with self.assertRaises(AthenaError):
+            writer.write(self.batch(["2020-01-02"]))
+        writer.close()
+
+    def test_max_buffered_bytes(self):
+        batch = self.batch(["2020-01-01"] * 10)
+
+        with self.table.writer(
+            max_buffered_bytes=batch.nbytes * 3, max_delay=None, filesystem=LocalFileSystem()
+        ) as writer:
+            writer.write(self.batch(["2020-01-01"] * 20))
+            for day in ["2020-01-02", "2020-01-03"]:
+                writer.write(self.batch([day] * 10))
+
+            # largest buffer written once all buffers exceed the bound
+            self.assertEqual({"day=2020-01-01": 20}, self.files())
+            self.assertEqual(20, writer.buffered_rows)
+
+        self.assertEqual({"day=2020-01-01": 20, "day=2020-01-02": 10, "day=2020-01-03": 10}, self.files())
+
+    def test_write_stats(self):
+        stats = WriteStats()
+        stats.add(self.batch(["a", "b"]))
+        stats.add_file(10, "day=a")
+
+        self.assertEqual((2, 1, 10, {"day=a"}), (stats.rows, stats.files, stats.file_bytes, stats.partitions))
+        self.assertEqual(
+            {"max_rows_per_file": 100, "min_rows_per_group": 10, "max_rows_per_group": 10},
+            file_sizing(10, 1000, 100)
+        )
+        # partitioned writes buffer a row group per open file: min_rows_per_group shares memory
+        self.assertEqual(
+            {"max_rows_per_file": 100, "min_rows_per_group": 2, "max_rows_per_group": 10},
+            file_sizing(10, 1000, 100, open_files=50, memory=1000)
+        )
+        self.assertEqual(1, partition_count(self.batch(["a", "a"]), ["day"]))
+        self.assertEqual(2, partition_count(pyarrow.Table.from_batches([self.batch(["a", "b", "a"])]), ["day"]))
+        self.assertEqual(1, partition_count(self.batch(["a", "b"]), []))
+
+    def test_insert_row_groups_few_partitions(self):
+        data = pyarrow.Table.from_batches([self.batch(["2020-01-01"] * 100, i * 100) for i in range(10)])
+        bytes_per_row = data.nbytes / data.num_rows
+
+        # one partition written: row groups are not shrunk by max_open_files
+        self.table.insert_arrow(
+            data, parallel=2, row_group_size=int(250 * bytes_per_row), write_memory=int(1000 * bytes_per_row),
+            filesystem=LocalFileSystem()
+        )
+        metadata = next(self.table.dataset(LocalFileSystem()).get_fragments()).metadata
+        rows = [metadata.row_group(i).num_rows for i in range(metadata.num_row_groups)]
+
+        # 100 rows input batches coalesced up to row_group_size
+        self.assertEqual(1000, sum(rows))
+        self.assertGreater(min(rows[:-1]), 100)
@@ -4,7 +4,7 @@ import numpy
 import pyarrow
 from pyarrow import RecordBatch, array, Table
 
-from owlna.utils.arrow import cast_batch, cast_array, timestamp_to_timestamp
+from owlna.utils.arrow import cast_batch, cast_array, timestamp_to_timestamp, strings_to_array
 from tests import AthenaTestCase
 
 
@@ -229,3 +229,9 @@ class ArrowUtilsTests(AthenaTestCase):
             array([datetime.time(12, 10, 10, 123000)]).cast(pyarrow.time32("ms")),
             cast_array(pyarrow.array(["12:10:10.123456"]), pyarrow.time32("ms"), False)
         )
+
+    def test_strings_to_array_time(self):
+        self.assertEqual(
+            array([datetime.time(1, 2, 3, 456000), None], pyarrow.time32("ms")),
+            strings_to_array(["01:02:03.456", None], pyarrow.time32("ms"), True)
+        )
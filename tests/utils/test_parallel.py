@@ -0,0 +1,133 @@
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import pyarrow
+import pyarrow.csv as pcsv
+from pyarrow.fs import LocalFileSystem
+
+from owlna.utils.parallel import imap, prefetched, byte_ranges, record_boundary, aligned_blocks, read_csv_ranges
+
+
+class ParallelUtilsTests(unittest.TestCase):
+    data = pyarrow.table({
+        "string": ['a\n"b"\n', None, "", 'x"\n"y', "plain", "\n"] * 50,
+        "int": pyarrow.array(list(range(300)), pyarrow.int64())
+    })
+
+    def test_imap_ordered(self):
+        with ThreadPoolExecutor(4) as executor:
+            self.assertEqual(
+                [_ * 2 for _ in range(100)],
+                list(imap(lambda x: x * 2, range(100), executor, max_pending=3))
+            )
+
+    def test_imap_unordered(self):
+        with ThreadPoolExecutor(4) as executor:
+            self.assertEqual(
+                [_ * 2 for _ in range(100)],
+                sorted(imap(lambda x: x * 2, range(100), executor, max_pending=3, ordered=False))
+            )
+
+    def test_prefetched(self):
+        self.assertEqual(list(range(10)), list(prefetched(range(10), 2)))
+        self.assertEqual(list(range(10)), list(prefetched(range(10), 0)))
+
+    def test_prefetched_bounded(self):
+        produced = []
+
+        def source():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        items = prefetched(source(), 2)
+        self.assertEqual(0, next(items))
+        time.sleep(0.2)
+        # queue size + one item waiting to be put
+        self.assertLessEqual(len(produced), 4)
+        items.close()
+
+    def test_prefetched_error(self):
+        def source():
+            yield 1
+            raise ValueError("boom")
+
+        items = prefetched(source(), 2)
+        self.assertEqual(1, next(items))
+        with self.assertRaises(ValueError):
+            next(items)
+
+    def test_prefetched_close(self):
+        closed = threading.Event()
+
+        def source():
+            try:
+                i = 0
+                while True:
+                    yield i
+                    i += 1
+            finally:
+                closed.set()
+
+        items = prefetched(source(), 2)
+        self.assertEqual(0, next(items))
+        items.close()
+        self.assertTrue(closed.is_set())
+
+    def test_byte_ranges(self):
+        self.assertEqual([(0, 4), (4, 4), (8, 2)], byte_ranges(10, 4))
+        self.assertEqual([], byte_ranges(0, 4))
+
+    def test_record_boundary(self):
+        self.assertEqual(4, record_boundary(b'"a"\n"b"'))
+        self.assertEqual(3, record_boundary(b'a"\n"b"\n', in_quotes=True))
+        self.assertEqual(5, record_boundary(b'a\nb"\n', in_quotes=True))
+        self.assertEqual(-1, record_boundary(b'"a\nb'))
+        self.assertEqual(2, record_boundary(b'a\nb', quote_char=False))
+
+    def test_aligned_blocks(self):
+        raw = self.csv_bytes()
+
+        for size in (1, 7, 64, len(raw)):
+            blocks = list(aligned_blocks(raw[i:i + size] for i in range(0, len(raw), size)))
+
+            self.assertEqual(raw, b"".join(blocks))
+            for block in blocks:
+                pcsv.read_csv(
+                    io.BytesIO(block),
+                    read_options=pcsv.ReadOptions(column_names=["string", "int"])
+                )
+
+    def test_read_csv_ranges(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "result.csv")
+            with open(path, "wb") as f:
+                f.write(self.csv_bytes())
+
+            for ordered in (True, False):
+                with LocalFileSystem().open_input_file(path) as file:
+                    batches = list(read_csv_ranges(
+                        file, ["string", "int"],
+                        convert_options=pcsv.ConvertOptions(
+                            column_types=self.data.schema, strings_can_be_null=True,
+                            quoted_strings_can_be_null=False
+                        ),
+                        block_size=97,
+                        max_workers=4,
+                        ordered=ordered
+                    ))
+                result = pyarrow.Table.from_batches(batches)
+
+                if not ordered:
+                    result = result.sort_by("int")
+                self.assertEqual(self.data.to_pydict(), result.to_pydict())
+
+    def csv_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        pcsv.write_csv(self.data, buffer, pcsv.WriteOptions(quoting_style="all_valid"))
+        return buffer.getvalue()
@@ -0,0 +1,68 @@
+import random
+import unittest
+
+import pyarrow
+
+from owlna.utils.sort import external_sort, sort_keys
+
+
+class SortUtilsTests(unittest.TestCase):
+
+    def setUp(self) -> None:
+        rng = random.Random(1)
+        self.data = pyarrow.table({
+            "key": pyarrow.array([rng.choice([None, *range(20)]) for _ in range(2000)], pyarrow.int64()),
+            "name": [rng.choice(["a", "b", "c"]) for _ in range(2000)],
+            "id": list(range(2000))
+        })
+        self.keys = [("key", "ascending"), ("name", "descending"), "id"]
+
+    def test_sort_keys(self):
+        self.assertEqual(
+            [("key", "ascending"), ("name", "descending"), ("id", "ascending")], sort_keys(self.keys)
+        )
+
+    def test_external_sort_in_memory(self):
+        result = pyarrow.Table.from_batches(
+            external_sort(self.data.to_batches(100), self.data.schema, self.keys), self.data.schema
+        )
+
+        self.assertEqual(self.data.sort_by(sort_keys(self.keys)), result)
+
+    def test_external_sort_spilled(self):
+        # runs of ~4 batches, merged
+        result = pyarrow.Table.from_batches(
+            external_sort(self.data.to_batches(100), self.data.schema, self.keys, memory=self.data.nbytes // 5),
+            self.data.schema
+        )
+
+        self.assertEqual(self.data.sort_by(sort_keys(self.keys)).to_pydict(), result.to_pydict())
+
+    def test_external_sort_empty(self):
+        self.assertEqual([], list(external_sort([], self.data.schema, ["id"])))
+
+    def test_external_sort_spilled_nan_null(self):
+        rng = random.Random(2)
+        values = [rng.random() for _ in range(2000)] + [float("nan")] * 300 + [None] * 100
+        rng.shuffle(values)
+        data = pyarrow.table({"key": pyarrow.array(values, pyarrow.float64()), "id": list(range(len(values)))})
+
+        for order in ["ascending", "descending"]:
+            keys = [("key", order), ("id", "ascending")]
+            result = pyarrow.Table.from_batches(
+                external_sort(data.to_batches(100), data.schema, keys, memory=data.nbytes // 6), data.schema
+            )
+            # NaN != NaN, compare the row order by id
+            self.assertEqual(data.sort_by(keys)["id"].to_pylist(), result["id"].to_pylist())
+
+    def test_external_sort_many_runs(self):
+        # 20 runs of 100 rows, merged at most 100 rows at a time
+        batches = list(external_sort(
+            self.data.to_batches(20), self.data.schema, self.keys, memory=self.data.nbytes // 20
+        ))
+
+        self.assertEqual(
+            self.data.sort_by(sort_keys(self.keys)).to_pydict(),
+            pyarrow.Table.from_batches(batches, self.data.schema).to_pydict()
+        )
+        self.assertLessEqual(max(_.num_rows for _ in batches), 100)
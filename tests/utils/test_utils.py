@@ -1,8 +1,10 @@
 import pyarrow
 import pyarrow as pa
 
-from owlna.utils.metadata import dict_to_pyarrow_field, query_result_column_to_pyarrow_field
+from owlna.utils.metadata import dict_to_pyarrow_field, query_result_column_to_pyarrow_field, decode_csv_metadata, \
+    sqltype_to_datatype
 from tests import AthenaTestCase
+from tests.fake import encode_csv_metadata
 
 
 class MetadataUtilsTests(AthenaTestCase):
@@ -142,3 +144,32 @@ class MetadataUtilsTests(AthenaTestCase):
                 'CaseSensitive': True
             }).metadata
         )
+
+    def test_sqltype_to_datatype(self):
+        self.assertEqual(pa.float32(), sqltype_to_datatype("real"))
+        self.assertEqual(pa.timestamp("ms"), sqltype_to_datatype("timestamp(3)", tz=None))
+        self.assertEqual(pa.timestamp("us"), sqltype_to_datatype("timestamp(6)", tz=None))
+        self.assertEqual(pa.decimal128(10, 2), sqltype_to_datatype("decimal(10,2)"))
+        self.assertEqual(pa.string(), sqltype_to_datatype("varchar(10)"))
+        self.assertEqual(pa.time32("ms"), sqltype_to_datatype("time(3)"))
+
+        for sqltype in [
+            "timestamp with time zone", "timestamp(3) with time zone", "varbinary", "json",
+            "array", "array(varchar)", "map(varchar, integer)", "row(a integer, b varchar)",
+            "interval day to second", "uuid", "ipaddress"
+        ]:
+            self.assertEqual(pa.string(), sqltype_to_datatype(sqltype), sqltype)
+
+    def test_decode_csv_metadata(self):
+        raw = [
+            {'CatalogName': 'hive', 'SchemaName': '', 'TableName': '', 'Name': 'string', 'Label': 'string',
+             'Type': 'varchar', 'Precision': 2147483647, 'Scale': 0, 'Nullable': 'UNKNOWN', 'CaseSensitive': True},
+            {'CatalogName': 'hive', 'SchemaName': '', 'TableName': '', 'Name': 'decimal', 'Label': 'decimal',
+             'Type': 'decimal', 'Precision': 38, 'Scale': 18, 'Nullable': 'NOT_NULL', 'CaseSensitive': False}
+        ]
+
+        self.assertEqual(raw, decode_csv_metadata(encode_csv_metadata(raw)))
+
+    def test_decode_csv_metadata_invalid(self):
+        with self.assertRaises((ValueError, IndexError)):
+            decode_csv_metadata(b"\x0a\xff")